@@ -43,6 +43,7 @@ from __future__ import annotations
 from google.generativeai import version
 
 from google.generativeai import caching
+from google.generativeai import embedding
 from google.generativeai import protos
 from google.generativeai import types
 
@@ -50,17 +51,28 @@ from google.generativeai.client import configure
 
 from google.generativeai.embedding import embed_content
 from google.generativeai.embedding import embed_content_async
+from google.generativeai.embedding import embed_content_stream
+from google.generativeai.embedding import embed_content_stream_async
 
 from google.generativeai.files import upload_file
+from google.generativeai.files import upload_file_async
+from google.generativeai.files import upload_files
+from google.generativeai.files import resume_upload
 from google.generativeai.files import get_file
 from google.generativeai.files import list_files
+from google.generativeai.files import list_files_async
 from google.generativeai.files import delete_file
+from google.generativeai.files import delete_files
+from google.generativeai.files import wait_all
+from google.generativeai.files import wait_all_async
 
 from google.generativeai.generative_models import GenerativeModel
 from google.generativeai.generative_models import ChatSession
 
 from google.generativeai.models import list_models
+from google.generativeai.models import list_models_async
 from google.generativeai.models import list_tuned_models
+from google.generativeai.models import list_tuned_models_async
 
 from google.generativeai.models import get_model
 from google.generativeai.models import get_base_model
@@ -69,6 +81,7 @@ from google.generativeai.models import get_tuned_model
 from google.generativeai.models import create_tuned_model
 from google.generativeai.models import update_tuned_model
 from google.generativeai.models import delete_tuned_model
+from google.generativeai.models import delete_tuned_models
 
 from google.generativeai.operations import list_operations
 from google.generativeai.operations import get_operation
@@ -77,7 +90,6 @@ from google.generativeai.types import GenerationConfig
 
 __version__ = version.__version__
 
-del embedding
 del files
 del generative_models
 del models
@@ -14,14 +14,26 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
+import collections
+import dataclasses
 import datetime
+import hashlib
 import textwrap
-from typing import Iterable, Optional
+import threading
+import time
+import weakref
+from typing import AsyncIterable, Iterable, Optional
+
+from google.api_core import exceptions
 
 from google.generativeai import protos
 from google.generativeai.types import caching_types
 from google.generativeai.types import content_types
+from google.generativeai.types import helper_types
+from google.generativeai import utils
 from google.generativeai.client import get_default_cache_client
+from google.generativeai.client import get_default_cache_async_client
 
 from google.protobuf import field_mask_pb2
 
@@ -220,6 +232,37 @@ class CachedContent:
         result = CachedContent._from_obj(response)
         return result
 
+    @classmethod
+    async def create_async(
+        cls,
+        model: str,
+        *,
+        display_name: str | None = None,
+        system_instruction: Optional[content_types.ContentType] = None,
+        contents: Optional[content_types.ContentsType] = None,
+        tools: Optional[content_types.FunctionLibraryType] = None,
+        tool_config: Optional[content_types.ToolConfigType] = None,
+        ttl: Optional[caching_types.TTLTypes] = None,
+        expire_time: Optional[caching_types.ExpireTimeTypes] = None,
+    ) -> CachedContent:
+        """This is the async version of `CachedContent.create`."""
+        client = get_default_cache_async_client()
+
+        request = cls._prepare_create_request(
+            model=model,
+            display_name=display_name,
+            system_instruction=system_instruction,
+            contents=contents,
+            tools=tools,
+            tool_config=tool_config,
+            ttl=ttl,
+            expire_time=expire_time,
+        )
+
+        response = await client.create_cached_content(request)
+        result = CachedContent._from_obj(response)
+        return result
+
     @classmethod
     def get(cls, name: str) -> CachedContent:
         """Fetches required `CachedContent` resource.
@@ -240,6 +283,19 @@ class CachedContent:
         result = CachedContent._from_obj(response)
         return result
 
+    @classmethod
+    async def get_async(cls, name: str) -> CachedContent:
+        """This is the async version of `CachedContent.get`."""
+        client = get_default_cache_async_client()
+
+        if "cachedContents/" not in name:
+            name = "cachedContents/" + name
+
+        request = protos.GetCachedContentRequest(name=name)
+        response = await client.get_cached_content(request)
+        result = CachedContent._from_obj(response)
+        return result
+
     @classmethod
     def list(cls, page_size: Optional[int] = 1) -> Iterable[CachedContent]:
         """Lists `CachedContent` objects associated with the project.
@@ -249,12 +305,25 @@ class CachedContent:
             The service may return fewer `CachedContent` objects.
 
         Returns:
-            A paginated list of `CachedContent` objects.
+            A paginated list of `CachedContent` objects, the next page is fetched in the
+            background while the current one is consumed.
         """
         client = get_default_cache_client()
 
         request = protos.ListCachedContentsRequest(page_size=page_size)
-        for cached_content in client.list_cached_contents(request):
+        response = client.list_cached_contents(request)
+        for cached_content in utils.iter_prefetched(response, buffer_size=page_size):
+            cached_content = CachedContent._from_obj(cached_content)
+            yield cached_content
+
+    @classmethod
+    async def list_async(cls, page_size: Optional[int] = 1) -> AsyncIterable[CachedContent]:
+        """This is the async version of `CachedContent.list`."""
+        client = get_default_cache_async_client()
+
+        request = protos.ListCachedContentsRequest(page_size=page_size)
+        response = await client.list_cached_contents(request)
+        async for cached_content in utils.aiter_prefetched(response, buffer_size=page_size):
             cached_content = CachedContent._from_obj(cached_content)
             yield cached_content
 
@@ -266,22 +335,21 @@ class CachedContent:
         client.delete_cached_content(request)
         return
 
-    def update(
+    async def delete_async(self) -> None:
+        """This is the async version of `CachedContent.delete`."""
+        client = get_default_cache_async_client()
+
+        request = protos.DeleteCachedContentRequest(name=self.name)
+        await client.delete_cached_content(request)
+        return
+
+    def _prepare_update_request(
         self,
         *,
         ttl: Optional[caching_types.TTLTypes] = None,
         expire_time: Optional[caching_types.ExpireTimeTypes] = None,
-    ) -> None:
-        """Updates requested `CachedContent` resource.
-
-        Args:
-            ttl: TTL for cached resource (in seconds). Defaults to 1 hour.
-                 `ttl` and `expire_time` are exclusive arguments.
-            expire_time: Expiration time for cached resource.
-                         `ttl` and `expire_time` are exclusive arguments.
-        """
-        client = get_default_cache_client()
-
+    ) -> protos.UpdateCachedContentRequest:
+        """Prepares an UpdateCachedContentRequest."""
         if ttl and expire_time:
             raise ValueError(
                 "Exclusive arguments: Please provide either `ttl` or `expire_time`, not both."
@@ -307,8 +375,383 @@ class CachedContent:
                 f"Bad update name: Only `ttl`  or `expire_time` can be updated for `CachedContent`."
             )
 
-        request = protos.UpdateCachedContentRequest(cached_content=updates, update_mask=field_mask)
+        return protos.UpdateCachedContentRequest(cached_content=updates, update_mask=field_mask)
+
+    def update(
+        self,
+        *,
+        ttl: Optional[caching_types.TTLTypes] = None,
+        expire_time: Optional[caching_types.ExpireTimeTypes] = None,
+    ) -> None:
+        """Updates requested `CachedContent` resource.
+
+        Args:
+            ttl: TTL for cached resource (in seconds). Defaults to 1 hour.
+                 `ttl` and `expire_time` are exclusive arguments.
+            expire_time: Expiration time for cached resource.
+                         `ttl` and `expire_time` are exclusive arguments.
+        """
+        client = get_default_cache_client()
+
+        request = self._prepare_update_request(ttl=ttl, expire_time=expire_time)
         updated_cc = client.update_cached_content(request)
         self._update(updated_cc)
 
         return
+
+    async def update_async(
+        self,
+        *,
+        ttl: Optional[caching_types.TTLTypes] = None,
+        expire_time: Optional[caching_types.ExpireTimeTypes] = None,
+    ) -> None:
+        """This is the async version of `CachedContent.update`."""
+        client = get_default_cache_async_client()
+
+        request = self._prepare_update_request(ttl=ttl, expire_time=expire_time)
+        updated_cc = await client.update_cached_content(request)
+        self._update(updated_cc)
+
+        return
+
+
+# Caches created by a `CachedContentManager` are named after the hash of their request, so other
+# processes can find them with `CachedContent.list`.
+_MANAGED_DISPLAY_NAME_PREFIX = "genai-managed-"
+
+
+@dataclasses.dataclass
+class _ManagedCache:
+    cached_content: CachedContent
+    last_used: float
+    last_refreshed: float
+
+
+class CachedContentManager:
+    """Creates a `CachedContent` once per distinct content, and keeps the caches in use alive.
+
+    ```
+    manager = caching.CachedContentManager(ttl=datetime.timedelta(hours=1))
+    cache = manager.get_or_create("gemini-1.5-flash-001", contents=[long_document])
+    model = genai.GenerativeModel.from_cached_content(cache)
+    ```
+
+    Requests are identified by a hash of their normalized `CreateCachedContentRequest`, so
+    asking again for the same model, system instruction, contents, tools and tool config
+    returns the existing cache. The hash is stored in the cache's `display_name`, so managers in
+    other processes find and reuse it through `CachedContent.list` rather than creating their own.
+
+    A background thread extends the TTL of every cache that was used since its last refresh,
+    `refresh_before` its expiry. Failed refreshes are retried on the next round. At most
+    `max_entries` caches are tracked: the least recently used ones beyond that are no longer
+    refreshed and expire on their own.
+
+    Args:
+        ttl: The lifetime given to new caches, and added on each refresh.
+        refresh_before: How long before a cache expires it is refreshed.
+        max_entries: The maximum number of caches kept alive by this manager.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: caching_types.TTLTypes = datetime.timedelta(hours=1),
+        refresh_before: caching_types.TTLTypes = datetime.timedelta(minutes=5),
+        max_entries: int = 128,
+    ):
+        self._ttl = caching_types.to_optional_ttl(ttl)
+        self._refresh_before = _ttl_seconds(caching_types.to_optional_ttl(refresh_before))
+        if self._refresh_before >= _ttl_seconds(self._ttl):
+            raise ValueError("Invalid input: `refresh_before` must be shorter than the `ttl`.")
+        if max_entries < 1:
+            raise ValueError(f"Invalid input: `max_entries` must be at least 1, got {max_entries}.")
+        self.max_entries = max_entries
+
+        self._entries: collections.OrderedDict[str, _ManagedCache] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # Held while a key is looked up on the service or created, so it's only created once.
+        self._key_locks: collections.defaultdict[str, threading.Lock] = collections.defaultdict(
+            threading.Lock
+        )
+        # An `asyncio.Lock` is bound to the event loop it's first used on, so each loop has its own.
+        self._key_locks_async: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, collections.defaultdict[str, asyncio.Lock]
+        ] = weakref.WeakKeyDictionary()
+        self._closed = threading.Event()
+        self._refresher: threading.Thread | None = None
+
+    def get_or_create(
+        self,
+        model: str,
+        *,
+        system_instruction: Optional[content_types.ContentType] = None,
+        contents: Optional[content_types.ContentsType] = None,
+        tools: Optional[content_types.FunctionLibraryType] = None,
+        tool_config: Optional[content_types.ToolConfigType] = None,
+    ) -> CachedContent:
+        """Returns a live `CachedContent` for these arguments, creating it only if none exists.
+
+        The arguments are the same as for `CachedContent.create`.
+        """
+        request = CachedContent._prepare_create_request(
+            model=model,
+            system_instruction=system_instruction,
+            contents=contents,
+            tools=tools,
+            tool_config=tool_config,
+        )
+        key = _request_key(request)
+
+        with self._get_key_lock(key):
+            cached_content = self._lookup(key)
+            if cached_content is None:
+                cached_content = self._find_or_create(request, key)
+            self._track(key, cached_content)
+        return cached_content
+
+    async def get_or_create_async(
+        self,
+        model: str,
+        *,
+        system_instruction: Optional[content_types.ContentType] = None,
+        contents: Optional[content_types.ContentsType] = None,
+        tools: Optional[content_types.FunctionLibraryType] = None,
+        tool_config: Optional[content_types.ToolConfigType] = None,
+    ) -> CachedContent:
+        """This is the async version of `CachedContentManager.get_or_create`."""
+        request = CachedContent._prepare_create_request(
+            model=model,
+            system_instruction=system_instruction,
+            contents=contents,
+            tools=tools,
+            tool_config=tool_config,
+        )
+        key = _request_key(request)
+
+        async with self._get_async_key_lock(key):
+            cached_content = await self._lookup_async(key)
+            if cached_content is None:
+                cached_content = await self._find_or_create_async(request, key)
+            self._track(key, cached_content)
+        return cached_content
+
+    def refresh_expiring(self) -> None:
+        """Extends the caches in use that expire within `refresh_before`, and forgets expired ones.
+
+        This is called periodically by the background thread.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+
+        for key, entry in entries:
+            now = time.time()
+            remaining = entry.cached_content.expire_time.timestamp() - now
+            if remaining > self._refresh_before:
+                continue
+            if entry.last_used < entry.last_refreshed:
+                # Not used since the last refresh: let it expire.
+                if remaining <= 0:
+                    self._forget(key, entry)
+                continue
+            try:
+                entry.cached_content.update(ttl=self._ttl)
+            except exceptions.NotFound:
+                self._forget(key, entry)
+            except Exception:
+                # Retried on the next round, until the cache expires.
+                if remaining <= 0:
+                    self._forget(key, entry)
+            else:
+                entry.last_refreshed = now
+
+    def close(self) -> None:
+        """Stops refreshing the caches. They stay usable until they expire."""
+        self._closed.set()
+        if self._refresher is not None:
+            self._refresher.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _lookup(self, key: str) -> CachedContent | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        remaining = entry.cached_content.expire_time.timestamp() - time.time()
+        if remaining > self._refresh_before:
+            return entry.cached_content
+        try:
+            entry.cached_content.update(ttl=self._ttl)
+        except exceptions.NotFound:
+            self._forget(key, entry)
+            return None
+        except Exception:
+            # As in `refresh_expiring`, the cache is used until it expires, and the refresh retried.
+            if remaining <= 0:
+                self._forget(key, entry)
+                return None
+            return entry.cached_content
+        entry.last_refreshed = time.time()
+        return entry.cached_content
+
+    async def _lookup_async(self, key: str) -> CachedContent | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        remaining = entry.cached_content.expire_time.timestamp() - time.time()
+        if remaining > self._refresh_before:
+            return entry.cached_content
+        try:
+            await entry.cached_content.update_async(ttl=self._ttl)
+        except exceptions.NotFound:
+            self._forget(key, entry)
+            return None
+        except Exception:
+            # As in `refresh_expiring`, the cache is used until it expires, and the refresh retried.
+            if remaining <= 0:
+                self._forget(key, entry)
+                return None
+            return entry.cached_content
+        entry.last_refreshed = time.time()
+        return entry.cached_content
+
+    def _find_or_create(
+        self, request: protos.CreateCachedContentRequest, key: str
+    ) -> CachedContent:
+        display_name = _MANAGED_DISPLAY_NAME_PREFIX + key
+        model = request.cached_content.model
+        for cached_content in CachedContent.list(page_size=100):
+            if (
+                cached_content.display_name == display_name
+                and cached_content.model == model
+                and cached_content.expire_time.timestamp() - time.time() > self._refresh_before
+            ):
+                return cached_content
+
+        request.cached_content.display_name = display_name
+        request.cached_content.ttl = self._ttl
+        response = get_default_cache_client().create_cached_content(request)
+        return CachedContent._from_obj(response)
+
+    async def _find_or_create_async(
+        self, request: protos.CreateCachedContentRequest, key: str
+    ) -> CachedContent:
+        display_name = _MANAGED_DISPLAY_NAME_PREFIX + key
+        model = request.cached_content.model
+        async for cached_content in CachedContent.list_async(page_size=100):
+            if (
+                cached_content.display_name == display_name
+                and cached_content.model == model
+                and cached_content.expire_time.timestamp() - time.time() > self._refresh_before
+            ):
+                return cached_content
+
+        request.cached_content.display_name = display_name
+        request.cached_content.ttl = self._ttl
+        response = await get_default_cache_async_client().create_cached_content(request)
+        return CachedContent._from_obj(response)
+
+    def _track(self, key: str, cached_content: CachedContent):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.cached_content is not cached_content:
+                entry = _ManagedCache(cached_content, last_used=now, last_refreshed=now)
+                self._entries[key] = entry
+            entry.last_used = now
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+                for key_locks in self._key_locks_async.values():
+                    key_locks.pop(evicted, None)
+            self._start_refresher()
+
+    def _get_key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks[key]
+
+    def _get_async_key_lock(self, key: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            key_locks = self._key_locks_async.get(loop)
+            if key_locks is None:
+                key_locks = self._key_locks_async[loop] = collections.defaultdict(asyncio.Lock)
+            return key_locks[key]
+
+    def _forget(self, key: str, entry: _ManagedCache):
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+    def _start_refresher(self):
+        if self._refresher is None and not self._closed.is_set():
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while not self._closed.wait(self._refresh_before / 2):
+            self.refresh_expiring()
+
+
+_default_manager: CachedContentManager | None = None
+_default_manager_lock = threading.Lock()
+
+
+def _get_default_manager() -> CachedContentManager:
+    """Returns the process-wide manager used by `GenerativeModel(auto_cache=True)`."""
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = CachedContentManager()
+        return _default_manager
+
+
+def _request_key(request: protos.CreateCachedContentRequest) -> str:
+    # Only the content identifies a cache, not its name or lifetime.
+    cached_content = protos.CachedContent(request.cached_content)
+    cached_content.display_name = ""
+    cached_content.ttl = None
+    cached_content.expire_time = None
+    data = protos.CachedContent.pb(cached_content).SerializeToString(deterministic=True)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _ttl_seconds(ttl: caching_types.TTL) -> float:
+    return ttl["seconds"] + ttl.get("nanos", 0) / 1e9
+
+
+def delete_cached_contents(
+    names: Iterable[str | CachedContent], *, max_concurrency: int = 8
+) -> helper_types.DeleteSummary:
+    """Deletes many `CachedContent` resources concurrently.
+
+    Caches that are already gone (e.g. expired) are reported in `DeleteSummary.not_found`
+    rather than as errors, and a failure to delete one cache doesn't stop the others.
+
+    Args:
+        names: The caches to delete, as resource names or `CachedContent` objects.
+        max_concurrency: The maximum number of delete calls in flight at once.
+
+    Returns:
+        helper_types.DeleteSummary: The deleted, already deleted, and failed cache names.
+    """
+    client = get_default_cache_client()
+
+    def delete_one(name):
+        client.delete_cached_content(protos.DeleteCachedContentRequest(name=name))
+
+    resolved = []
+    for name in names:
+        if isinstance(name, CachedContent):
+            name = name.name
+        elif "cachedContents/" not in name:
+            name = "cachedContents/" + name
+        resolved.append(name)
+
+    return utils.delete_all(delete_one, resolved, max_concurrency=max_concurrency)
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import contextlib
 import inspect
 import dataclasses
+import itertools
+import json
 import pathlib
 import threading
-from typing import Any, cast
-from collections.abc import Sequence
+import time
+from typing import Any, Literal, cast
+from collections.abc import Callable, Mapping, Sequence
 import httplib2
-from io import IOBase
+from io import BytesIO, IOBase
 
 import google.ai.generativelanguage as glm
 import google.generativeai.protos as protos
@@ -18,12 +22,16 @@ from google.auth import credentials as ga_credentials
 from google.auth import exceptions as ga_exceptions
 from google import auth
 from google.api_core import client_options as client_options_lib
+from google.api_core import exceptions as api_exceptions
 from google.api_core import gapic_v1
 from google.api_core import operations_v1
 
 import googleapiclient.http
 import googleapiclient.discovery
 
+from google.generativeai.types import helper_types
+from google.generativeai import utils
+
 try:
     from google.generativeai import version
 
@@ -48,6 +56,81 @@ USER_AGENT = "genai-py"
 #      through the file service.
 ##################
 GENAI_API_DISCOVERY_URL = "https://generativelanguage.googleapis.com/$discovery/rest"
+GENAI_API_DISCOVERY_VERSION = "v1beta"
+
+# The discovery document is cached on disk so new processes skip fetching it.
+# Set `GENAI_DISCOVERY_CACHE_DIR` to choose the directory, or to "" to disable the disk cache.
+DISCOVERY_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+_discovery_docs: dict[str, dict] = {}
+_discovery_docs_lock = threading.Lock()
+
+
+def _default_cache_dir() -> pathlib.Path:
+    return pathlib.Path.home() / ".cache" / "google-generativeai"
+
+
+def _discovery_cache_path(version: str) -> pathlib.Path | None:
+    cache_dir = os.environ.get("GENAI_DISCOVERY_CACHE_DIR")
+    if cache_dir is None:
+        cache_dir = _default_cache_dir()
+    elif not cache_dir:
+        return None
+    return pathlib.Path(cache_dir) / f"discovery-{version}.json"
+
+
+def _read_discovery_cache(version: str) -> dict | None:
+    path = _discovery_cache_path(version)
+    if path is None:
+        return None
+    try:
+        if time.time() - path.stat().st_mtime > DISCOVERY_CACHE_TTL_SECONDS:
+            return None
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_discovery_cache(version: str, discovery_doc: dict):
+    path = _discovery_cache_path(version)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        utils.write_json_atomic(path, discovery_doc)
+    except OSError:
+        pass
+
+
+def _fetch_discovery_doc(
+    api_key: str, metadata: Sequence[tuple[str, str]], version: str = GENAI_API_DISCOVERY_VERSION
+) -> dict:
+    """Returns the File API discovery document, fetching it at most once per process."""
+    discovery_doc = _discovery_docs.get(version)
+    if discovery_doc is not None:
+        return discovery_doc
+
+    with _discovery_docs_lock:
+        discovery_doc = _discovery_docs.get(version)
+        if discovery_doc is not None:
+            return discovery_doc
+
+        discovery_doc = _read_discovery_cache(version)
+        if discovery_doc is None:
+            request = googleapiclient.http.HttpRequest(
+                http=httplib2.Http(),
+                postproc=lambda resp, content: (resp, content),
+                uri=f"{GENAI_API_DISCOVERY_URL}?version={version}&key={api_key}",
+                headers=dict(metadata),
+            )
+            response, content = request.execute()
+            request.http.close()
+
+            discovery_doc = json.loads(content.decode("utf-8"))
+            _write_discovery_cache(version, discovery_doc)
+
+        _discovery_docs[version] = discovery_doc
+        return discovery_doc
 
 
 @contextlib.contextmanager
@@ -62,32 +145,48 @@ def patch_colab_gce_credentials():
         auth._default._get_gce_credentials = get_gce
 
 
+GENAI_API_UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+
+# Every chunk of a resumable upload, except the last, must be a multiple of 256 KiB.
+UPLOAD_CHUNK_GRANULARITY = 256 * 1024
+DEFAULT_UPLOAD_CHUNK_SIZE = 32 * UPLOAD_CHUNK_GRANULARITY
+# A non-resumable async upload is sent in a single request, so it is held in memory.
+MAX_NON_RESUMABLE_UPLOAD_SIZE = 64 * 1024 * 1024
+
+
+def _check_chunk_size(chunk_size: int):
+    if chunk_size <= 0 or chunk_size % UPLOAD_CHUNK_GRANULARITY:
+        raise ValueError(
+            f"Invalid chunk_size: Expected a positive multiple of {UPLOAD_CHUNK_GRANULARITY}, got {chunk_size}."
+        )
+
+
 class FileServiceClient(glm.FileServiceClient):
     def __init__(self, *args, **kwargs):
-        self._discovery_api = None
         self._local = threading.local()
+        # Set by `_ClientManager.make_client`, uploads bypass the transport so they add it here.
+        self._default_metadata: tuple[tuple[str, str], ...] = ()
         super().__init__(*args, **kwargs)
 
-    def _setup_discovery_api(self, metadata: dict | Sequence[tuple[str, str]] = ()):
+    def _get_discovery_api(self, metadata: dict | Sequence[tuple[str, str]] = ()):
+        # The discovery API object holds an `httplib2.Http`, which is not thread safe, so each
+        # thread builds its own from the shared document.
+        discovery_api = getattr(self._local, "discovery_api", None)
+        if discovery_api is not None:
+            return discovery_api
+
         api_key = self._client_options.api_key
         if api_key is None:
             raise ValueError(
                 "Invalid operation: Uploading to the File API requires an API key. Please provide a valid API key."
             )
 
-        request = googleapiclient.http.HttpRequest(
-            http=httplib2.Http(),
-            postproc=lambda resp, content: (resp, content),
-            uri=f"{GENAI_API_DISCOVERY_URL}?version=v1beta&key={api_key}",
-            headers=dict(metadata),
-        )
-        response, content = request.execute()
-        request.http.close()
-
-        discovery_doc = content.decode("utf-8")
-        self._local.discovery_api = googleapiclient.discovery.build_from_document(
+        discovery_doc = _fetch_discovery_doc(api_key, metadata)
+        discovery_api = googleapiclient.discovery.build_from_document(
             discovery_doc, developerKey=api_key
         )
+        self._local.discovery_api = discovery_api
+        return discovery_api
 
     def create_file(
         self,
@@ -97,10 +196,30 @@ class FileServiceClient(glm.FileServiceClient):
         name: str | None = None,
         display_name: str | None = None,
         resumable: bool = True,
+        chunk_size: int | None = None,
+        checkpoint: str | os.PathLike | None = None,
         metadata: Sequence[tuple[str, str]] = (),
     ) -> protos.File:
-        if self._discovery_api is None:
-            self._setup_discovery_api(metadata)
+        """Uploads a file.
+
+        With `chunk_size` set, a resumable upload sends the file in chunks of that many bytes
+        (a multiple of 256 KiB), otherwise the `googleapiclient` default is used. With
+        `checkpoint` set, the upload session and the number of bytes sent are saved to that
+        file after each chunk, so an interrupted upload can be continued with `resume_upload`.
+        The checkpoint is removed once the upload completes.
+        """
+        if chunk_size is not None:
+            _check_chunk_size(chunk_size)
+        if checkpoint is not None:
+            if not resumable:
+                raise ValueError(
+                    "Invalid operation: A `checkpoint` can only be saved for resumable uploads."
+                )
+            if isinstance(path, IOBase):
+                raise ValueError(
+                    "Invalid operation: A `checkpoint` can only be saved when uploading from a path, "
+                    "a file-like object can't be reopened to resume the upload."
+                )
 
         file = {}
         if name is not None:
@@ -108,35 +227,545 @@ class FileServiceClient(glm.FileServiceClient):
         if display_name is not None:
             file["displayName"] = display_name
 
+        state = {
+            # Resolved, so the upload can be resumed from another working directory.
+            "path": None if isinstance(path, IOBase) else str(pathlib.Path(path).resolve()),
+            "mime_type": mime_type,
+            "body": {"file": file},
+            "chunk_size": chunk_size,
+            "upload_url": None,
+            "offset": 0,
+        }
+        return self._upload(
+            path, state, resumable=resumable, checkpoint=checkpoint, metadata=metadata
+        )
+
+    def resume_upload(
+        self,
+        checkpoint: str | os.PathLike,
+        *,
+        metadata: Sequence[tuple[str, str]] = (),
+    ) -> protos.File:
+        """Continues an upload started by `create_file` from its `checkpoint` file.
+
+        The server is asked how many bytes it has received, and only the rest of the file is sent.
+        """
+        state = json.loads(pathlib.Path(checkpoint).read_text())
+        return self._upload(
+            state["path"], state, resumable=True, checkpoint=checkpoint, metadata=metadata
+        )
+
+    def _upload(
+        self,
+        path: str | os.PathLike | IOBase,
+        state: dict,
+        *,
+        resumable: bool,
+        checkpoint: str | os.PathLike | None,
+        metadata: Sequence[tuple[str, str]],
+    ) -> protos.File:
+        metadata = tuple(metadata) + self._default_metadata
+        discovery_api = self._get_discovery_api(metadata)
+
+        chunk_kwargs = {}
+        if state["chunk_size"] is not None:
+            chunk_kwargs["chunksize"] = state["chunk_size"]
+
         if isinstance(path, IOBase):
             media = googleapiclient.http.MediaIoBaseUpload(
-                fd=path, mimetype=mime_type, resumable=resumable
+                fd=path, mimetype=state["mime_type"], resumable=resumable, **chunk_kwargs
             )
         else:
             media = googleapiclient.http.MediaFileUpload(
-                filename=path, mimetype=mime_type, resumable=resumable
+                filename=path, mimetype=state["mime_type"], resumable=resumable, **chunk_kwargs
             )
 
-        request = self._local.discovery_api.media().upload(body={"file": file}, media_body=media)
+        request = discovery_api.media().upload(body=state["body"], media_body=media)
         for key, value in metadata:
             request.headers[key] = value
-        result = request.execute()
+
+        if not resumable:
+            result = request.execute()
+        else:
+            result = None
+            if state["upload_url"] is not None:
+                # The last chunk may have arrived after the checkpoint was written, so ask the
+                # server for the bytes it already has rather than trusting `state["offset"]`.
+                result = _resume_upload_session(request, state["upload_url"], metadata)
+
+            while result is None:
+                _, result = request.next_chunk()
+                if checkpoint is not None and result is None:
+                    state["upload_url"] = request.resumable_uri
+                    state["offset"] = request.resumable_progress
+                    utils.write_json_atomic(checkpoint, state)
+
+            if checkpoint is not None:
+                pathlib.Path(checkpoint).unlink(missing_ok=True)
 
         return self.get_file({"name": result["file"]["name"]})
 
 
-class FileServiceAsyncClient(glm.FileServiceAsyncClient):
-    async def create_file(self, *args, **kwargs):
-        raise NotImplementedError(
-            "The `create_file` method is currently not supported for the asynchronous client."
+def _resume_upload_session(
+    request: googleapiclient.http.HttpRequest,
+    upload_url: str,
+    metadata: Sequence[tuple[str, str]],
+) -> dict | None:
+    """Points `request` at an existing upload session, after the bytes the server has received.
+
+    Returns the result of the upload instead, if the server already has the whole file.
+    """
+    size = request.resumable.size()
+    headers = {
+        **dict(metadata),
+        "Content-Length": "0",
+        "Content-Range": f"bytes */{'*' if size is None else size}",
+    }
+    response, content = request.http.request(upload_url, "PUT", headers=headers)
+    if response.status != 308:
+        # Raises an `HttpError` unless the upload is complete.
+        return request.postproc(response, content)
+
+    request.resumable_uri = upload_url
+    if "range" in response:
+        request.resumable_progress = int(response["range"].rsplit("-", 1)[1]) + 1
+    else:
+        request.resumable_progress = 0
+    return None
+
+
+def _upload_request(
+    http: httplib2.Http, uri: str, headers: Mapping[str, str], body: bytes | str | None = None
+) -> tuple[httplib2.Response, bytes]:
+    response, content = http.request(uri, method="POST", body=body, headers=dict(headers))
+    if response.status >= 300:
+        raise api_exceptions.from_http_status(
+            response.status, content.decode("utf-8", errors="replace")
+        )
+    return response, content
+
+
+def _remaining_size(stream: IOBase) -> int | None:
+    if not stream.seekable():
+        return None
+    position = stream.tell()
+    end = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return end - position
+
+
+def _read_upload_body(stream: IOBase, total: int | None) -> bytes:
+    """Reads the whole of a non-resumable upload, up to `MAX_NON_RESUMABLE_UPLOAD_SIZE` bytes."""
+    if total is None or total <= MAX_NON_RESUMABLE_UPLOAD_SIZE:
+        body = stream.read(MAX_NON_RESUMABLE_UPLOAD_SIZE + 1)
+        total = len(body)
+    if total > MAX_NON_RESUMABLE_UPLOAD_SIZE:
+        raise ValueError(
+            "Invalid operation: Non-resumable uploads are limited to "
+            f"{MAX_NON_RESUMABLE_UPLOAD_SIZE} bytes. Use `resumable=True` to upload larger files."
         )
+    return body
+
+
+class FileServiceAsyncClient(glm.FileServiceAsyncClient):
+    def __init__(self, *args, **kwargs):
+        # Set by `_ClientManager.make_client`, uploads bypass the transport so they add it here.
+        self._default_metadata: tuple[tuple[str, str], ...] = ()
+        super().__init__(*args, **kwargs)
+
+    async def create_file(
+        self,
+        path: str | pathlib.Path | os.PathLike | IOBase,
+        *,
+        mime_type: str | None = None,
+        name: str | None = None,
+        display_name: str | None = None,
+        resumable: bool = True,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        progress: Callable[[int, int | None], None] | None = None,
+        metadata: Sequence[tuple[str, str]] = (),
+    ) -> protos.File:
+        """Uploads a file with the resumable upload protocol.
+
+        The file is streamed from disk `chunk_size` bytes at a time, each request runs in a
+        worker thread so the event loop is never blocked. If the task is cancelled, the upload
+        session is cancelled on the server too. `progress` is called after each chunk with the
+        bytes sent so far and the total size (`None` if it can't be determined).
+
+        With `resumable=False` the file is read into memory and sent in a single request, this
+        is limited to files of up to `MAX_NON_RESUMABLE_UPLOAD_SIZE` bytes.
+        """
+        api_key = self._client._client_options.api_key
+        if api_key is None:
+            raise ValueError(
+                "Invalid operation: Uploading to the File API requires an API key. Please provide a valid API key."
+            )
+        _check_chunk_size(chunk_size)
+
+        headers = dict(tuple(metadata) + self._default_metadata)
+
+        file = {}
+        if name is not None:
+            file["name"] = name
+        if display_name is not None:
+            file["displayName"] = display_name
+
+        # `httplib2.Http` is not thread safe, but each upload only uses its own one at a time.
+        http = httplib2.Http()
+        with contextlib.ExitStack() as stack:
+            if isinstance(path, IOBase):
+                stream = path
+            else:
+                stream = stack.enter_context(open(path, "rb"))
+            total = _remaining_size(stream)
+            if not resumable:
+                stream = BytesIO(await asyncio.to_thread(_read_upload_body, stream, total))
+                total = len(stream.getbuffer())
+
+            start_headers = {
+                **headers,
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "Content-Type": "application/json",
+            }
+            if mime_type is not None:
+                start_headers["X-Goog-Upload-Header-Content-Type"] = mime_type
+            if total is not None:
+                start_headers["X-Goog-Upload-Header-Content-Length"] = str(total)
+
+            response, _ = await asyncio.to_thread(
+                _upload_request,
+                http,
+                f"{GENAI_API_UPLOAD_URL}?key={api_key}",
+                start_headers,
+                json.dumps({"file": file}),
+            )
+            upload_url = response["x-goog-upload-url"]
+
+            try:
+                result = await self._upload_chunks(
+                    http,
+                    upload_url,
+                    headers,
+                    stream,
+                    chunk_size=chunk_size if resumable else None,
+                    total=total,
+                    progress=progress,
+                )
+            except asyncio.CancelledError:
+                with contextlib.suppress(Exception):
+                    await asyncio.to_thread(
+                        _upload_request,
+                        httplib2.Http(),
+                        upload_url,
+                        {**headers, "X-Goog-Upload-Command": "cancel"},
+                    )
+                raise
+
+        return await self.get_file({"name": result["file"]["name"]})
+
+    async def _upload_chunks(
+        self,
+        http: httplib2.Http,
+        upload_url: str,
+        headers: Mapping[str, str],
+        stream: IOBase,
+        *,
+        chunk_size: int | None,
+        total: int | None,
+        progress: Callable[[int, int | None], None] | None,
+    ) -> dict:
+        offset = 0
+        chunk = await asyncio.to_thread(stream.read, chunk_size or -1)
+        while True:
+            # Read one chunk ahead, the last chunk has to be sent with the "finalize" command.
+            next_chunk = b""
+            if chunk_size is not None and len(chunk) == chunk_size:
+                next_chunk = await asyncio.to_thread(stream.read, chunk_size)
+
+            _, content = await asyncio.to_thread(
+                _upload_request,
+                http,
+                upload_url,
+                {
+                    **headers,
+                    "X-Goog-Upload-Command": "upload" if next_chunk else "upload, finalize",
+                    "X-Goog-Upload-Offset": str(offset),
+                    "Content-Length": str(len(chunk)),
+                },
+                chunk,
+            )
+            offset += len(chunk)
+            if progress is not None:
+                progress(offset, total)
+
+            if not next_chunk:
+                return json.loads(content.decode("utf-8"))
+            chunk = next_chunk
+
+
+class _TokenBucket:
+    """A bucket holding up to `per_minute` tokens, refilled continuously."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Returns how long to wait until a token is available."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        needed = min(1.0, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+
+# How often to re-check for a free slot when the concurrency limit is reached.
+_CONCURRENCY_POLL_INTERVAL = 0.01
+
+
+class _RateLimiter:
+    """Client-side limits for one API method, shared by all threads and asyncio tasks.
+
+    Calls take a token from the requests bucket and a concurrency slot. When a call completes
+    its `usage_metadata.total_token_count` is taken from the tokens bucket, which may go
+    negative, making later calls wait. The concurrency limit is halved when the API reports the
+    quota is exhausted and grows back by one for every `concurrency` successful calls.
+    """
+
+    def __init__(self, rate_limit: helper_types.RateLimit, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        now = clock()
+
+        self._requests = None
+        if rate_limit.requests_per_minute:
+            self._requests = _TokenBucket(rate_limit.requests_per_minute, now)
+
+        self._tokens = None
+        if rate_limit.tokens_per_minute:
+            self._tokens = _TokenBucket(rate_limit.tokens_per_minute, now)
+
+        self._max_concurrency = rate_limit.max_concurrency
+        self._concurrency = float(rate_limit.max_concurrency or 0) or None
+        self._in_flight = 0
+
+    @property
+    def concurrency(self) -> float | None:
+        """The current concurrency limit, `None` if unlimited."""
+        return self._concurrency
+
+    def _try_acquire(self) -> float:
+        """Starts a call if the limits allow it, otherwise returns how long to wait."""
+        with self._lock:
+            if self._concurrency is not None and self._in_flight >= int(self._concurrency):
+                return _CONCURRENCY_POLL_INTERVAL
+
+            now = self._clock()
+            delay = 0.0
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    delay = max(delay, bucket.delay(now))
+            if delay > 0:
+                return delay
+
+            if self._requests is not None:
+                self._requests.level -= 1
+            self._in_flight += 1
+            return 0.0
+
+    def acquire(self):
+        while (delay := self._try_acquire()) > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        while (delay := self._try_acquire()) > 0:
+            await asyncio.sleep(delay)
+
+    def release(self, *, exhausted: bool = False):
+        with self._lock:
+            self._in_flight -= 1
+            if exhausted:
+                self._decrease()
+            elif self._concurrency is not None:
+                self._concurrency += 1 / self._concurrency
+                if self._max_concurrency:
+                    self._concurrency = min(self._concurrency, self._max_concurrency)
+
+    def record_exhausted(self):
+        """Halves the concurrency limit, for quota errors reported after the call was released."""
+        with self._lock:
+            self._decrease()
+
+    def _decrease(self):
+        current = self._concurrency if self._concurrency is not None else self._in_flight + 1
+        self._concurrency = max(1.0, current / 2)
+
+    def record_tokens(self, tokens: int):
+        if self._tokens is None or not tokens:
+            return
+        with self._lock:
+            self._tokens.level -= tokens
+
+
+def _total_tokens(response) -> int:
+    usage_metadata = getattr(response, "usage_metadata", None)
+    return getattr(usage_metadata, "total_token_count", 0) if usage_metadata else 0
+
+
+def _rate_limited_stream(stream, limiter: _RateLimiter):
+    tokens = 0
+    try:
+        for chunk in stream:
+            tokens = _total_tokens(chunk) or tokens
+            yield chunk
+    except api_exceptions.TooManyRequests:
+        limiter.record_exhausted()
+        raise
+    finally:
+        limiter.record_tokens(tokens)
+
+
+async def _rate_limited_async_stream(stream, limiter: _RateLimiter):
+    tokens = 0
+    try:
+        async for chunk in stream:
+            tokens = _total_tokens(chunk) or tokens
+            yield chunk
+    except api_exceptions.TooManyRequests:
+        limiter.record_exhausted()
+        raise
+    finally:
+        limiter.record_tokens(tokens)
+
+
+def _add_rate_limit(f, name: str, limiter: _RateLimiter, is_async: bool = False):
+    """Wraps a client method so each call waits for, and reports back to, `limiter`.
+
+    Streaming methods hold their concurrency slot until the stream is opened, their tokens
+    are recorded when iteration ends.
+
+    Pass `is_async=True` for methods of an async client: some of them (like
+    `stream_generate_content`) are plain functions that return an awaitable.
+    """
+    streaming = name.startswith("stream_")
+
+    if is_async or inspect.iscoroutinefunction(f):
+
+        async def async_call(*args, **kwargs):
+            await limiter.acquire_async()
+            try:
+                result = await f(*args, **kwargs)
+            except api_exceptions.TooManyRequests:
+                limiter.release(exhausted=True)
+                raise
+            except BaseException:
+                limiter.release()
+                raise
+            limiter.release()
+            if streaming:
+                return _rate_limited_async_stream(result, limiter)
+            limiter.record_tokens(_total_tokens(result))
+            return result
+
+        return async_call
+
+    def call(*args, **kwargs):
+        limiter.acquire()
+        try:
+            result = f(*args, **kwargs)
+        except api_exceptions.TooManyRequests:
+            limiter.release(exhausted=True)
+            raise
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.release()
+        if streaming:
+            return _rate_limited_stream(result, limiter)
+        limiter.record_tokens(_total_tokens(result))
+        return result
+
+    return call
+
+
+class _ClientPool:
+    """Spreads calls over several clients for the same service.
+
+    Each client has its own gRPC channel or HTTP session, so calls from many threads are not
+    serialized on a single connection. Attribute access is forwarded to the first client, method
+    calls go to the next client in turn (`"round_robin"`) or to the client with the fewest calls
+    in flight (`"least_loaded"`).
+    """
+
+    def __init__(self, clients: Sequence[Any], strategy: str = "round_robin"):
+        self._clients = list(clients)
+        self._strategy = strategy
+        self._in_flight = [0] * len(self._clients)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _pick(self) -> int:
+        with self._lock:
+            if self._strategy == "round_robin":
+                index = next(self._counter) % len(self._clients)
+            else:
+                index = min(range(len(self._clients)), key=self._in_flight.__getitem__)
+            self._in_flight[index] += 1
+        return index
+
+    def _done(self, index: int):
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    def _call(self, name: str, *args, **kwargs):
+        index = self._pick()
+        try:
+            result = getattr(self._clients[index], name)(*args, **kwargs)
+        except BaseException:
+            self._done(index)
+            raise
+        if inspect.isawaitable(result):
+            return self._await(index, result)
+        self._done(index)
+        return result
+
+    async def _await(self, index: int, awaitable):
+        try:
+            return await awaitable
+        finally:
+            self._done(index)
+
+    def __getattr__(self, name):
+        value = getattr(self._clients[0], name)
+        if name.startswith("_") or not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            return self._call(name, *args, **kwargs)
+
+        # Cache the dispatcher so later lookups skip `__getattr__`.
+        setattr(self, name, call)
+        return call
 
 
 @dataclasses.dataclass
 class _ClientManager:
     client_config: dict[str, Any] = dataclasses.field(default_factory=dict)
     default_metadata: Sequence[tuple[str, str]] = ()
+    rate_limiters: dict[str, _RateLimiter] = dataclasses.field(default_factory=dict)
+    client_pool_size: int = 1
+    client_pool_strategy: str = "round_robin"
+    file_cache_path: pathlib.Path | None = None
+    embedding_cache_path: pathlib.Path | None = None
     clients: dict[str, Any] = dataclasses.field(default_factory=dict)
+    # Guards `clients`, so concurrent threads share one client per service.
+    _lock: threading.RLock = dataclasses.field(
+        default_factory=threading.RLock, repr=False, compare=False
+    )
 
     def configure(
         self,
@@ -153,6 +782,11 @@ class _ClientManager:
         client_options: client_options_lib.ClientOptions | dict[str, Any] | None = None,
         client_info: gapic_v1.client_info.ClientInfo | None = None,
         default_metadata: Sequence[tuple[str, str]] = (),
+        rate_limits: Mapping[str, helper_types.RateLimitType] | None = None,
+        client_pool_size: int = 1,
+        client_pool_strategy: Literal["round_robin", "least_loaded"] = "round_robin",
+        file_cache: bool | str | os.PathLike = False,
+        embedding_cache: bool | str | os.PathLike = False,
     ) -> None:
         """Initializes default client configurations using specified parameters or environment variables.
 
@@ -171,6 +805,16 @@ class _ClientManager:
                 are set, they will be used in this order of priority.
             default_metadata: Default (key, value) metadata pairs to send with every request.
                 when using `transport="rest"` these are sent as HTTP headers.
+            rate_limits: Client-side limits per client method name (like `"generate_content"`),
+                see `genai.types.RateLimit`. Every client created after this call shares them.
+            client_pool_size: The number of clients to create per service. Each has its own
+                connection, calls are spread over them according to `client_pool_strategy`
+                (`"round_robin"` or `"least_loaded"`).
+            file_cache: Whether `upload_file` reuses earlier uploads of the same contents,
+                `True` for the default database location or the path of a sqlite database.
+            embedding_cache: Whether `embed_content` reuses the embeddings of earlier identical
+                requests, `True` for the default database location or the path of a sqlite
+                database.
         """
         if isinstance(client_options, dict):
             client_options = client_options_lib.from_dict(client_options)
@@ -216,12 +860,47 @@ class _ClientManager:
 
         client_config = {key: value for key, value in client_config.items() if value is not None}
 
-        self.client_config = client_config
-        self.default_metadata = default_metadata
+        if client_pool_size < 1:
+            raise ValueError(
+                f"Invalid input: `client_pool_size` must be at least 1, got {client_pool_size}."
+            )
+        if client_pool_strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(
+                "Invalid input: `client_pool_strategy` must be 'round_robin' or 'least_loaded', "
+                f"got {client_pool_strategy!r}."
+            )
+
+        if file_cache is True:
+            file_cache = _default_cache_dir() / "files.sqlite"
+        if file_cache:
+            file_cache_path = pathlib.Path(file_cache).expanduser()
+        else:
+            file_cache_path = None
 
-        self.clients = {}
+        if embedding_cache is True:
+            embedding_cache = _default_cache_dir() / "embeddings.sqlite"
+        if embedding_cache:
+            embedding_cache_path = pathlib.Path(embedding_cache).expanduser()
+        else:
+            embedding_cache_path = None
+
+        with self._lock:
+            self.file_cache_path = file_cache_path
+            self.embedding_cache_path = embedding_cache_path
+            self.client_config = client_config
+            self.default_metadata = default_metadata
+            self.rate_limiters = {
+                method: _RateLimiter(helper_types.to_rate_limit(rate_limit))
+                for method, rate_limit in (rate_limits or {}).items()
+            }
+            self.client_pool_size = client_pool_size
+            self.client_pool_strategy = client_pool_strategy
+
+            # Threads already holding a client keep using it, new calls get new clients.
+            self.clients = {}
 
     def make_client(self, name):
+        is_async = name.endswith("_async")
         if name == "file":
             cls = FileServiceClient
         elif name == "file_async":
@@ -248,9 +927,35 @@ class _ClientManager:
             )
             raise e
 
+        for method, limiter in self.rate_limiters.items():
+            f = getattr(client, method, None)
+            if f is not None:
+                setattr(client, method, _add_rate_limit(f, method, limiter, is_async))
+
         if not self.default_metadata:
             return client
 
+        default_metadata = tuple(tuple(item) for item in self.default_metadata)
+        if isinstance(client, (FileServiceClient, FileServiceAsyncClient)):
+            client._default_metadata = default_metadata
+
+        # The generated clients send every call through the transport's pre-wrapped RPCs,
+        # which already append their own (user-agent) metadata to each call. Extend that
+        # once here, rather than wrapping each client method.
+        wrapped_methods = getattr(getattr(client, "_transport", None), "_wrapped_methods", None)
+        if wrapped_methods is None:
+            # The async clients delegate to a sync client's transport.
+            wrapped_methods = getattr(
+                getattr(getattr(client, "_client", None), "_transport", None),
+                "_wrapped_methods",
+                None,
+            )
+        if wrapped_methods is not None:
+            for rpc in wrapped_methods.values():
+                rpc._metadata = tuple(rpc._metadata or ()) + default_metadata
+            return client
+
+        # Fallback for clients that don't follow the generated layout.
         def keep(name, f):
             if name.startswith("_"):
                 return False
@@ -265,8 +970,7 @@ class _ClientManager:
 
         def add_default_metadata_wrapper(f):
             def call(*args, metadata=(), **kwargs):
-                metadata = list(metadata) + list(self.default_metadata)
-                return f(*args, **kwargs, metadata=metadata)
+                return f(*args, **kwargs, metadata=tuple(metadata) + default_metadata)
 
             return call
 
@@ -286,16 +990,29 @@ class _ClientManager:
 
         client = self.clients.get(name)
         if client is None:
-            client = self.make_client(name)
-            self.clients[name] = client
+            with self._lock:
+                # Another thread may have created it while this one waited for the lock.
+                client = self.clients.get(name)
+                if client is None:
+                    if self.client_pool_size > 1:
+                        client = _ClientPool(
+                            [self.make_client(name) for _ in range(self.client_pool_size)],
+                            strategy=self.client_pool_strategy,
+                        )
+                    else:
+                        client = self.make_client(name)
+                    self.clients[name] = client
         return client
 
     def get_default_operations_client(self) -> operations_v1.OperationsClient:
         client = self.clients.get("operations", None)
         if client is None:
-            model_client = self.get_default_client("Model")
-            client = model_client._transport.operations_client
-            self.clients["operations"] = client
+            with self._lock:
+                client = self.clients.get("operations", None)
+                if client is None:
+                    model_client = self.get_default_client("Model")
+                    client = model_client._transport.operations_client
+                    self.clients["operations"] = client
         return client
 
 
@@ -312,6 +1029,11 @@ def configure(
     client_options: client_options_lib.ClientOptions | dict | None = None,
     client_info: gapic_v1.client_info.ClientInfo | None = None,
     default_metadata: Sequence[tuple[str, str]] = (),
+    rate_limits: Mapping[str, helper_types.RateLimitType] | None = None,
+    client_pool_size: int = 1,
+    client_pool_strategy: Literal["round_robin", "least_loaded"] = "round_robin",
+    file_cache: bool | str | os.PathLike = False,
+    embedding_cache: bool | str | os.PathLike = False,
 ):
     """Captures default client configuration.
 
@@ -329,6 +1051,23 @@ def configure(
             used.
         default_metadata: Default (key, value) metadata pairs to send with every request.
             when using `transport="rest"` these are sent as HTTP headers.
+        rate_limits: Client-side limits per client method name, for example
+            `{"generate_content": genai.types.RateLimit(requests_per_minute=1000)}`.
+            Calls wait for the limits instead of failing with `ResourceExhausted`.
+        client_pool_size: The number of clients to create per service, so calls from many
+            threads are spread over several connections instead of sharing one.
+        client_pool_strategy: How calls are spread over the pool, `"round_robin"` or
+            `"least_loaded"` (the client with the fewest calls in flight).
+        file_cache: Opt in to a local cache of uploaded files, `True` to store it under
+            `~/.cache/google-generativeai/` or the path of a sqlite database. `upload_file`
+            then reuses an earlier upload of a file with the same contents until it is close
+            to expiring, instead of uploading it again.
+        embedding_cache: Opt in to a local cache of embeddings, `True` to store it under
+            `~/.cache/google-generativeai/` or the path of a sqlite database. `embed_content`
+            and `embed_content_stream` then only send the contents they haven't embedded
+            before with the same model, task type, title and output dimensionality. It holds
+            up to `embedding.DEFAULT_EMBEDDING_CACHE_SIZE` vectors, evicting the least recently
+            used.
     """
     return _client_manager.configure(
         api_key=api_key,
@@ -337,6 +1076,11 @@ def configure(
         client_options=client_options,
         client_info=client_info,
         default_metadata=default_metadata,
+        rate_limits=rate_limits,
+        client_pool_size=client_pool_size,
+        client_pool_strategy=client_pool_strategy,
+        file_cache=file_cache,
+        embedding_cache=embedding_cache,
     )
 
 
@@ -348,6 +1092,10 @@ def get_default_cache_client() -> glm.CacheServiceClient:
     return _client_manager.get_default_client("cache")
 
 
+def get_default_cache_async_client() -> glm.CacheServiceAsyncClient:
+    return _client_manager.get_default_client("cache_async")
+
+
 def get_default_file_client() -> glm.FilesServiceClient:
     return _client_manager.get_default_client("file")
 
@@ -356,6 +1104,19 @@ def get_default_file_async_client() -> glm.FilesServiceAsyncClient:
     return _client_manager.get_default_client("file_async")
 
 
+def get_default_file_cache_path() -> pathlib.Path | None:
+    return _client_manager.file_cache_path
+
+
+def get_default_api_key() -> str | None:
+    client_options = _client_manager.client_config.get("client_options")
+    return getattr(client_options, "api_key", None)
+
+
+def get_default_embedding_cache_path() -> pathlib.Path | None:
+    return _client_manager.embedding_cache_path
+
+
 def get_default_generative_client() -> glm.GenerativeServiceClient:
     return _client_manager.get_default_client("generative")
 
@@ -372,6 +1133,10 @@ def get_default_model_client() -> glm.ModelServiceAsyncClient:
     return _client_manager.get_default_client("model")
 
 
+def get_default_model_async_client() -> glm.ModelServiceAsyncClient:
+    return _client_manager.get_default_client("model_async")
+
+
 def get_default_retriever_client() -> glm.RetrieverClient:
     return _client_manager.get_default_client("retriever")
 
@@ -14,25 +14,68 @@
 # limitations under the License.
 from __future__ import annotations
 
-import itertools
-from typing import Any, Iterable, overload, TypeVar, Union, Mapping
+import array
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Literal,
+    overload,
+    TypeVar,
+    Union,
+    Mapping,
+    Sequence,
+)
 
 import google.ai.generativelanguage as glm
+import google.api_core.exceptions
 from google.generativeai import protos
+from google.generativeai import utils
 
 from google.generativeai.client import get_default_generative_client
 from google.generativeai.client import get_default_generative_async_client
+from google.generativeai.client import get_default_embedding_cache_path
 
 from google.generativeai.types import helper_types
 from google.generativeai.types import model_types
 from google.generativeai.types import text_types
 from google.generativeai.types import content_types
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 DEFAULT_EMB_MODEL = "models/embedding-001"
 EMBEDDING_MAX_BATCH_SIZE = 100
+# Besides the count, batches are kept under these sizes, so batches of long documents stay within
+# the request limits. The tokens are estimated locally, a batch that still turns out to be too
+# large is split in two and retried.
+EMBEDDING_MAX_BATCH_BYTES = 3 * 1024 * 1024
+EMBEDDING_MAX_BATCH_TOKENS = 100_000
+# Text averages about 4 bytes of UTF-8 per token in English, fewer in other scripts.
+_BYTES_PER_TOKEN = 3
+DEFAULT_EMBEDDING_CONCURRENCY = 8
+# How many vectors the `genai.configure(embedding_cache=...)` database keeps.
+DEFAULT_EMBEDDING_CACHE_SIZE = 1_000_000
+
+T = TypeVar("T")
 
 EmbeddingTaskType = protos.TaskType
 
+EmbeddingOutputFormat = Literal["list", "numpy"]
+
 EmbeddingTaskTypeOptions = Union[int, str, EmbeddingTaskType]
 
 _EMBEDDING_TASK_TYPE: dict[EmbeddingTaskTypeOptions, EmbeddingTaskType] = {
@@ -75,26 +118,318 @@ def to_task_type(x: EmbeddingTaskTypeOptions) -> EmbeddingTaskType:
     return _EMBEDDING_TASK_TYPE[x]
 
 
-try:
-    # python 3.12+
-    _batched = itertools.batched  # type: ignore
-except AttributeError:
-    T = TypeVar("T")
+def _check_output_format(output_format: EmbeddingOutputFormat):
+    if output_format not in ("list", "numpy"):
+        raise ValueError(
+            f"Invalid input: `output_format` must be 'list' or 'numpy', got {output_format!r}."
+        )
+    if output_format == "numpy" and np is None:
+        raise ImportError(
+            "NumPy is required for `output_format='numpy'`. Install it with `pip install numpy`."
+        )
 
-    def _batched(iterable: Iterable[T], n: int) -> Iterable[list[T]]:
-        if n < 1:
-            raise ValueError(
-                f"Invalid input: The batch size 'n' must be a positive integer. You entered: {n}. Please enter a number greater than 0."
-            )
-        batch = []
-        for item in iterable:
-            batch.append(item)
-            if len(batch) == n:
-                yield batch
-                batch = []
-
-        if batch:
+
+class _EmbeddingsBuffer:
+    """Collects the embeddings of successive batches, in order.
+
+    With the "numpy" format the values are copied from the response protos into rows of one
+    `(size, D)` float32 array, allocated once the first batch gives `D`.
+    """
+
+    def __init__(self, output_format: EmbeddingOutputFormat, size: int | None = None):
+        self._output_format = output_format
+        self._size = size
+        self._rows = 0
+        self._values: list[list[float]] | np.ndarray | None = None
+
+    def add(self, vectors: Sequence[Sequence[float]]):
+        if self._output_format == "list":
+            if self._values is None:
+                self._values = []
+            self._values.extend(list(vector) for vector in vectors)
+            return
+
+        if self._values is None and vectors:
+            self._values = np.empty((self._size, len(vectors[0])), dtype=np.float32)
+        for vector in vectors:
+            self._values[self._rows] = vector
+            self._rows += 1
+
+    def result(self) -> list[list[float]] | np.ndarray:
+        if self._values is not None:
+            return self._values
+        elif self._output_format == "numpy":
+            return np.empty((0, 0), dtype=np.float32)
+        else:
+            return []
+
+
+def _estimate_tokens(request: protos.EmbedContentRequest) -> int:
+    parts = type(request).pb(request).content.parts
+    return sum(len(part.text.encode()) for part in parts) // _BYTES_PER_TOKEN + 1
+
+
+def _plan_batches(
+    requests: Iterable[protos.EmbedContentRequest],
+) -> Iterator[list[protos.EmbedContentRequest]]:
+    """Groups consecutive `requests` into batches that fit the count, byte and token limits.
+
+    Batches are closed as soon as the next request would go over a limit, so short texts are
+    sent `EMBEDDING_MAX_BATCH_SIZE` at a time, and long documents in smaller batches. A single
+    request over the limits gets a batch of its own.
+    """
+    batch, batch_bytes, batch_tokens = [], 0, 0
+    for request in requests:
+        request_bytes = type(request).pb(request).ByteSize()
+        request_tokens = _estimate_tokens(request)
+        if batch and (
+            len(batch) == EMBEDDING_MAX_BATCH_SIZE
+            or batch_bytes + request_bytes > EMBEDDING_MAX_BATCH_BYTES
+            or batch_tokens + request_tokens > EMBEDDING_MAX_BATCH_TOKENS
+        ):
             yield batch
+            batch, batch_bytes, batch_tokens = [], 0, 0
+        batch.append(request)
+        batch_bytes += request_bytes
+        batch_tokens += request_tokens
+
+    if batch:
+        yield batch
+
+
+def _number_batches(batches: Iterable[list[T]]) -> Iterator[tuple[int, list[T]]]:
+    """Pairs each batch with the index of its first item."""
+    start = 0
+    for batch in batches:
+        yield start, batch
+        start += len(batch)
+
+
+# Fragments of the `InvalidArgument` messages for requests over a size limit. Other invalid
+# arguments (like a bad model, task type or title) fail the same way however the batch is split.
+_SIZE_LIMIT_MESSAGES = ("exceeds the limit", "too large", "too long")
+
+
+def _is_size_limit_error(error: google.api_core.exceptions.InvalidArgument) -> bool:
+    message = (error.message or "").lower()
+    return any(fragment in message for fragment in _SIZE_LIMIT_MESSAGES)
+
+
+def _send_batch(
+    client: glm.GenerativeServiceClient,
+    model: str,
+    requests: Sequence[protos.EmbedContentRequest],
+    request_options: helper_types.RequestOptionsType,
+) -> list[Sequence[float]]:
+    """Sends `requests` in one `batch_embed_contents` call, halving the batch if it's too large."""
+    try:
+        response = client.batch_embed_contents(
+            protos.BatchEmbedContentsRequest(model=model, requests=requests),
+            **request_options,
+        )
+    except google.api_core.exceptions.InvalidArgument as e:
+        if len(requests) == 1 or not _is_size_limit_error(e):
+            raise
+        # Over a size limit, try each half on its own.
+        middle = len(requests) // 2
+        first = _send_batch(client, model, requests[:middle], request_options)
+        second = _send_batch(client, model, requests[middle:], request_options)
+        return first + second
+    return [e.values for e in type(response).pb(response).embeddings]
+
+
+async def _send_batch_async(
+    client: glm.GenerativeServiceAsyncClient,
+    model: str,
+    requests: Sequence[protos.EmbedContentRequest],
+    request_options: helper_types.RequestOptionsType,
+) -> list[Sequence[float]]:
+    """Sends `requests` in one `batch_embed_contents` call, halving the batch if it's too large."""
+    try:
+        response = await client.batch_embed_contents(
+            protos.BatchEmbedContentsRequest(model=model, requests=requests),
+            **request_options,
+        )
+    except google.api_core.exceptions.InvalidArgument as e:
+        if len(requests) == 1 or not _is_size_limit_error(e):
+            raise
+        # Over a size limit, try each half on its own.
+        middle = len(requests) // 2
+        first = await _send_batch_async(client, model, requests[:middle], request_options)
+        second = await _send_batch_async(client, model, requests[middle:], request_options)
+        return first + second
+    return [e.values for e in type(response).pb(response).embeddings]
+
+
+class _EmbeddingCache:
+    """Stores embeddings by a hash of the request that produced them.
+
+    Entries are kept in a sqlite database, as float32 vectors. Once there are more than
+    `max_entries`, the least recently used tenth of them is evicted.
+    """
+
+    def __init__(self, path: str | os.PathLike, max_entries: int = DEFAULT_EMBEDDING_CACHE_SIZE):
+        path = pathlib.Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Embedding batches run from many threads, `_lock` serializes the use of the one connection.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB, last_used REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+            )
+            (self._size,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        # For async callers, so the event loop doesn't wait on the database.
+        self.get_many_async = functools.partial(asyncio.to_thread, self.get_many)
+        self.put_many_async = functools.partial(asyncio.to_thread, self.put_many)
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+        placeholders = ", ".join("?" * len(keys))
+        with self._lock, self._db:
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+            self._db.execute(
+                f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                (time.time(), *keys),
+            )
+        return {key: array.array("f", vector).tolist() for key, vector in rows}
+
+    def put_many(self, vectors: Mapping[str, Sequence[float]]):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                ((key, array.array("f", vector).tobytes(), now) for key, vector in vectors.items()),
+            )
+            self._size += len(vectors)
+            if self._size > self.max_entries:
+                (self._size,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+                excess = self._size - self.max_entries * 9 // 10
+                if excess > 0:
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+                    self._size -= excess
+
+
+_embedding_caches: dict[pathlib.Path, _EmbeddingCache] = {}
+_embedding_caches_lock = threading.Lock()
+
+
+def _get_embedding_cache() -> _EmbeddingCache | None:
+    """Returns the cache enabled with `genai.configure(embedding_cache=...)`, or `None`.
+
+    The database is opened on first use, once per path.
+    """
+    path = get_default_embedding_cache_path()
+    if path is None:
+        return None
+    with _embedding_caches_lock:
+        cache = _embedding_caches.get(path)
+        if cache is None:
+            cache = _embedding_caches[path] = _EmbeddingCache(path)
+        return cache
+
+
+def _embedding_cache_key(request: protos.EmbedContentRequest) -> str:
+    # The request holds everything the embedding depends on: model, task type, title,
+    # dimensionality and content.
+    data = type(request).pb(request).SerializeToString(deterministic=True)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _embed_batch(
+    client: glm.GenerativeServiceClient,
+    model: str,
+    requests: Sequence[protos.EmbedContentRequest],
+    request_options: helper_types.RequestOptionsType,
+    cache: _EmbeddingCache | None,
+) -> list[Sequence[float]]:
+    """Embeds `requests` with `_send_batch`, only sending the cache misses."""
+    if cache is None:
+        return _send_batch(client, model, requests, request_options)
+
+    keys = [_embedding_cache_key(request) for request in requests]
+    vectors = cache.get_many(keys)
+    missing = {key: request for key, request in zip(keys, requests) if key not in vectors}
+    if missing:
+        embeddings = _send_batch(client, model, list(missing.values()), request_options)
+        new_vectors = dict(zip(missing, embeddings))
+        cache.put_many(new_vectors)
+        vectors.update(new_vectors)
+    return [vectors[key] for key in keys]
+
+
+async def _embed_batch_async(
+    client: glm.GenerativeServiceAsyncClient,
+    model: str,
+    requests: Sequence[protos.EmbedContentRequest],
+    request_options: helper_types.RequestOptionsType,
+    cache: _EmbeddingCache | None,
+) -> list[Sequence[float]]:
+    """Embeds `requests` with `_send_batch`, only sending the cache misses."""
+    if cache is None:
+        return await _send_batch_async(client, model, requests, request_options)
+
+    keys = [_embedding_cache_key(request) for request in requests]
+    vectors = await cache.get_many_async(keys)
+    missing = {key: request for key, request in zip(keys, requests) if key not in vectors}
+    if missing:
+        embeddings = await _send_batch_async(client, model, list(missing.values()), request_options)
+        new_vectors = dict(zip(missing, embeddings))
+        await cache.put_many_async(new_vectors)
+        vectors.update(new_vectors)
+    return [vectors[key] for key in keys]
+
+
+def _embed_one(
+    client: glm.GenerativeServiceClient,
+    request: protos.EmbedContentRequest,
+    request_options: helper_types.RequestOptionsType,
+    cache: _EmbeddingCache | None,
+) -> Sequence[float]:
+    """Embeds `request` with an `embed_content` call, unless it's cached."""
+    key = _embedding_cache_key(request) if cache is not None else None
+    if key is not None:
+        vectors = cache.get_many([key])
+        if key in vectors:
+            return vectors[key]
+
+    response = client.embed_content(request, **request_options)
+    vector = type(response).pb(response).embedding.values
+    if key is not None:
+        cache.put_many({key: vector})
+    return vector
+
+
+async def _embed_one_async(
+    client: glm.GenerativeServiceAsyncClient,
+    request: protos.EmbedContentRequest,
+    request_options: helper_types.RequestOptionsType,
+    cache: _EmbeddingCache | None,
+) -> Sequence[float]:
+    """Embeds `request` with an `embed_content` call, unless it's cached."""
+    key = _embedding_cache_key(request) if cache is not None else None
+    if key is not None:
+        vectors = await cache.get_many_async([key])
+        if key in vectors:
+            return vectors[key]
+
+    response = await client.embed_content(request, **request_options)
+    vector = type(response).pb(response).embedding.values
+    if key is not None:
+        await cache.put_many_async({key: vector})
+    return vector
 
 
 @overload
@@ -106,6 +441,7 @@ def embed_content(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    output_format: EmbeddingOutputFormat = "list",
 ) -> text_types.EmbeddingDict: ...
 
 
@@ -118,6 +454,7 @@ def embed_content(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    output_format: EmbeddingOutputFormat = "list",
 ) -> text_types.BatchEmbeddingDict: ...
 
 
@@ -129,6 +466,7 @@ def embed_content(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceClient = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    output_format: EmbeddingOutputFormat = "list",
 ) -> text_types.EmbeddingDict | text_types.BatchEmbeddingDict:
     """Calls the API to create embeddings for content passed in.
 
@@ -156,6 +494,12 @@ def embed_content(
         request_options:
             Options for the request.
 
+        output_format:
+            With "numpy", the embedding is returned as a float32 `np.ndarray`
+            instead of a list of floats: of shape `(D,)` for a single content,
+            and `(N, D)` for an iterable of N contents. The values are copied
+            straight from the responses into one preallocated array.
+
     Return:
         Dictionary containing the embedding (list of float values) for the
         input content.
@@ -168,55 +512,28 @@ def embed_content(
     if client is None:
         client = get_default_generative_client()
 
-    if title and to_task_type(task_type) is not EmbeddingTaskType.RETRIEVAL_DOCUMENT:
-        raise ValueError(
-            f"Invalid task type: When a title is specified, the task must be of a 'retrieval document' type. Received task type: {task_type} and title: {title}."
-        )
-
-    if output_dimensionality and output_dimensionality < 0:
-        raise ValueError(
-            f"Invalid value: `output_dimensionality` must be a non-negative integer. Received: {output_dimensionality}."
-        )
-
-    if task_type:
-        task_type = to_task_type(task_type)
+    _check_output_format(output_format)
+    cache = _get_embedding_cache()
 
     if isinstance(content, Iterable) and not isinstance(content, (str, Mapping)):
-        result = {"embedding": []}
-        requests = (
-            protos.EmbedContentRequest(
-                model=model,
-                content=content_types.to_content(c),
-                task_type=task_type,
-                title=title,
-                output_dimensionality=output_dimensionality,
-            )
-            for c in content
+        if output_format == "numpy":
+            # The array is allocated up front, so the number of contents is needed.
+            content = list(content)
+        embeddings = _EmbeddingsBuffer(
+            output_format, size=len(content) if output_format == "numpy" else None
         )
-        for batch in _batched(requests, EMBEDDING_MAX_BATCH_SIZE):
-            embedding_request = protos.BatchEmbedContentsRequest(model=model, requests=batch)
-            embedding_response = client.batch_embed_contents(
-                embedding_request,
-                **request_options,
-            )
-            embedding_dict = type(embedding_response).to_dict(embedding_response)
-            result["embedding"].extend(e["values"] for e in embedding_dict["embeddings"])
-        return result
+        requests = _make_embed_requests(model, content, task_type, title, output_dimensionality)
+        for batch in _plan_batches(requests):
+            embeddings.add(_embed_batch(client, model, batch, request_options, cache))
+        return {"embedding": embeddings.result()}
     else:
-        embedding_request = protos.EmbedContentRequest(
-            model=model,
-            content=content_types.to_content(content),
-            task_type=task_type,
-            title=title,
-            output_dimensionality=output_dimensionality,
+        (embedding_request,) = _make_embed_requests(
+            model, [content], task_type, title, output_dimensionality
         )
-        embedding_response = client.embed_content(
-            embedding_request,
-            **request_options,
-        )
-        embedding_dict = type(embedding_response).to_dict(embedding_response)
-        embedding_dict["embedding"] = embedding_dict["embedding"]["values"]
-        return embedding_dict
+        vector = _embed_one(client, embedding_request, request_options, cache)
+        if output_format == "numpy":
+            return {"embedding": np.array(vector, dtype=np.float32)}
+        return {"embedding": list(vector)}
 
 
 @overload
@@ -228,6 +545,7 @@ async def embed_content_async(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceAsyncClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    output_format: EmbeddingOutputFormat = "list",
 ) -> text_types.EmbeddingDict: ...
 
 
@@ -240,6 +558,7 @@ async def embed_content_async(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceAsyncClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    output_format: EmbeddingOutputFormat = "list",
 ) -> text_types.BatchEmbeddingDict: ...
 
 
@@ -251,6 +570,7 @@ async def embed_content_async(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceAsyncClient = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    output_format: EmbeddingOutputFormat = "list",
 ) -> text_types.EmbeddingDict | text_types.BatchEmbeddingDict:
     """Calls the API to create async embeddings for content passed in."""
 
@@ -262,6 +582,38 @@ async def embed_content_async(
     if client is None:
         client = get_default_generative_async_client()
 
+    _check_output_format(output_format)
+    cache = _get_embedding_cache()
+
+    if isinstance(content, Iterable) and not isinstance(content, (str, Mapping)):
+        if output_format == "numpy":
+            # The array is allocated up front, so the number of contents is needed.
+            content = list(content)
+        embeddings = _EmbeddingsBuffer(
+            output_format, size=len(content) if output_format == "numpy" else None
+        )
+        requests = _make_embed_requests(model, content, task_type, title, output_dimensionality)
+        for batch in _plan_batches(requests):
+            embeddings.add(await _embed_batch_async(client, model, batch, request_options, cache))
+        return {"embedding": embeddings.result()}
+    else:
+        (embedding_request,) = _make_embed_requests(
+            model, [content], task_type, title, output_dimensionality
+        )
+        vector = await _embed_one_async(client, embedding_request, request_options, cache)
+        if output_format == "numpy":
+            return {"embedding": np.array(vector, dtype=np.float32)}
+        return {"embedding": list(vector)}
+
+
+def _make_embed_requests(
+    model: str,
+    content: Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskTypeOptions | None,
+    title: str | None,
+    output_dimensionality: int | None,
+) -> Iterator[protos.EmbedContentRequest]:
+    """Checks the arguments, and returns a lazy iterator of requests for each of `content`."""
     if title and to_task_type(task_type) is not EmbeddingTaskType.RETRIEVAL_DOCUMENT:
         raise ValueError(
             f"Invalid task type: When a title is specified, the task must be of a 'retrieval document' type. Received task type: {task_type} and title: {title}."
@@ -274,39 +626,530 @@ async def embed_content_async(
     if task_type:
         task_type = to_task_type(task_type)
 
-    if isinstance(content, Iterable) and not isinstance(content, (str, Mapping)):
-        result = {"embedding": []}
-        requests = (
-            protos.EmbedContentRequest(
-                model=model,
-                content=content_types.to_content(c),
-                task_type=task_type,
-                title=title,
-                output_dimensionality=output_dimensionality,
-            )
-            for c in content
-        )
-        for batch in _batched(requests, EMBEDDING_MAX_BATCH_SIZE):
-            embedding_request = protos.BatchEmbedContentsRequest(model=model, requests=batch)
-            embedding_response = await client.batch_embed_contents(
-                embedding_request,
-                **request_options,
-            )
-            embedding_dict = type(embedding_response).to_dict(embedding_response)
-            result["embedding"].extend(e["values"] for e in embedding_dict["embeddings"])
-        return result
-    else:
-        embedding_request = protos.EmbedContentRequest(
+    return (
+        protos.EmbedContentRequest(
             model=model,
-            content=content_types.to_content(content),
+            content=content_types.to_content(c),
             task_type=task_type,
             title=title,
             output_dimensionality=output_dimensionality,
         )
-        embedding_response = await client.embed_content(
-            embedding_request,
-            **request_options,
+        for c in content
+    )
+
+
+def embed_content_stream(
+    model: model_types.BaseModelNameOptions,
+    content: Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskTypeOptions | None = None,
+    title: str | None = None,
+    output_dimensionality: int | None = None,
+    *,
+    max_concurrency: int = DEFAULT_EMBEDDING_CONCURRENCY,
+    client: glm.GenerativeServiceClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+) -> Iterator[tuple[int, list[float] | Exception]]:
+    """Embeds a large or unbounded iterable of content, sending the batches concurrently.
+
+    ```
+    for index, vector in genai.embed_content_stream(model, documents, max_concurrency=16):
+        index_store.add(index, vector)
+    ```
+
+    `content` is consumed lazily, a batch at a time (up to `EMBEDDING_MAX_BATCH_SIZE` items,
+    fewer for long texts), with up to `max_concurrency` batches in flight. Each embedding is
+    yielded as `(index, vector)` as soon as its batch completes, where `index` is the position
+    of the content in `content`: the results are **not** in order. Memory use only depends on
+    `max_concurrency`.
+
+    If a batch request is rejected as invalid (a `BadRequest`, like `InvalidArgument`), its
+    contents are retried one at a time, so that a single bad item does not fail the others. If
+    one of those fails too, its exception is yielded in place of the vector, and the stream
+    continues. Other errors, like quota errors, are raised without retrying each item.
+
+    The other arguments are the same as for `embed_content`.
+    """
+    model = model_types.make_model_name(model)
+
+    if request_options is None:
+        request_options = {}
+
+    if client is None:
+        client = get_default_generative_client()
+
+    requests = _make_embed_requests(model, content, task_type, title, output_dimensionality)
+    cache = _get_embedding_cache()
+
+    def embed_batch(batch):
+        start, batch_requests = batch
+        try:
+            vectors = [
+                list(vector)
+                for vector in _embed_batch(client, model, batch_requests, request_options, cache)
+            ]
+        except google.api_core.exceptions.BadRequest:
+            # Retry each request on its own, so only the bad ones fail. Quota and server errors
+            # aren't caused by one item, and retrying them per item would only add load.
+            vectors = []
+            for request in batch_requests:
+                try:
+                    vector = list(_embed_one(client, request, request_options, cache))
+                except Exception as e:
+                    # Yielded in place of the vector, the other items aren't affected.
+                    vector = e
+                vectors.append(vector)
+        return [(start + i, vector) for i, vector in enumerate(vectors)]
+
+    batches = _number_batches(_plan_batches(requests))
+    for _, result in utils.iter_as_completed(embed_batch, batches, max_concurrency=max_concurrency):
+        if isinstance(result, Exception):
+            # Only errors that aren't caused by one item, like quota errors, fail a whole batch.
+            raise result
+        for item in result:
+            yield item
+
+
+async def embed_content_stream_async(
+    model: model_types.BaseModelNameOptions,
+    content: Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskTypeOptions | None = None,
+    title: str | None = None,
+    output_dimensionality: int | None = None,
+    *,
+    max_concurrency: int = DEFAULT_EMBEDDING_CONCURRENCY,
+    client: glm.GenerativeServiceAsyncClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+) -> AsyncIterator[tuple[int, list[float] | Exception]]:
+    """The async version of `embed_content_stream`, using a task per batch in flight."""
+    model = model_types.make_model_name(model)
+
+    if request_options is None:
+        request_options = {}
+
+    if client is None:
+        client = get_default_generative_async_client()
+
+    requests = _make_embed_requests(model, content, task_type, title, output_dimensionality)
+    cache = _get_embedding_cache()
+
+    async def embed_batch(batch):
+        start, batch_requests = batch
+        try:
+            vectors = [
+                list(vector)
+                for vector in await _embed_batch_async(
+                    client, model, batch_requests, request_options, cache
+                )
+            ]
+        except google.api_core.exceptions.BadRequest:
+            # Retry each request on its own, so only the bad ones fail. Quota and server errors
+            # aren't caused by one item, and retrying them per item would only add load.
+            vectors = []
+            for request in batch_requests:
+                try:
+                    vector = list(await _embed_one_async(client, request, request_options, cache))
+                except Exception as e:
+                    # Yielded in place of the vector, the other items aren't affected.
+                    vector = e
+                vectors.append(vector)
+        return [(start + i, vector) for i, vector in enumerate(vectors)]
+
+    batches = _number_batches(_plan_batches(requests))
+    async for _, result in utils.aiter_as_completed(
+        embed_batch, batches, max_concurrency=max_concurrency
+    ):
+        if isinstance(result, Exception):
+            # Only errors that aren't caused by one item, like quota errors, fail a whole batch.
+            raise result
+        for item in result:
+            yield item
+
+
+def _require_numpy(feature: str):
+    if np is None:
+        raise ImportError(f"NumPy is required for {feature}. Install it with `pip install numpy`.")
+
+
+@dataclasses.dataclass
+class SearchResult:
+    """A match from `VectorIndex.search`, with its cosine similarity to the query."""
+
+    id: str
+    score: float
+    metadata: dict[str, Any] | None = None
+
+
+def _check_row_args(
+    count: int,
+    ids: Sequence[str] | None,
+    metadata: Sequence[dict[str, Any] | None] | None,
+):
+    if ids is not None and len(ids) != count:
+        raise ValueError(f"Invalid input: Expected {count} ids, got {len(ids)}.")
+    if metadata is not None and len(metadata) != count:
+        raise ValueError(f"Invalid input: Expected {count} metadata, got {len(metadata)}.")
+
+
+class VectorIndex:
+    """A local semantic search index of `embed_content` results.
+
+    ```
+    index = genai.embedding.VectorIndex("docs-index", model="models/text-embedding-004")
+    index.add_documents(chunks, ids=chunk_ids, metadata=[{"url": url} for url in urls])
+    for result in index.search("How do I reset my password?", k=5):
+        print(result.score, result.id, result.metadata)
+    ```
+
+    The index is a directory holding the unit-normalized float32 vectors as one memory-mapped
+    matrix (`vectors.f32`), the ids and metadata in a sqlite sidecar (`items.sqlite`), and the
+    settings in `index.json`. Changes are saved as they are made, and opening an existing index
+    only reads `index.json`, whatever its size.
+
+    Documents are embedded with the `RETRIEVAL_DOCUMENT` task type through
+    `embed_content_stream`, and queries with `RETRIEVAL_QUERY`. `search` scores every vector
+    with a matrix product and selects the top `k` with `np.argpartition`. For millions of
+    vectors, `build_ivf` clusters them so that searches only score the clusters closest to the
+    query, plus the vectors added since.
+
+    A `VectorIndex` is not safe to modify from several threads or processes at once.
+
+    Args:
+        path: The directory of the index, created if it doesn't exist.
+        model: The embedding model, stored with a new index. Defaults to `DEFAULT_EMB_MODEL`.
+        output_dimensionality: Optional reduced dimensionality, stored with a new index.
+    """
+
+    _VECTORS_FILE = "vectors.f32"
+    _ITEMS_FILE = "items.sqlite"
+    _SETTINGS_FILE = "index.json"
+    _IVF_FILES = {
+        "centroids": "ivf_centroids.npy",
+        "rows": "ivf_rows.npy",
+        "offsets": "ivf_offsets.npy",
+    }
+    DEFAULT_NPROBE = 8
+    _MIN_CAPACITY = 1024
+    # Rows scored at once by an exact search, bounding the memory used by temporaries.
+    _SEARCH_CHUNK_ROWS = 1 << 18
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        model: model_types.BaseModelNameOptions | None = None,
+        output_dimensionality: int | None = None,
+    ):
+        _require_numpy("`VectorIndex`")
+        self.path = pathlib.Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        settings_path = self.path / self._SETTINGS_FILE
+        if settings_path.exists():
+            settings = json.loads(settings_path.read_text())
+            if model is not None and model_types.make_model_name(model) != settings["model"]:
+                raise ValueError(
+                    f"Invalid input: The index at {path} uses the model {settings['model']!r}, "
+                    f"got {model!r}."
+                )
+        else:
+            settings = {
+                "model": model_types.make_model_name(model or DEFAULT_EMB_MODEL),
+                "output_dimensionality": output_dimensionality,
+                "dimension": None,
+                "count": 0,
+                "capacity": 0,
+                "ivf_count": 0,
+            }
+        self._settings = settings
+
+        self._items = sqlite3.connect(self.path / self._ITEMS_FILE)
+        with self._items:
+            self._items.execute(
+                "CREATE TABLE IF NOT EXISTS items (row INTEGER PRIMARY KEY, id TEXT, metadata TEXT)"
+            )
+
+        self._vectors = None
+        if settings["capacity"]:
+            self._vectors = np.memmap(
+                self.path / self._VECTORS_FILE,
+                dtype=np.float32,
+                mode="r+",
+                shape=(settings["capacity"], settings["dimension"]),
+            )
+        self._ivf = None
+        if settings["ivf_count"]:
+            self._load_ivf()
+
+    @property
+    def model(self) -> str:
+        return self._settings["model"]
+
+    @property
+    def dimension(self) -> int | None:
+        return self._settings["dimension"]
+
+    def __len__(self) -> int:
+        return self._settings["count"]
+
+    def add_documents(
+        self,
+        documents: Sequence[content_types.ContentType],
+        *,
+        ids: Sequence[str] | None = None,
+        metadata: Sequence[dict[str, Any] | None] | None = None,
+        max_concurrency: int = DEFAULT_EMBEDDING_CONCURRENCY,
+    ) -> None:
+        """Embeds `documents` and adds them to the index.
+
+        Args:
+            documents: The contents to embed.
+            ids: An id per document, returned by `search`. Defaults to the document's row number.
+            metadata: Optional JSON-serializable metadata per document, returned by `search`.
+            max_concurrency: The number of embedding batches in flight, see
+                `embed_content_stream`.
+        """
+        # Checked up front, so a bad call doesn't pay for embedding every document first.
+        _check_row_args(len(documents), ids, metadata)
+        start = len(self)
+        for index, vector in embed_content_stream(
+            self.model,
+            documents,
+            task_type=EmbeddingTaskType.RETRIEVAL_DOCUMENT,
+            output_dimensionality=self._settings["output_dimensionality"],
+            max_concurrency=max_concurrency,
+        ):
+            if isinstance(vector, Exception):
+                raise vector
+            self._write_row(start + index, vector)
+        self._commit_rows(start, len(documents), ids, metadata)
+
+    def add_vectors(
+        self,
+        vectors: Sequence[Sequence[float]],
+        *,
+        ids: Sequence[str] | None = None,
+        metadata: Sequence[dict[str, Any] | None] | None = None,
+    ) -> None:
+        """Adds precomputed embeddings, from the index's model, to the index.
+
+        Args:
+            vectors: An `(N, D)` array, or a sequence of N vectors.
+            ids: An id per vector, returned by `search`. Defaults to the vector's row number.
+            metadata: Optional JSON-serializable metadata per vector, returned by `search`.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        _check_row_args(len(vectors), ids, metadata)
+        start = len(self)
+        if len(vectors):
+            self._reserve(start + len(vectors), vectors.shape[1])
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            self._vectors[start : start + len(vectors)] = vectors / np.maximum(norms, 1e-12)
+        self._commit_rows(start, len(vectors), ids, metadata)
+
+    def search(
+        self, query: content_types.ContentType, k: int = 10, *, nprobe: int | None = None
+    ) -> list[SearchResult]:
+        """Returns the `k` documents most similar to `query`, best first.
+
+        Args:
+            query: The query, embedded with the `RETRIEVAL_QUERY` task type.
+            k: The number of results.
+            nprobe: With an IVF index, the number of closest clusters to search (by default
+                `DEFAULT_NPROBE`), see `build_ivf`. Pass `0` for an exact search.
+        """
+        response = embed_content(
+            self.model,
+            query,
+            task_type=EmbeddingTaskType.RETRIEVAL_QUERY,
+            output_dimensionality=self._settings["output_dimensionality"],
         )
-        embedding_dict = type(embedding_response).to_dict(embedding_response)
-        embedding_dict["embedding"] = embedding_dict["embedding"]["values"]
-        return embedding_dict
+        return self.search_by_vector(response["embedding"], k, nprobe=nprobe)
+
+    def search_by_vector(
+        self, vector: Sequence[float], k: int = 10, *, nprobe: int | None = None
+    ) -> list[SearchResult]:
+        """Returns the `k` entries with the highest cosine similarity to `vector`, best first.
+
+        See `VectorIndex.search` for the arguments.
+        """
+        count = len(self)
+        if not count or k < 1:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        if nprobe is None:
+            nprobe = self.DEFAULT_NPROBE
+        if self._ivf is not None and nprobe > 0:
+            rows = self._probe(query, nprobe)
+            scores = self._vectors[rows] @ query
+        else:
+            rows = None
+            scores = np.empty(count, dtype=np.float32)
+            for start in range(0, count, self._SEARCH_CHUNK_ROWS):
+                end = min(start + self._SEARCH_CHUNK_ROWS, count)
+                scores[start:end] = self._vectors[start:end] @ query
+
+        k = min(k, len(scores))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top_rows = top if rows is None else rows[top]
+        return self._results(top_rows, scores[top])
+
+    def build_ivf(
+        self,
+        n_lists: int | None = None,
+        *,
+        iterations: int = 10,
+        sample_size: int = 100_000,
+        seed: int = 0,
+    ) -> None:
+        """Clusters the vectors (an inverted file index), so searches only score a few clusters.
+
+        The centroids come from a spherical k-means over a sample of the vectors, then every
+        vector is assigned to its closest centroid. Vectors added later are scored by every
+        search until this is called again. Searches become approximate, see the `nprobe`
+        argument of `VectorIndex.search`.
+
+        Args:
+            n_lists: The number of clusters, by default `4 * sqrt(len(self))`.
+            iterations: The number of k-means iterations.
+            sample_size: The number of vectors the centroids are computed from.
+            seed: The seed of the sampling, and of the initial centroids.
+        """
+        count = len(self)
+        if not count:
+            raise ValueError("Invalid operation: The index is empty.")
+        if n_lists is None:
+            n_lists = int(4 * count**0.5)
+
+        rng = np.random.default_rng(seed)
+        sample = self._vectors[np.sort(rng.choice(count, min(sample_size, count), replace=False))]
+        # The initial centroids are distinct vectors of the sample.
+        n_lists = max(1, min(n_lists, len(sample)))
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            # Empty clusters keep their previous centroid.
+            filled = np.bincount(assignments, minlength=n_lists) > 0
+            norms = np.linalg.norm(sums[filled], axis=1, keepdims=True)
+            centroids[filled] = sums[filled] / np.maximum(norms, 1e-12)
+
+        assignments = np.empty(count, dtype=np.int64)
+        for start in range(0, count, self._SEARCH_CHUNK_ROWS):
+            end = min(start + self._SEARCH_CHUNK_ROWS, count)
+            assignments[start:end] = np.argmax(self._vectors[start:end] @ centroids.T, axis=1)
+        rows = np.argsort(assignments, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+
+        arrays = {"centroids": centroids, "rows": rows, "offsets": offsets}
+        for name, filename in self._IVF_FILES.items():
+            np.save(self.path / filename, arrays[name])
+        self._load_ivf()
+        self._settings["ivf_count"] = count
+        self._save_settings()
+
+    def close(self) -> None:
+        """Saves the index, and releases its files."""
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._items.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _load_ivf(self):
+        self._ivf = {
+            name: np.load(self.path / filename, mmap_mode="r")
+            for name, filename in self._IVF_FILES.items()
+        }
+
+    def _probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Returns the rows in the `nprobe` clusters nearest `query`, and the unclustered rows."""
+        centroids, rows, offsets = self._ivf["centroids"], self._ivf["rows"], self._ivf["offsets"]
+        nprobe = min(nprobe, len(centroids))
+        closest = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+        candidates = [rows[offsets[c] : offsets[c + 1]] for c in closest]
+        candidates.append(np.arange(self._settings["ivf_count"], len(self)))
+        return np.concatenate(candidates)
+
+    def _write_row(self, row: int, vector: Sequence[float]):
+        vector = np.asarray(vector, dtype=np.float32)
+        self._reserve(row + 1, len(vector))
+        self._vectors[row] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _reserve(self, rows: int, dimension: int):
+        """Makes room for `rows` vectors of `dimension`, growing the file geometrically."""
+        if self.dimension is None:
+            self._settings["dimension"] = dimension
+        elif dimension != self.dimension:
+            raise ValueError(
+                f"Invalid input: Expected vectors of dimension {self.dimension}, got {dimension}."
+            )
+        if rows <= self._settings["capacity"]:
+            return
+
+        capacity = max(rows, 2 * self._settings["capacity"], self._MIN_CAPACITY)
+        if self._vectors is not None:
+            self._vectors.flush()
+        with open(self.path / self._VECTORS_FILE, "ab") as f:
+            f.truncate(capacity * self.dimension * 4)
+        self._vectors = np.memmap(
+            self.path / self._VECTORS_FILE,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.dimension),
+        )
+        self._settings["capacity"] = capacity
+
+    def _commit_rows(
+        self,
+        start: int,
+        count: int,
+        ids: Sequence[str] | None,
+        metadata: Sequence[dict[str, Any] | None] | None,
+    ):
+        """Records the ids and metadata of `count` rows written from `start`, and saves them."""
+        if ids is None:
+            ids = [str(row) for row in range(start, start + count)]
+        if metadata is None:
+            metadata = [None] * count
+        with self._items:
+            self._items.executemany(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?)",
+                (
+                    (start + i, str(item_id), None if m is None else json.dumps(m))
+                    for i, (item_id, m) in enumerate(zip(ids, metadata))
+                ),
+            )
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._settings["count"] = start + count
+        self._save_settings()
+
+    def _results(self, rows: np.ndarray, scores: np.ndarray) -> list[SearchResult]:
+        rows = [int(row) for row in rows]
+        placeholders = ", ".join("?" * len(rows))
+        items = {
+            row: (item_id, metadata)
+            for row, item_id, metadata in self._items.execute(
+                f"SELECT row, id, metadata FROM items WHERE row IN ({placeholders})", rows
+            )
+        }
+        results = []
+        for row, score in zip(rows, scores):
+            item_id, metadata = items[row]
+            metadata = None if metadata is None else json.loads(metadata)
+            results.append(SearchResult(id=item_id, score=float(score), metadata=metadata))
+        return results
+
+    def _save_settings(self):
+        utils.write_json_atomic(self.path / self._SETTINGS_FILE, self._settings)
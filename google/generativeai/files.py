@@ -14,20 +14,40 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
 import pathlib
+import time
 import mimetypes
-from typing import Iterable
+from typing import AsyncIterable, Callable, Iterable
+import collections
 import logging
 from google.generativeai import protos
+from google.generativeai import utils
 from itertools import islice
 from io import IOBase
 
 from google.generativeai.types import file_types
+from google.generativeai.types import helper_types
 
+from google.generativeai.client import DEFAULT_UPLOAD_CHUNK_SIZE
 from google.generativeai.client import get_default_file_client
+from google.generativeai.client import get_default_file_async_client
 
-__all__ = ["upload_file", "get_file", "list_files", "delete_file"]
+__all__ = [
+    "upload_file",
+    "upload_file_async",
+    "upload_files",
+    "resume_upload",
+    "get_file",
+    "list_files",
+    "list_files_async",
+    "delete_file",
+    "delete_files",
+    "wait_all",
+    "wait_all_async",
+]
 
 mimetypes.add_type("image/webp", ".webp")
 
@@ -39,6 +59,8 @@ def upload_file(
     name: str | None = None,
     display_name: str | None = None,
     resumable: bool = True,
+    chunk_size: int | None = None,
+    checkpoint: str | os.PathLike | None = None,
 ) -> file_types.File:
     """Calls the API to upload a file using a supported file service.
 
@@ -52,12 +74,217 @@ def upload_file(
         resumable: Whether to use the resumable upload protocol. By default, this is enabled.
             See details at
             https://googleapis.github.io/google-api-python-client/docs/epy/googleapiclient.http.MediaFileUpload-class.html#resumable
+        chunk_size: The number of bytes sent per request of a resumable upload, a multiple of
+            256 KiB. If not provided, the `googleapiclient` default is used.
+        checkpoint: Optional path of a file where the progress of a resumable upload is saved
+            after each chunk. If the upload is interrupted, pass it to `resume_upload` to send
+            only the remaining bytes.
 
     Returns:
         file_types.File: The response of the uploaded file.
     """
     client = get_default_file_client()
 
+    path, mime_type, name, display_name = _prepare_upload(path, mime_type, name, display_name)
+
+    cache = file_types._get_file_cache()
+    digest = None
+    if cache is not None and _is_cacheable(path, name):
+        digest = _sha256(path)
+        cached = cache.get(digest, mime_type)
+        if cached is not None:
+            return file_types.File(cached)
+
+    response = client.create_file(
+        path=path,
+        mime_type=mime_type,
+        name=name,
+        display_name=display_name,
+        resumable=resumable,
+        chunk_size=chunk_size,
+        checkpoint=checkpoint,
+    )
+    if digest is not None:
+        cache.put(digest, mime_type, response)
+    return file_types.File(response)
+
+
+def resume_upload(checkpoint: str | os.PathLike) -> file_types.File:
+    """Continues an interrupted `upload_file` call from its `checkpoint` file.
+
+    Args:
+        checkpoint: The `checkpoint` path passed to `upload_file`.
+
+    Returns:
+        file_types.File: The response of the uploaded file.
+    """
+    client = get_default_file_client()
+    return file_types.File(client.resume_upload(checkpoint))
+
+
+async def upload_file_async(
+    path: str | pathlib.Path | os.PathLike | IOBase,
+    *,
+    mime_type: str | None = None,
+    name: str | None = None,
+    display_name: str | None = None,
+    resumable: bool = True,
+    chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+    progress: Callable[[int, int | None], None] | None = None,
+) -> file_types.File:
+    """Calls the API to upload a file, without blocking the event loop.
+
+    The file is streamed in chunks, so many uploads can run concurrently (e.g. with
+    `asyncio.gather`) without holding whole files in memory. Cancelling the task cancels the
+    upload.
+
+    Args:
+        path: The path to the file or a file-like object (e.g., BytesIO) to be uploaded.
+        mime_type: The MIME type of the file. If not provided, it will be
+            inferred from the file extension.
+        name: The name of the file in the destination (e.g., 'files/sample-image').
+            If not provided, a system generated ID will be created.
+        display_name: Optional display name of the file.
+        resumable: Whether to upload the file in chunks. If `False` the whole file is read into
+            memory and sent in a single request, which is limited to files of up to
+            `MAX_NON_RESUMABLE_UPLOAD_SIZE` (64 MiB).
+        chunk_size: The number of bytes sent per request, a multiple of 256 KiB.
+        progress: Optional callback, called after each chunk with the number of bytes sent so
+            far and the total size (or `None` if the size is unknown).
+
+    Returns:
+        file_types.File: The response of the uploaded file.
+    """
+    client = get_default_file_async_client()
+
+    path, mime_type, name, display_name = _prepare_upload(path, mime_type, name, display_name)
+
+    cache = file_types._get_file_cache()
+    digest = None
+    if cache is not None and _is_cacheable(path, name):
+        digest = await asyncio.to_thread(_sha256, path)
+        # The database is only used from worker threads, never on the event loop.
+        cached = await asyncio.to_thread(cache.get, digest, mime_type)
+        if cached is not None:
+            return file_types.File(cached)
+
+    response = await client.create_file(
+        path=path,
+        mime_type=mime_type,
+        name=name,
+        display_name=display_name,
+        resumable=resumable,
+        chunk_size=chunk_size,
+        progress=progress,
+    )
+    if digest is not None:
+        await asyncio.to_thread(cache.put, digest, mime_type, response)
+    return file_types.File(response)
+
+
+def upload_files(
+    paths: Iterable[str | pathlib.Path | os.PathLike],
+    *,
+    max_workers: int = 8,
+    dedup: bool = True,
+    resumable: bool = True,
+) -> file_types.UploadFilesResult:
+    """Uploads many files in parallel.
+
+    With `dedup=True` the SHA-256 of each file is computed locally, and files whose contents are
+    already on the service (per `File.sha256_hash` from `list_files`), or repeated in `paths`,
+    are only uploaded once.
+
+    Args:
+        paths: The paths of the files to upload. The mime types and display names are inferred
+            as in `upload_file`.
+        max_workers: The maximum number of files hashed or uploaded at once.
+        dedup: Whether to skip uploading files whose contents are already uploaded.
+        resumable: Whether to use the resumable upload protocol.
+
+    Returns:
+        file_types.UploadFilesResult: The `File`, or the exception raised, for each path in
+            input order, with aggregate counts and throughput.
+    """
+    start = time.monotonic()
+    client = get_default_file_client()
+    paths = list(paths)
+    results: list[file_types.File | Exception | None] = [None] * len(paths)
+
+    # Paths with the same contents share one upload, keyed by digest (or by index without dedup).
+    groups: dict[str | int, list[int]] = collections.defaultdict(list)
+    if dedup:
+        for index, digest in utils.iter_as_completed(_sha256, paths, max_concurrency=max_workers):
+            if isinstance(digest, Exception):
+                results[index] = digest
+            else:
+                groups[digest].append(index)
+        # Hashes finish in any order, upload (and name) each group after its first path.
+        for indices in groups.values():
+            indices.sort()
+    else:
+        for index in range(len(paths)):
+            groups[index].append(index)
+
+    existing: dict[bytes, file_types.File] = {}
+    if dedup and groups:
+        for f in list_files():
+            if f.state != protos.File.State.FAILED:
+                existing[f.sha256_hash] = f
+
+    def upload_one(key):
+        path, mime_type, _, display_name = _prepare_upload(paths[groups[key][0]], None, None, None)
+        response = client.create_file(
+            path=path, mime_type=mime_type, display_name=display_name, resumable=resumable
+        )
+        return file_types.File(response)
+
+    summary = file_types.UploadFilesResult(results)
+    to_upload = []
+    for key, indices in groups.items():
+        if dedup:
+            # The service reports the hash hex encoded, accept the raw digest too.
+            f = existing.get(key.encode()) or existing.get(bytes.fromhex(key))
+            if f is not None:
+                summary.reused += len(indices)
+                for index in indices:
+                    results[index] = f
+                continue
+        to_upload.append(key)
+
+    for i, result in utils.iter_as_completed(upload_one, to_upload, max_concurrency=max_workers):
+        indices = groups[to_upload[i]]
+        if not isinstance(result, Exception):
+            summary.uploaded += 1
+            summary.reused += len(indices) - 1
+            summary.bytes_uploaded += os.path.getsize(paths[indices[0]])
+        for index in indices:
+            results[index] = result
+
+    summary.elapsed = time.monotonic() - start
+    return summary
+
+
+def _is_cacheable(path: pathlib.Path | IOBase, name: str | None) -> bool:
+    # A file-like object can't be hashed without consuming it, and a reused upload can't
+    # take on a new name.
+    return name is None and not isinstance(path, IOBase)
+
+
+def _sha256(path: str | pathlib.Path | os.PathLike):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _prepare_upload(
+    path: str | pathlib.Path | os.PathLike | IOBase,
+    mime_type: str | None,
+    name: str | None,
+    display_name: str | None,
+):
     if isinstance(path, IOBase):
         if mime_type is None:
             raise ValueError(
@@ -82,18 +309,27 @@ def upload_file(
     if name is not None and "/" not in name:
         name = f"files/{name}"
 
-    response = client.create_file(
-        path=path, mime_type=mime_type, name=name, display_name=display_name, resumable=resumable
-    )
-    return file_types.File(response)
+    return path, mime_type, name, display_name
 
 
 def list_files(page_size=100) -> Iterable[file_types.File]:
-    """Calls the API to list files using a supported file service."""
+    """Calls the API to list files using a supported file service.
+
+    The next page is fetched in the background while the current one is consumed.
+    """
     client = get_default_file_client()
 
     response = client.list_files(protos.ListFilesRequest(page_size=page_size))
-    for proto in response:
+    for proto in utils.iter_prefetched(response, buffer_size=page_size):
+        yield file_types.File(proto)
+
+
+async def list_files_async(page_size=100) -> AsyncIterable[file_types.File]:
+    """This is the async version of `files.list_files`."""
+    client = get_default_file_async_client()
+
+    response = await client.list_files(protos.ListFilesRequest(page_size=page_size))
+    async for proto in utils.aiter_prefetched(response, buffer_size=page_size):
         yield file_types.File(proto)
 
 
@@ -107,10 +343,127 @@ def get_file(name: str) -> file_types.File:
 
 def delete_file(name: str | file_types.File | protos.File):
     """Calls the API to permanently delete a specified file using a supported file service."""
-    if isinstance(name, (file_types.File, protos.File)):
-        name = name.name
-    elif "/" not in name:
-        name = f"files/{name}"
+    name = _file_name(name)
     request = protos.DeleteFileRequest(name=name)
     client = get_default_file_client()
     client.delete_file(request=request)
+
+    cache = file_types._get_file_cache()
+    if cache is not None:
+        cache.discard(name)
+
+
+def delete_files(
+    names: Iterable[str | file_types.File | protos.File], *, max_concurrency: int = 8
+) -> helper_types.DeleteSummary:
+    """Deletes many files concurrently.
+
+    Files that are already gone are reported in `DeleteSummary.not_found` rather than as errors,
+    and a failure to delete one file doesn't stop the others.
+
+    Args:
+        names: The files to delete, as names (e.g. 'files/abc' or 'abc') or `File` objects.
+        max_concurrency: The maximum number of delete calls in flight at once.
+
+    Returns:
+        helper_types.DeleteSummary: The deleted, already deleted, and failed file names.
+    """
+    client = get_default_file_client()
+    cache = file_types._get_file_cache()
+
+    def delete_one(name):
+        client.delete_file(request=protos.DeleteFileRequest(name=name))
+        if cache is not None:
+            cache.discard(name)
+
+    return utils.delete_all(
+        delete_one, [_file_name(name) for name in names], max_concurrency=max_concurrency
+    )
+
+
+def _file_name(name: str | file_types.File | protos.File) -> str:
+    if isinstance(name, (file_types.File, protos.File)):
+        return name.name
+    elif "/" not in name:
+        return f"files/{name}"
+    return name
+
+
+def wait_all(
+    files: Iterable[file_types.File | protos.File],
+    *,
+    timeout: float | None = 600.0,
+    poll: Iterable[float] | None = None,
+) -> list[file_types.File]:
+    """Waits for the service to finish processing all of `files`.
+
+    Each round of polling is a single `list_files` sweep rather than a `get_file` call per file.
+
+    Args:
+        files: The files to wait for, e.g. the results of `upload_file`.
+        timeout: The maximum number of seconds to wait, or `None` to wait forever.
+        poll: The delays between sweeps. By default these grow exponentially from 1 to 30 seconds.
+
+    Returns:
+        The updated files, in input order. Files whose processing failed are returned with
+        their `FAILED` state rather than raising, check `File.state` and `File.error`.
+
+    Raises:
+        TimeoutError: If some files are still processing after the `timeout`, or `poll` runs out.
+    """
+    files = [file_types.File(f) for f in files]
+    delays = iter(file_types._default_poll() if poll is None else poll)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    pending = _pending_files(files)
+    while pending:
+        file_types._sleep(file_types._next_delay(delays, deadline, list(pending)))
+
+        missing = dict(pending)
+        for f in list_files():
+            index = missing.pop(f.name, None)
+            if index is not None:
+                files[index] = f
+            if not missing:
+                break
+        # Only files the sweep didn't return (e.g. listed on a later page) are fetched one by one.
+        for name, index in missing.items():
+            files[index] = get_file(name)
+
+        pending = _pending_files(files)
+    return files
+
+
+async def wait_all_async(
+    files: Iterable[file_types.File | protos.File],
+    *,
+    timeout: float | None = 600.0,
+    poll: Iterable[float] | None = None,
+) -> list[file_types.File]:
+    """This is the async version of `files.wait_all`."""
+    client = get_default_file_async_client()
+    files = [file_types.File(f) for f in files]
+    delays = iter(file_types._default_poll() if poll is None else poll)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    pending = _pending_files(files)
+    while pending:
+        await file_types._sleep_async(file_types._next_delay(delays, deadline, list(pending)))
+
+        missing = dict(pending)
+        async for f in list_files_async():
+            index = missing.pop(f.name, None)
+            if index is not None:
+                files[index] = f
+            if not missing:
+                break
+        for name, index in missing.items():
+            files[index] = file_types.File(await client.get_file(name=name))
+
+        pending = _pending_files(files)
+    return files
+
+
+def _pending_files(files: list[file_types.File]) -> dict[str, int]:
+    done = (protos.File.State.ACTIVE, protos.File.State.FAILED)
+    return {f.name: index for index, f in enumerate(files) if f.state not in done}
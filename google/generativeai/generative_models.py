@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import collections
+from collections.abc import AsyncIterator, Iterable, Iterator
+import hashlib
 import textwrap
+import threading
+import warnings
 from typing import Any, Union, overload
 import reprlib
 
@@ -15,6 +19,7 @@ from google.generativeai import protos
 from google.generativeai import client
 
 from google.generativeai import caching
+from google.generativeai import utils
 from google.generativeai.types import content_types
 from google.generativeai.types import generation_types
 from google.generativeai.types import helper_types
@@ -23,6 +28,11 @@ from google.generativeai.types import safety_types
 _USER_ROLE = "user"
 _MODEL_ROLE = "model"
 
+# The smallest context the API accepts for a `CachedContent`.
+DEFAULT_MIN_CACHE_TOKENS = 32768
+# How many prefixes `auto_cache` remembers the size of.
+_AUTO_CACHE_MAX_PREFIXES = 128
+
 
 class GenerativeModel:
     """
@@ -68,6 +78,17 @@ class GenerativeModel:
              by the api before being returned.
          generation_config: A `genai.GenerationConfig` setting the default generation parameters to
              use.
+         auto_cache: If True, a leading run of contents that repeats across requests (with the
+             `system_instruction`, `tools` and `tool_config`) is stored in a `caching.CachedContent`
+             once it reaches `min_cache_tokens`. Later requests starting with it only send the
+             remaining contents, and reference the cache. The caches are kept alive while in use
+             by a `caching.CachedContentManager`, by default one shared by every model in the
+             process. Caching requires a model name with an explicit version suffix, like
+             "gemini-1.5-flash-002". If a cache can't be created the request is sent uncached,
+             with a warning.
+         min_cache_tokens: The size, in tokens, a prefix needs for `auto_cache` to cache it.
+         cache_manager: The `caching.CachedContentManager` used by `auto_cache`, instead of the
+             shared default.
     """
 
     def __init__(
@@ -78,6 +99,9 @@ class GenerativeModel:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         system_instruction: content_types.ContentType | None = None,
+        auto_cache: bool = False,
+        min_cache_tokens: int = DEFAULT_MIN_CACHE_TOKENS,
+        cache_manager: caching.CachedContentManager | None = None,
     ):
         if "/" not in model_name:
             model_name = "models/" + model_name
@@ -98,6 +122,17 @@ class GenerativeModel:
 
         self._client = None
         self._async_client = None
+        self._request_template: protos.GenerateContentRequest | None = None
+
+        self._auto_cache = auto_cache
+        self._min_cache_tokens = min_cache_tokens
+        if auto_cache and cache_manager is None:
+            cache_manager = caching._get_default_manager()
+        self._cache_manager = cache_manager
+        self._auto_cache_lock = threading.Lock()
+        # The prefix keys of the last request, and whether each prefix seen so far is big enough.
+        self._previous_prefix_keys: list[str] = []
+        self._cacheable_prefixes: collections.OrderedDict[str, bool] = collections.OrderedDict()
 
     @property
     def cached_content(self) -> str:
@@ -142,37 +177,161 @@ class GenerativeModel:
                 "`tools`, `tool_config`, `system_instruction` cannot be set on a model instantiated with `cached_content` as its context."
             )
 
-        tools_lib = self._get_tools_lib(tools)
-        if tools_lib is not None:
-            tools_lib = tools_lib.to_proto()
+        # Start from a copy of the model's defaults, already converted to protos, and only
+        # convert the per-call overrides.
+        request = protos.GenerateContentRequest()
+        type(request).pb(request).CopyFrom(type(request).pb(self._get_request_template()))
 
-        if tool_config is None:
-            tool_config = self._tool_config
-        else:
-            tool_config = content_types.to_tool_config(tool_config)
+        request.contents = content_types.to_contents(contents)
 
-        contents = content_types.to_contents(contents)
+        if tools is not None and tools is not self._tools:
+            request.tools = content_types.to_function_library(tools).to_proto()
+
+        if tool_config is not None:
+            request.tool_config = content_types.to_tool_config(tool_config)
 
         generation_config = generation_types.to_generation_config_dict(generation_config)
-        merged_gc = self._generation_config.copy()
-        merged_gc.update(generation_config)
+        if generation_config:
+            merged_gc = self._generation_config.copy()
+            merged_gc.update(generation_config)
+            request.generation_config = merged_gc
 
         safety_settings = safety_types.to_easy_safety_dict(safety_settings)
-        merged_ss = self._safety_settings.copy()
-        merged_ss.update(safety_settings)
-        merged_ss = safety_types.normalize_safety_settings(merged_ss)
+        if safety_settings:
+            merged_ss = self._safety_settings.copy()
+            merged_ss.update(safety_settings)
+            request.safety_settings = safety_types.normalize_safety_settings(merged_ss)
+
+        return request
+
+    def _get_request_template(self) -> protos.GenerateContentRequest:
+        """Returns the parts of the request that are the same for every call, built once."""
+        if self._request_template is None:
+            tools_lib = self._tools.to_proto() if self._tools is not None else None
+            self._request_template = protos.GenerateContentRequest(
+                model=self._model_name,
+                generation_config=self._generation_config,
+                safety_settings=safety_types.normalize_safety_settings(self._safety_settings),
+                tools=tools_lib,
+                tool_config=self._tool_config,
+                system_instruction=self._system_instruction,
+                cached_content=self.cached_content,
+            )
+        return self._request_template
 
-        return protos.GenerateContentRequest(
-            model=self._model_name,
-            contents=contents,
-            generation_config=merged_gc,
-            safety_settings=merged_ss,
-            tools=tools_lib,
-            tool_config=tool_config,
-            system_instruction=self._system_instruction,
-            cached_content=self.cached_content,
+    def _apply_auto_cache(
+        self, request: protos.GenerateContentRequest
+    ) -> protos.GenerateContentRequest:
+        """With `auto_cache`, moves a stable prefix of the request's contents to a `CachedContent`.
+
+        The prefix used is the longest one already known to be big enough, or else the prefix shared
+        with the previous request, once its tokens have been counted. The last content always stays
+        in the request. If counting or caching fails, a warning is issued, the prefix isn't tried
+        again, and the request is sent as it is.
+        """
+        if not self._auto_cache or request.cached_content or len(request.contents) < 2:
+            return request
+
+        keys, length, uncounted = self._find_cached_prefix(request)
+        try:
+            if uncounted:
+                tokens = self._count_prefix_tokens(request, uncounted)
+                length = self._record_prefix_size(keys[uncounted - 1], uncounted, tokens)
+            if not length:
+                return request
+            cached_content = self._cache_manager.get_or_create(
+                **_cached_content_args(request, length)
+            )
+        except google.api_core.exceptions.GoogleAPICallError as e:
+            # The prefix that was being counted or cached.
+            self._auto_cache_failed(keys[max(length, uncounted) - 1], e)
+            return request
+
+        return _with_cached_content(request, cached_content, length)
+
+    async def _apply_auto_cache_async(
+        self, request: protos.GenerateContentRequest
+    ) -> protos.GenerateContentRequest:
+        """This is the async version of `GenerativeModel._apply_auto_cache`."""
+        if not self._auto_cache or request.cached_content or len(request.contents) < 2:
+            return request
+
+        keys, length, uncounted = self._find_cached_prefix(request)
+        try:
+            if uncounted:
+                tokens = await self._count_prefix_tokens_async(request, uncounted)
+                length = self._record_prefix_size(keys[uncounted - 1], uncounted, tokens)
+            if not length:
+                return request
+            cached_content = await self._cache_manager.get_or_create_async(
+                **_cached_content_args(request, length)
+            )
+        except google.api_core.exceptions.GoogleAPICallError as e:
+            # The prefix that was being counted or cached.
+            self._auto_cache_failed(keys[max(length, uncounted) - 1], e)
+            return request
+
+        return _with_cached_content(request, cached_content, length)
+
+    def _find_cached_prefix(
+        self, request: protos.GenerateContentRequest
+    ) -> tuple[list[str], int, int]:
+        """Finds the prefix of the request's contents to cache.
+
+        Returns the prefix keys, the length of the longest prefix known to be big enough, and the
+        length of the prefix shared with the previous request if its size still has to be counted
+        (else 0).
+        """
+        keys = _prefix_keys(request)[:-1]
+        with self._auto_cache_lock:
+            previous, self._previous_prefix_keys = self._previous_prefix_keys, keys
+            length = next(
+                (n for n in range(len(keys), 0, -1) if self._cacheable_prefixes.get(keys[n - 1])),
+                0,
+            )
+            shared = 0
+            for key, previous_key in zip(keys, previous):
+                if key != previous_key:
+                    break
+                shared += 1
+            if length or not shared or keys[shared - 1] in self._cacheable_prefixes:
+                shared = 0
+        return keys, length, shared
+
+    def _record_prefix_size(self, key: str, length: int, tokens: int) -> int:
+        """Remembers whether the prefix is big enough to cache, returns its length if it is."""
+        cacheable = tokens >= self._min_cache_tokens
+        self._set_cacheable(key, cacheable)
+        return length if cacheable else 0
+
+    def _auto_cache_failed(self, key: str, error: Exception):
+        self._set_cacheable(key, False)
+        warnings.warn(
+            f"`auto_cache` could not cache the context of a request to {self._model_name}, "
+            f"sending it uncached: {error}"
         )
 
+    def _set_cacheable(self, key: str, cacheable: bool):
+        with self._auto_cache_lock:
+            self._cacheable_prefixes[key] = cacheable
+            self._cacheable_prefixes.move_to_end(key)
+            while len(self._cacheable_prefixes) > _AUTO_CACHE_MAX_PREFIXES:
+                self._cacheable_prefixes.popitem(last=False)
+
+    def _count_prefix_tokens(self, request: protos.GenerateContentRequest, length: int) -> int:
+        if self._client is None:
+            self._client = client.get_default_generative_client()
+        response = self._client.count_tokens(_count_prefix_request(request, length))
+        return response.total_tokens
+
+    async def _count_prefix_tokens_async(
+        self, request: protos.GenerateContentRequest, length: int
+    ) -> int:
+        if self._async_client is None:
+            self._async_client = client.get_default_generative_async_client()
+        response = await self._async_client.count_tokens(_count_prefix_request(request, length))
+        return response.total_tokens
+
     def _get_tools_lib(
         self, tools: content_types.FunctionLibraryType
     ) -> content_types.FunctionLibrary | None:
@@ -241,6 +400,7 @@ class GenerativeModel:
         generation_config: generation_types.GenerationConfigType | None = None,
         safety_settings: safety_types.SafetySettingOptions | None = None,
         stream: bool = False,
+        retain_chunks: bool = True,
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
@@ -296,6 +456,9 @@ class GenerativeModel:
             generation_config: Overrides for the model's generation config.
             safety_settings: Overrides for the model's safety settings.
             stream: If True, yield response chunks as they are generated.
+            retain_chunks: With `stream=True`, set this to False to discard each chunk once it has been
+                yielded and merged into the response. This bounds the memory used by long streams, but the
+                response can then only be iterated over once.
             tools: `protos.Tools` more info coming soon.
             request_options: Options for the request.
         """
@@ -310,9 +473,52 @@ class GenerativeModel:
             tool_config=tool_config,
         )
 
+        return self._generate_content(
+            request, stream=stream, retain_chunks=retain_chunks, request_options=request_options
+        )
+
+    async def generate_content_async(
+        self,
+        contents: content_types.ContentsType,
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        stream: bool = False,
+        retain_chunks: bool = True,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> generation_types.AsyncGenerateContentResponse:
+        """The async version of `GenerativeModel.generate_content`."""
+        if not contents:
+            raise TypeError("contents must not be empty")
+
+        request = self._prepare_request(
+            contents=contents,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            tools=tools,
+            tool_config=tool_config,
+        )
+
+        return await self._generate_content_async(
+            request, stream=stream, retain_chunks=retain_chunks, request_options=request_options
+        )
+
+    def _generate_content(
+        self,
+        request: protos.GenerateContentRequest,
+        *,
+        stream: bool = False,
+        retain_chunks: bool = True,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> generation_types.GenerateContentResponse:
+        """Sends a request built by `_prepare_request`."""
         if request.contents and not request.contents[-1].role:
             request.contents[-1].role = _USER_ROLE
 
+        request = self._apply_auto_cache(request)
+
         if self._client is None:
             self._client = client.get_default_generative_client()
 
@@ -326,7 +532,9 @@ class GenerativeModel:
                         request,
                         **request_options,
                     )
-                return generation_types.GenerateContentResponse.from_iterator(iterator)
+                return generation_types.GenerateContentResponse.from_iterator(
+                    iterator, retain_chunks=retain_chunks
+                )
             else:
                 response = self._client.generate_content(
                     request,
@@ -341,32 +549,20 @@ class GenerativeModel:
                 )
             raise
 
-    async def generate_content_async(
+    async def _generate_content_async(
         self,
-        contents: content_types.ContentsType,
+        request: protos.GenerateContentRequest,
         *,
-        generation_config: generation_types.GenerationConfigType | None = None,
-        safety_settings: safety_types.SafetySettingOptions | None = None,
         stream: bool = False,
-        tools: content_types.FunctionLibraryType | None = None,
-        tool_config: content_types.ToolConfigType | None = None,
+        retain_chunks: bool = True,
         request_options: helper_types.RequestOptionsType | None = None,
     ) -> generation_types.AsyncGenerateContentResponse:
-        """The async version of `GenerativeModel.generate_content`."""
-        if not contents:
-            raise TypeError("contents must not be empty")
-
-        request = self._prepare_request(
-            contents=contents,
-            generation_config=generation_config,
-            safety_settings=safety_settings,
-            tools=tools,
-            tool_config=tool_config,
-        )
-
+        """Sends a request built by `_prepare_request`."""
         if request.contents and not request.contents[-1].role:
             request.contents[-1].role = _USER_ROLE
 
+        request = await self._apply_auto_cache_async(request)
+
         if self._async_client is None:
             self._async_client = client.get_default_generative_async_client()
 
@@ -380,7 +576,9 @@ class GenerativeModel:
                         request,
                         **request_options,
                     )
-                return await generation_types.AsyncGenerateContentResponse.from_aiterator(iterator)
+                return await generation_types.AsyncGenerateContentResponse.from_aiterator(
+                    iterator, retain_chunks=retain_chunks
+                )
             else:
                 response = await self._async_client.generate_content(
                     request,
@@ -395,6 +593,150 @@ class GenerativeModel:
                 )
             raise
 
+    def generate_content_as_completed(
+        self,
+        contents: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        max_concurrency: int = 8,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> Iterator[tuple[int, generation_types.GenerateContentResponse | Exception]]:
+        """Sends many independent prompts, yielding `(index, response)` pairs as they complete.
+
+        >>> model = genai.GenerativeModel('models/gemini-1.5-flash')
+        >>> prompts = ['Tell me a joke', 'Tell me a story']
+        >>> for index, response in model.generate_content_as_completed(prompts):
+        ...     print(prompts[index], response.text)
+
+        If a request fails, its exception is yielded in place of the response, the other requests
+        continue.
+
+        Arguments:
+            contents: An iterable of prompts, each is passed as the `contents` of
+                `GenerativeModel.generate_content`.
+            generation_config: Overrides for the model's generation config, for every request.
+            safety_settings: Overrides for the model's safety settings, for every request.
+            tools: Overrides for the model's tools, for every request.
+            tool_config: Overrides for the model's tool config, for every request.
+            max_concurrency: The maximum number of requests in flight at once.
+            request_options: Options for each request.
+        """
+        # Resolve the client before fanning out, so the threads share one.
+        if self._client is None:
+            self._client = client.get_default_generative_client()
+
+        # Convert the shared overrides once, instead of once per prompt.
+        template = self._prepare_request(
+            contents=[],
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            tools=tools,
+            tool_config=tool_config,
+        )
+
+        def generate(prompt):
+            request = _with_contents(template, prompt)
+            return self._generate_content(request, request_options=request_options)
+
+        for index, result in utils.iter_as_completed(
+            generate, contents, max_concurrency=max_concurrency
+        ):
+            yield index, result
+
+    async def generate_content_as_completed_async(
+        self,
+        contents: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        max_concurrency: int = 8,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> AsyncIterator[tuple[int, generation_types.AsyncGenerateContentResponse | Exception]]:
+        """The async version of `GenerativeModel.generate_content_as_completed`."""
+        # Resolve the client before fanning out, so the tasks share one.
+        if self._async_client is None:
+            self._async_client = client.get_default_generative_async_client()
+
+        # Convert the shared overrides once, instead of once per prompt.
+        template = self._prepare_request(
+            contents=[],
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            tools=tools,
+            tool_config=tool_config,
+        )
+
+        async def generate(prompt):
+            request = _with_contents(template, prompt)
+            return await self._generate_content_async(request, request_options=request_options)
+
+        async for index, result in utils.aiter_as_completed(
+            generate, contents, max_concurrency=max_concurrency
+        ):
+            yield index, result
+
+    def generate_content_batch(
+        self,
+        contents: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        max_concurrency: int = 8,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> list[generation_types.GenerateContentResponse | Exception]:
+        """Sends many independent prompts concurrently and returns the responses in input order.
+
+        >>> model = genai.GenerativeModel('models/gemini-1.5-flash')
+        >>> responses = model.generate_content_batch(['Tell me a joke', 'Tell me a story'])
+
+        If a request fails, its exception is returned in place of the response. The arguments are
+        the same as `GenerativeModel.generate_content_as_completed`.
+        """
+        results = {}
+        for index, result in self.generate_content_as_completed(
+            contents,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            tools=tools,
+            tool_config=tool_config,
+            max_concurrency=max_concurrency,
+            request_options=request_options,
+        ):
+            results[index] = result
+        return [results[index] for index in range(len(results))]
+
+    async def generate_content_batch_async(
+        self,
+        contents: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        max_concurrency: int = 8,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> list[generation_types.AsyncGenerateContentResponse | Exception]:
+        """The async version of `GenerativeModel.generate_content_batch`."""
+        results = {}
+        async for index, result in self.generate_content_as_completed_async(
+            contents,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            tools=tools,
+            tool_config=tool_config,
+            max_concurrency=max_concurrency,
+            request_options=request_options,
+        ):
+            results[index] = result
+        return [results[index] for index in range(len(results))]
+
     # fmt: off
     def count_tokens(
         self,
@@ -478,6 +820,76 @@ class GenerativeModel:
         )
 
 
+def _count_prefix_request(
+    request: protos.GenerateContentRequest, length: int
+) -> protos.CountTokensRequest:
+    prefix_request = protos.GenerateContentRequest(
+        model=request.model,
+        contents=list(request.contents)[:length],
+        system_instruction=request.system_instruction,
+        tools=request.tools,
+        tool_config=request.tool_config,
+    )
+    return protos.CountTokensRequest(model=request.model, generate_content_request=prefix_request)
+
+
+def _cached_content_args(request: protos.GenerateContentRequest, length: int) -> dict[str, Any]:
+    """The `CachedContentManager.get_or_create` arguments caching the request's first contents."""
+    return dict(
+        model=request.model,
+        system_instruction=(
+            request.system_instruction if "system_instruction" in request else None
+        ),
+        contents=list(request.contents)[:length],
+        tools=list(request.tools) or None,
+        tool_config=request.tool_config if "tool_config" in request else None,
+    )
+
+
+def _with_contents(
+    template: protos.GenerateContentRequest, contents: content_types.ContentsType
+) -> protos.GenerateContentRequest:
+    if not contents:
+        raise TypeError("contents must not be empty")
+    request = protos.GenerateContentRequest()
+    type(request).pb(request).CopyFrom(type(template).pb(template))
+    request.contents = content_types.to_contents(contents)
+    return request
+
+
+def _with_cached_content(
+    request: protos.GenerateContentRequest,
+    cached_content: caching.CachedContent,
+    length: int,
+) -> protos.GenerateContentRequest:
+    # The cache holds the context, the request only the rest of the conversation.
+    cached_request = protos.GenerateContentRequest()
+    type(request).pb(cached_request).CopyFrom(type(request).pb(request))
+    cached_request.contents = list(request.contents)[length:]
+    cached_request.cached_content = cached_content.name
+    cached_request.system_instruction = None
+    cached_request.tools = []
+    cached_request.tool_config = None
+    return cached_request
+
+
+def _prefix_keys(request: protos.GenerateContentRequest) -> list[str]:
+    """Returns a key for each prefix of the request's contents, covering the cacheable context."""
+    context = protos.GenerateContentRequest(
+        model=request.model,
+        system_instruction=request.system_instruction,
+        tools=request.tools,
+        tool_config=request.tool_config,
+    )
+    digest = hashlib.sha256(type(context).pb(context).SerializeToString(deterministic=True))
+    keys = []
+    for content in request.contents:
+        data = type(content).pb(content).SerializeToString(deterministic=True)
+        digest.update(hashlib.sha256(data).digest())
+        keys.append(digest.hexdigest())
+    return keys
+
+
 class ChatSession:
     """Contains an ongoing conversation with the model.
 
@@ -516,6 +928,7 @@ class ChatSession:
         generation_config: generation_types.GenerationConfigType = None,
         safety_settings: safety_types.SafetySettingOptions = None,
         stream: bool = False,
+        retain_chunks: bool = True,
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
@@ -550,6 +963,8 @@ class ChatSession:
              generation_config: Overrides for the model's generation config.
              safety_settings: Overrides for the model's safety settings.
              stream: If True, yield response chunks as they are generated.
+             retain_chunks: With `stream=True`, set this to False to discard each chunk once it has
+                 been yielded. See `GenerativeModel.generate_content`.
         """
         if request_options is None:
             request_options = {}
@@ -580,6 +995,7 @@ class ChatSession:
             generation_config=generation_config,
             safety_settings=safety_settings,
             stream=stream,
+            retain_chunks=retain_chunks,
             tools=tools_lib,
             tool_config=tool_config,
             request_options=request_options,
@@ -675,6 +1091,7 @@ class ChatSession:
         generation_config: generation_types.GenerationConfigType = None,
         safety_settings: safety_types.SafetySettingOptions = None,
         stream: bool = False,
+        retain_chunks: bool = True,
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
@@ -709,6 +1126,7 @@ class ChatSession:
             generation_config=generation_config,
             safety_settings=safety_settings,
             stream=stream,
+            retain_chunks=retain_chunks,
             tools=tools_lib,
             tool_config=tool_config,
             request_options=request_options,
@@ -15,13 +15,15 @@
 from __future__ import annotations
 
 import typing
-from typing import Any, Literal
+from typing import Any, Iterable, Literal
 
 import google.ai.generativelanguage as glm
 
 from google.generativeai import protos
 from google.generativeai import operations
+from google.generativeai import utils
 from google.generativeai.client import get_default_model_client
+from google.generativeai.client import get_default_model_async_client
 from google.generativeai.types import model_types
 from google.generativeai.types import helper_types
 from google.api_core import operation
@@ -186,6 +188,8 @@ def list_models(
         pprint.pprint(model)
     ```
 
+    The next page is fetched in the background while the current one is consumed.
+
     Args:
         page_size: How many `types.Models` to fetch per page (api call).
         client: You may pass a `glm.ModelServiceClient` instead of using the default client.
@@ -201,7 +205,27 @@ def list_models(
     if client is None:
         client = get_default_model_client()
 
-    for model in client.list_models(page_size=page_size, **request_options):
+    response = client.list_models(page_size=page_size, **request_options)
+    for model in utils.iter_prefetched(response, buffer_size=page_size):
+        model = type(model).to_dict(model)
+        yield model_types.Model(**model)
+
+
+async def list_models_async(
+    *,
+    page_size: int | None = 50,
+    client: glm.ModelServiceAsyncClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+) -> model_types.AsyncModelsIterable:
+    """This is the async version of `models.list_models`."""
+    if request_options is None:
+        request_options = {}
+
+    if client is None:
+        client = get_default_model_async_client()
+
+    response = await client.list_models(page_size=page_size, **request_options)
+    async for model in utils.aiter_prefetched(response, buffer_size=page_size):
         model = type(model).to_dict(model)
         yield model_types.Model(**model)
 
@@ -220,6 +244,8 @@ def list_tuned_models(
         pprint.pprint(model)
     ```
 
+    The next page is fetched in the background while the current one is consumed.
+
     Args:
         page_size: How many `types.Models` to fetch per page (api call).
         client: You may pass a `glm.ModelServiceClient` instead of using the default client.
@@ -234,10 +260,33 @@ def list_tuned_models(
     if client is None:
         client = get_default_model_client()
 
-    for model in client.list_tuned_models(
+    response = client.list_tuned_models(
         page_size=page_size,
         **request_options,
-    ):
+    )
+    for model in utils.iter_prefetched(response, buffer_size=page_size):
+        model = type(model).to_dict(model)
+        yield model_types.decode_tuned_model(model)
+
+
+async def list_tuned_models_async(
+    *,
+    page_size: int | None = 50,
+    client: glm.ModelServiceAsyncClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+) -> model_types.AsyncTunedModelsIterable:
+    """This is the async version of `models.list_tuned_models`."""
+    if request_options is None:
+        request_options = {}
+
+    if client is None:
+        client = get_default_model_async_client()
+
+    response = await client.list_tuned_models(
+        page_size=page_size,
+        **request_options,
+    )
+    async for model in utils.aiter_prefetched(response, buffer_size=page_size):
         model = type(model).to_dict(model)
         yield model_types.decode_tuned_model(model)
 
@@ -465,3 +514,37 @@ def delete_tuned_model(
 
     name = model_types.make_model_name(tuned_model)
     client.delete_tuned_model(name=name, **request_options)
+
+
+def delete_tuned_models(
+    tuned_models: Iterable[model_types.TunedModelNameOptions],
+    *,
+    max_concurrency: int = 8,
+    client: glm.ModelServiceClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+) -> helper_types.DeleteSummary:
+    """Calls the API to delete many tuned models concurrently.
+
+    Models that are already gone are reported in `DeleteSummary.not_found` rather than as
+    errors, and a failure to delete one model doesn't stop the others.
+
+    Args:
+        tuned_models: The tuned models to delete, as names or `TunedModel` objects.
+        max_concurrency: The maximum number of delete calls in flight at once.
+        client: You may pass a `glm.ModelServiceClient` instead of using the default client.
+        request_options: Options for each request.
+
+    Returns:
+        helper_types.DeleteSummary: The deleted, already deleted, and failed model names.
+    """
+    if request_options is None:
+        request_options = {}
+
+    if client is None:
+        client = get_default_model_client()
+
+    def delete_one(name):
+        client.delete_tuned_model(name=name, **request_options)
+
+    names = [model_types.make_model_name(tuned_model) for tuned_model in tuned_models]
+    return utils.delete_all(delete_one, names, max_concurrency=max_concurrency)
@@ -19,6 +19,7 @@ from typing import AsyncIterable, Iterable, Optional
 
 import google.ai.generativelanguage as glm
 from google.generativeai import protos
+from google.generativeai import utils
 
 from google.generativeai.client import get_default_retriever_client
 from google.generativeai.client import get_default_retriever_async_client
@@ -218,7 +219,8 @@ def list_corpora(
         request_options: Options for the request.
 
     Return:
-        Paginated list of `Corpora`.
+        Paginated list of `Corpora`, the next page is fetched in the background while the
+        current one is consumed.
     """
     if request_options is None:
         request_options = {}
@@ -227,7 +229,8 @@ def list_corpora(
         client = get_default_retriever_client()
 
     request = protos.ListCorporaRequest(page_size=page_size)
-    for corpus in client.list_corpora(request, **request_options):
+    response = client.list_corpora(request, **request_options)
+    for corpus in utils.iter_prefetched(response, buffer_size=page_size):
         corpus = type(corpus).to_dict(corpus)
         idecode_time(corpus, "create_time")
         idecode_time(corpus, "update_time")
@@ -248,7 +251,8 @@ async def list_corpora_async(
         client = get_default_retriever_async_client()
 
     request = protos.ListCorporaRequest(page_size=page_size)
-    async for corpus in await client.list_corpora(request, **request_options):
+    response = await client.list_corpora(request, **request_options)
+    async for corpus in utils.aiter_prefetched(response, buffer_size=page_size):
         corpus = type(corpus).to_dict(corpus)
         idecode_time(corpus, "create_time")
         idecode_time(corpus, "update_time")
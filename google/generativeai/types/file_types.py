@@ -14,18 +14,105 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import datetime
-from typing import Any, Union
+import hashlib
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Iterator, Union
 from typing_extensions import TypedDict
 
+from google.api_core import retry
 from google.rpc.status_pb2 import Status
 from google.generativeai.client import get_default_file_client
+from google.generativeai.client import get_default_file_async_client
+from google.generativeai.client import get_default_api_key
+from google.generativeai.client import get_default_file_cache_path
 
 from google.generativeai import protos
 
 import pprint
 
 
+class _FileCache:
+    """Maps the contents of local files to the files they were uploaded as.
+
+    Entries are kept in a sqlite database, keyed by the file's SHA-256 and mime type, and by a
+    hash of the API key since uploaded files are only visible to their own project. An entry
+    is only returned while the uploaded file has more than `min_ttl` seconds left before its
+    `expiration_time`, so it won't expire while a request that uses it is in flight.
+    """
+
+    def __init__(self, path: str | os.PathLike, api_key: str | None, min_ttl: float = 60 * 60):
+        path = pathlib.Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.scope = hashlib.sha256((api_key or "").encode()).hexdigest()
+        self.min_ttl = min_ttl
+        self._lock = threading.Lock()
+        # Uploads run from many threads, `_lock` serializes the use of the one connection.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS files (scope TEXT, sha256 TEXT, mime_type TEXT, "
+                "name TEXT, expiration REAL, file BLOB, PRIMARY KEY (scope, sha256, mime_type))"
+            )
+
+    def get(self, sha256: str, mime_type: str | None) -> protos.File | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT file FROM files WHERE scope = ? AND sha256 = ? AND mime_type IS ? "
+                "AND expiration > ?",
+                (self.scope, sha256, mime_type, time.time() + self.min_ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        return protos.File.deserialize(row[0])
+
+    def put(self, sha256: str, mime_type: str | None, file: protos.File):
+        if "expiration_time" not in file:
+            return
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.scope,
+                    sha256,
+                    mime_type,
+                    file.name,
+                    file.expiration_time.timestamp(),
+                    protos.File.serialize(file),
+                ),
+            )
+
+    def discard(self, name: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM files WHERE scope = ? AND name = ?", (self.scope, name))
+
+
+_file_caches: dict[tuple[pathlib.Path, str | None], _FileCache] = {}
+_file_caches_lock = threading.Lock()
+
+
+def _get_file_cache() -> _FileCache | None:
+    """Returns the cache enabled with `genai.configure(file_cache=...)`, or `None`.
+
+    The database is opened on first use, one per path and API key.
+    """
+    path = get_default_file_cache_path()
+    if path is None:
+        return None
+    key = (path, get_default_api_key())
+    with _file_caches_lock:
+        cache = _file_caches.get(key)
+        if cache is None:
+            cache = _file_caches[key] = _FileCache(*key)
+        return cache
+
+
 class File:
     def __init__(self, proto: protos.File | File | dict):
         if isinstance(proto, File):
@@ -107,6 +194,113 @@ class File:
     def delete(self):
         client = get_default_file_client()
         client.delete_file(name=self.name)
+        cache = _get_file_cache()
+        if cache is not None:
+            cache.discard(self.name)
+
+    def wait_until_active(
+        self, timeout: float | None = 600.0, poll: Iterable[float] | None = None
+    ) -> File:
+        """Waits for the service to finish processing the file.
+
+        Args:
+            timeout: The maximum number of seconds to wait, or `None` to wait forever.
+            poll: The delays between checks of the file's state. By default these grow
+                exponentially from 1 to 30 seconds.
+
+        Returns:
+            The file itself, updated with its `ACTIVE` state.
+
+        Raises:
+            TimeoutError: If the file isn't active within the `timeout`, or `poll` runs out.
+            RuntimeError: If processing the file failed.
+        """
+        client = get_default_file_client()
+        delays = iter(_default_poll() if poll is None else poll)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._check_active():
+            _sleep(_next_delay(delays, deadline, [self.name]))
+            self._proto = client.get_file(name=self.name)
+        return self
+
+    async def wait_until_active_async(
+        self, timeout: float | None = 600.0, poll: Iterable[float] | None = None
+    ) -> File:
+        """This is the async version of `File.wait_until_active`."""
+        client = get_default_file_async_client()
+        delays = iter(_default_poll() if poll is None else poll)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._check_active():
+            await _sleep_async(_next_delay(delays, deadline, [self.name]))
+            self._proto = await client.get_file(name=self.name)
+        return self
+
+    def _check_active(self) -> bool:
+        if self.state == protos.File.State.FAILED:
+            raise RuntimeError(f"Processing the file `{self.name}` failed: {self.error.message}")
+        return self.state == protos.File.State.ACTIVE
+
+
+_sleep = time.sleep
+
+
+async def _sleep_async(delay: float):
+    await asyncio.sleep(delay)
+
+
+def _default_poll() -> Iterator[float]:
+    return retry.exponential_sleep_generator(initial=1.0, maximum=30.0)
+
+
+def _next_delay(delays: Iterator[float], deadline: float | None, names: list[str]) -> float:
+    """Returns the next delay from `delays`, cut short at the `deadline`."""
+    delay = next(delays, None)
+    remaining = None if deadline is None else deadline - time.monotonic()
+    if delay is None or (remaining is not None and remaining <= 0):
+        raise TimeoutError(f"Timed out waiting for the files to become active: {names}")
+    return delay if remaining is None else min(delay, remaining)
+
+
+@dataclasses.dataclass
+class UploadFilesResult:
+    """The outcome of `genai.upload_files`.
+
+    Iterating or indexing it gives one entry per input path, in input order: the uploaded (or
+    reused) `File`, or the exception raised while uploading that path.
+
+    Attributes:
+        results: The `File` or exception for each input path.
+        uploaded: The number of files that were uploaded.
+        reused: The number of paths matched to a file already on the service, or to an earlier
+            path with the same contents.
+        bytes_uploaded: The total size of the uploaded files.
+        elapsed: Wall-clock seconds the whole call took.
+    """
+
+    results: list[File | Exception]
+    uploaded: int = 0
+    reused: int = 0
+    bytes_uploaded: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """The aggregate upload throughput."""
+        return self.bytes_uploaded / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def errors(self) -> dict[int, Exception]:
+        """The exceptions, keyed by the index of the path that raised them."""
+        return {i: r for i, r in enumerate(self.results) if isinstance(r, Exception)}
+
+    def __len__(self):
+        return len(self.results)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def __iter__(self):
+        return iter(self.results)
 
 
 class FileDataDict(TypedDict):
@@ -372,10 +372,184 @@ def _join_chunks(chunks: Iterable[protos.GenerateContentResponse]):
     )
 
 
+def _mergeable_part_kind(part: protos.Part) -> str | None:
+    if "text" in part:
+        return "text"
+    if "executable_code" in part:
+        return "executable_code"
+    if "code_execution_result" in part:
+        return "code_execution_result"
+    return None
+
+
+class _PartBuffer:
+    """Collects a run of adjacent stream parts that `_join_contents` would merge into one."""
+
+    __slots__ = ("kind", "first", "last", "pieces")
+
+    def __init__(self, kind: str | None, part: protos.Part):
+        self.kind = kind
+        self.first = part
+        self.last = part
+        self.pieces: list[str] = []
+
+    def add_part(self, part: protos.Part):
+        if not self.pieces:
+            self.pieces.append(self._piece(self.first))
+        self.pieces.append(self._piece(part))
+        self.last = part
+
+    def _piece(self, part: protos.Part) -> str:
+        if self.kind == "text":
+            return part.text
+        elif self.kind == "executable_code":
+            return part.executable_code.code
+        else:
+            return part.code_execution_result.output
+
+    def to_proto(self) -> protos.Part:
+        if not self.pieces:
+            return self.first
+
+        joined = "".join(self.pieces)
+        if self.kind == "text":
+            return protos.Part(text=joined)
+        elif self.kind == "executable_code":
+            return protos.Part(
+                executable_code=protos.ExecutableCode(
+                    language=self.first.executable_code.language, code=joined
+                )
+            )
+        else:
+            return protos.Part(
+                code_execution_result=protos.CodeExecutionResult(
+                    outcome=self.last.code_execution_result.outcome, output=joined
+                )
+            )
+
+
+class _CandidateAccumulator:
+    """Incrementally joins the stream chunks of a single candidate.
+
+    Produces the same result as `_join_candidates`, but each chunk is added in time
+    proportional to the chunk, not to everything received so far.
+    """
+
+    def __init__(self, index: int):
+        self.index = index
+        self.role = ""
+        self.parts: list[_PartBuffer] = []
+        self.safety: dict[Any, list] = {}
+        self.finish_reason = None
+        self.citation_metadata = None
+        self.token_count = None
+
+    def add_candidate(self, candidate: protos.Candidate):
+        content = candidate.content
+        if not self.role and content.role:
+            self.role = content.role
+
+        for part in content.parts:
+            kind = _mergeable_part_kind(part)
+            if kind is not None and self.parts and self.parts[-1].kind == kind:
+                self.parts[-1].add_part(part)
+            else:
+                self.parts.append(_PartBuffer(kind, part))
+
+        for rating in candidate.safety_ratings:
+            state = self.safety.setdefault(rating.category, [None, False])
+            state[0] = rating.probability
+            state[1] = state[1] or rating.blocked
+
+        self.finish_reason = candidate.finish_reason
+        self.citation_metadata = candidate.citation_metadata
+        self.token_count = candidate.token_count
+
+    def to_proto(self) -> protos.Candidate:
+        return protos.Candidate(
+            index=self.index,
+            content=protos.Content(
+                role=self.role, parts=[buffer.to_proto() for buffer in self.parts]
+            ),
+            finish_reason=self.finish_reason,
+            safety_ratings=[
+                protos.SafetyRating(category=category, probability=probability, blocked=blocked)
+                for category, (probability, blocked) in self.safety.items()
+            ],
+            citation_metadata=self.citation_metadata,
+            token_count=self.token_count,
+        )
+
+
+class _ChunkAccumulator:
+    """Incrementally joins `GenerateContentResponse` stream chunks.
+
+    This is equivalent to calling `_join_chunks` on all the chunks received so far, but
+    `add_chunk` is O(chunk) and the merged proto is only built when `result` is read.
+    """
+
+    def __init__(self, first: protos.GenerateContentResponse):
+        self._first = first
+        self._result: protos.GenerateContentResponse | None = first
+        self._candidates: dict[int, _CandidateAccumulator] | None = None
+        self._usage_metadata = None
+        self._model_version = None
+
+    def _ingest(self, chunk: protos.GenerateContentResponse):
+        for candidate in chunk.candidates:
+            accumulator = self._candidates.get(candidate.index)
+            if accumulator is None:
+                accumulator = _CandidateAccumulator(candidate.index)
+                self._candidates[candidate.index] = accumulator
+            accumulator.add_candidate(candidate)
+
+        self._usage_metadata = chunk.usage_metadata if "usage_metadata" in chunk else None
+        self._model_version = chunk.model_version if "model_version" in chunk else None
+
+    def add_chunk(self, chunk: protos.GenerateContentResponse):
+        if self._candidates is None:
+            # A single chunk is used as-is, only start merging once there is a second one.
+            self._candidates = {}
+            self._ingest(self._first)
+        self._ingest(chunk)
+        self._result = None
+
+    @property
+    def result(self) -> protos.GenerateContentResponse:
+        if self._result is None:
+            self._result = protos.GenerateContentResponse(
+                candidates=[c.to_proto() for _, c in sorted(self._candidates.items())],
+                prompt_feedback=self._first.prompt_feedback,
+                usage_metadata=self._usage_metadata,
+                model_version=self._model_version,
+            )
+        return self._result
+
+
+def _chunk_text_deltas(chunk: protos.GenerateContentResponse):
+    """Yields the text parts of a single-candidate stream chunk, read from the raw proto."""
+    candidates = type(chunk).pb(chunk).candidates
+    if not candidates:
+        return
+    if len(candidates) > 1:
+        raise ValueError(
+            "Invalid operation: Text deltas can only be read from a response with a single candidate. "
+            "This response contains multiple candidates, please iterate over the chunks instead."
+        )
+    for part in candidates[0].content.parts:
+        if part.WhichOneof("data") == "text":
+            yield part.text
+
+
 _INCOMPLETE_ITERATION_MESSAGE = """\
 Please let the response complete iteration before accessing the final accumulated
 attributes (or call `response.resolve()`)"""
 
+_NO_REPLAY_MESSAGE = """\
+Invalid operation: This response was created with `retain_chunks=False`, so its chunks are
+discarded once they have been yielded and the stream can only be iterated over once.
+The accumulated attributes (`.text`, `.candidates`, ...) are still available."""
+
 
 class BaseGenerateContentResponse:
     def __init__(
@@ -388,10 +562,13 @@ class BaseGenerateContentResponse:
         ),
         result: protos.GenerateContentResponse,
         chunks: Iterable[protos.GenerateContentResponse] | None = None,
+        retain_chunks: bool = True,
     ):
         self._done = done
         self._iterator = iterator
-        self._result = result
+        self._retain_chunks = retain_chunks
+        self._chunks_dropped = 0
+        self._accumulator = _ChunkAccumulator(result)
         if chunks is None:
             self._chunks = [result]
         else:
@@ -400,6 +577,23 @@ class BaseGenerateContentResponse:
             self._error = BlockedPromptException(result)
         else:
             self._error = None
+        self._cache_source = None
+        self._cache: dict[str, Any] = {}
+
+    @property
+    def _result(self) -> protos.GenerateContentResponse:
+        return self._accumulator.result
+
+    def _cached(self, key: str, compute):
+        # The accumulator returns a new result object whenever a chunk is merged,
+        # which invalidates everything computed from the previous one.
+        result = self._result
+        if self._cache_source is not result:
+            self._cache_source = result
+            self._cache = {}
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
 
     def to_dict(self):
         """Returns the result as a JSON-compatible dict.
@@ -422,7 +616,7 @@ class BaseGenerateContentResponse:
         """
         if not self._done:
             raise IncompleteIterationError(_INCOMPLETE_ITERATION_MESSAGE)
-        return self._result.candidates
+        return self._cached("candidates", lambda: self._result.candidates)
 
     @property
     def parts(self):
@@ -450,13 +644,22 @@ class BaseGenerateContentResponse:
                 "Invalid operation: The `response.parts` quick accessor retrieves the parts for a single candidate. "
                 "This response contains multiple candidates, please use `result.candidates[index].text`."
             )
-        parts = candidates[0].content.parts
-        return parts
+        return self._cached("parts", lambda: candidates[0].content.parts)
 
     @property
     def text(self):
         """A quick accessor equivalent to `self.candidates[0].content.parts[0].text`
 
+        Raises:
+            ValueError: If the candidate list or parts list does not contain exactly one entry.
+        """
+        return self._cached("text", lambda: "\n".join(self.text_parts()))
+
+    def text_parts(self):
+        """Returns an iterator over the text of each part, the pieces that `.text` joins.
+
+        Use this to scan a long response without building the joined string.
+
         Raises:
             ValueError: If the candidate list or parts list does not contain exactly one entry.
         """
@@ -508,10 +711,13 @@ class BaseGenerateContentResponse:
             else:
                 raise ValueError(msg)
 
-        texts = []
+        return self._iter_text_parts(parts)
+
+    @staticmethod
+    def _iter_text_parts(parts):
         for part in parts:
             if "text" in part:
-                texts.append(part.text)
+                yield part.text
                 continue
             if "executable_code" in part:
                 language = part.executable_code.language.name.lower()
@@ -519,7 +725,9 @@ class BaseGenerateContentResponse:
                     language = ""
                 else:
                     language = f" {language}"
-                texts.extend([f"```{language}", part.executable_code.code.lstrip("\n"), "```"])
+                yield f"```{language}"
+                yield part.executable_code.code.lstrip("\n")
+                yield "```"
                 continue
             if "code_execution_result" in part:
                 outcome_result = part.code_execution_result.outcome.name.lower().replace(
@@ -529,14 +737,14 @@ class BaseGenerateContentResponse:
                     outcome_result = ""
                 else:
                     outcome_result = f" {outcome_result}"
-                texts.extend([f"```{outcome_result}", part.code_execution_result.output, "```"])
+                yield f"```{outcome_result}"
+                yield part.code_execution_result.output
+                yield "```"
                 continue
 
             part_type = protos.Part.pb(part).WhichOneof("data")
             raise ValueError(f"Could not convert `part.{part_type}` to text.")
 
-        return "\n".join(texts)
-
     @property
     def prompt_feedback(self):
         return self._result.prompt_feedback
@@ -615,6 +823,9 @@ GENERATE_CONTENT_RESPONSE_DOC = """Instances of this class manage the response o
       print(chunk.text)
     ```
 
+    If you only need the text, `response.iter_text()` yields each chunk's new text
+    without wrapping every chunk in a `GenerateContentResponse`.
+
     `GenerateContentResponse.prompt_feedback` is available immediately but
     `GenerateContentResponse.candidates`, and all the attributes derived from them (`.text`, `.parts`),
     are only available after the iteration is complete.
@@ -628,7 +839,12 @@ ASYNC_GENERATE_CONTENT_RESPONSE_DOC = (
 @string_utils.set_doc(GENERATE_CONTENT_RESPONSE_DOC)
 class GenerateContentResponse(BaseGenerateContentResponse):
     @classmethod
-    def from_iterator(cls, iterator: Iterable[protos.GenerateContentResponse]):
+    def from_iterator(
+        cls,
+        iterator: Iterable[protos.GenerateContentResponse],
+        *,
+        retain_chunks: bool = True,
+    ):
         iterator = iter(iterator)
         with rewrite_stream_error():
             response = next(iterator)
@@ -637,6 +853,7 @@ class GenerateContentResponse(BaseGenerateContentResponse):
             done=False,
             iterator=iterator,
             result=response,
+            retain_chunks=retain_chunks,
         )
 
     @classmethod
@@ -647,22 +864,31 @@ class GenerateContentResponse(BaseGenerateContentResponse):
             result=response,
         )
 
-    def __iter__(self):
+    def _iter_chunks(self, start: int = 0):
         # This is not thread safe.
         if self._done:
+            if self._chunks_dropped:
+                raise ValueError(_NO_REPLAY_MESSAGE)
             for chunk in self._chunks:
-                yield GenerateContentResponse.from_response(chunk)
+                yield chunk
             return
 
         # Always have the next chunk available.
         if len(self._chunks) == 0:
             self._chunks.append(next(self._iterator))
 
-        for n in itertools.count():
+        for n in itertools.count(start):
             if self._error:
                 raise self._error
 
-            if n >= len(self._chunks) - 1:
+            if n < self._chunks_dropped:
+                raise ValueError(_NO_REPLAY_MESSAGE)
+            if not self._retain_chunks and n > self._chunks_dropped:
+                # Only keep the current chunk and the look-ahead chunk.
+                del self._chunks[: n - self._chunks_dropped]
+                self._chunks_dropped = n
+
+            if n >= self._chunks_dropped + len(self._chunks) - 1:
                 # Look ahead for a new item, so that you know the stream is done
                 # when you yield the last item.
                 if self._done:
@@ -677,25 +903,46 @@ class GenerateContentResponse(BaseGenerateContentResponse):
                     self._done = True
                 else:
                     self._chunks.append(item)
-                    self._result = _join_chunks([self._result, item])
+                    self._accumulator.add_chunk(item)
 
-            item = self._chunks[n]
+            yield self._chunks[n - self._chunks_dropped]
+
+    def __iter__(self):
+        for chunk in self._iter_chunks():
+            yield GenerateContentResponse.from_response(chunk)
 
-            item = GenerateContentResponse.from_response(item)
-            yield item
+    def iter_text(self):
+        """Iterates over the stream, yielding only the new text from each chunk.
+
+        This skips building a `GenerateContentResponse` for every chunk. The chunks are
+        still merged, so the full response is available once iteration completes.
+        Non-text parts are skipped.
+
+        Raises:
+            ValueError: If a chunk contains more than one candidate.
+        """
+        for chunk in self._iter_chunks():
+            yield from _chunk_text_deltas(chunk)
 
     def resolve(self):
         if self._done:
             return
 
-        for _ in self:
+        # Drain from the oldest chunk still held, so that a partially consumed
+        # `retain_chunks=False` stream can still be completed.
+        for _ in self._iter_chunks(start=self._chunks_dropped):
             pass
 
 
 @string_utils.set_doc(ASYNC_GENERATE_CONTENT_RESPONSE_DOC)
 class AsyncGenerateContentResponse(BaseGenerateContentResponse):
     @classmethod
-    async def from_aiterator(cls, iterator: AsyncIterable[protos.GenerateContentResponse]):
+    async def from_aiterator(
+        cls,
+        iterator: AsyncIterable[protos.GenerateContentResponse],
+        *,
+        retain_chunks: bool = True,
+    ):
         iterator = aiter(iterator)  # type: ignore
         with rewrite_stream_error():
             response = await anext(iterator)  # type: ignore
@@ -704,6 +951,7 @@ class AsyncGenerateContentResponse(BaseGenerateContentResponse):
             done=False,
             iterator=iterator,
             result=response,
+            retain_chunks=retain_chunks,
         )
 
     @classmethod
@@ -714,22 +962,31 @@ class AsyncGenerateContentResponse(BaseGenerateContentResponse):
             result=response,
         )
 
-    async def __aiter__(self):
+    async def _iter_chunks(self, start: int = 0):
         # This is not thread safe.
         if self._done:
+            if self._chunks_dropped:
+                raise ValueError(_NO_REPLAY_MESSAGE)
             for chunk in self._chunks:
-                yield GenerateContentResponse.from_response(chunk)
+                yield chunk
             return
 
         # Always have the next chunk available.
         if len(self._chunks) == 0:
             self._chunks.append(await anext(self._iterator))  # type: ignore
 
-        for n in itertools.count():
+        for n in itertools.count(start):
             if self._error:
                 raise self._error
 
-            if n >= len(self._chunks) - 1:
+            if n < self._chunks_dropped:
+                raise ValueError(_NO_REPLAY_MESSAGE)
+            if not self._retain_chunks and n > self._chunks_dropped:
+                # Only keep the current chunk and the look-ahead chunk.
+                del self._chunks[: n - self._chunks_dropped]
+                self._chunks_dropped = n
+
+            if n >= self._chunks_dropped + len(self._chunks) - 1:
                 # Look ahead for a new item, so that you know the stream is done
                 # when you yield the last item.
                 if self._done:
@@ -744,16 +1001,25 @@ class AsyncGenerateContentResponse(BaseGenerateContentResponse):
                     self._done = True
                 else:
                     self._chunks.append(item)
-                    self._result = _join_chunks([self._result, item])
+                    self._accumulator.add_chunk(item)
+
+            yield self._chunks[n - self._chunks_dropped]
 
-            item = self._chunks[n]
+    async def __aiter__(self):
+        async for chunk in self._iter_chunks():
+            yield GenerateContentResponse.from_response(chunk)
 
-            item = GenerateContentResponse.from_response(item)
-            yield item
+    async def aiter_text(self):
+        """This is the async version of `GenerateContentResponse.iter_text`."""
+        async for chunk in self._iter_chunks():
+            for text in _chunk_text_deltas(chunk):
+                yield text
 
     async def resolve(self):
         if self._done:
             return
 
-        async for _ in self:
+        # Drain from the oldest chunk still held, so that a partially consumed
+        # `retain_chunks=False` stream can still be completed.
+        async for _ in self._iter_chunks(start=self._chunks_dropped):
             pass
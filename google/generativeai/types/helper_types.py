@@ -24,7 +24,13 @@ import dataclasses
 from typing import Union
 from typing_extensions import TypedDict
 
-__all__ = ["RequestOptions", "RequestOptionsType"]
+__all__ = [
+    "RequestOptions",
+    "RequestOptionsType",
+    "RateLimit",
+    "RateLimitType",
+    "DeleteSummary",
+]
 
 
 class RequestOptionsDict(TypedDict, total=False):
@@ -85,3 +91,59 @@ class RequestOptions(collections.abc.Mapping):
 
 
 RequestOptionsType = Union[RequestOptions, RequestOptionsDict]
+
+
+class RateLimitDict(TypedDict, total=False):
+    requests_per_minute: float
+    tokens_per_minute: float
+    max_concurrency: int
+
+
+@dataclasses.dataclass
+class RateLimit:
+    """Client-side limits for calls to one API method, see `genai.configure(rate_limits=...)`.
+
+    >>> import google.generativeai as genai
+    >>> genai.configure(rate_limits={
+    ...     "generate_content": genai.types.RateLimit(requests_per_minute=1000, tokens_per_minute=4_000_000),
+    ... })
+
+    Args:
+        requests_per_minute: The maximum sustained number of calls per minute.
+        tokens_per_minute: The maximum sustained number of tokens per minute. The token count of
+            each call is taken from the `usage_metadata` of its response, so this is enforced
+            after the fact: calls wait while the tokens already used exceed the budget.
+        max_concurrency: The maximum number of calls in flight at once. When the API reports that
+            the quota is exhausted, the allowed concurrency is halved, then it grows back by about
+            one call per round of successful calls (AIMD).
+    """
+
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+    max_concurrency: int | None = None
+
+
+RateLimitType = Union[RateLimit, RateLimitDict]
+
+
+def to_rate_limit(rate_limit: RateLimitType) -> RateLimit:
+    if isinstance(rate_limit, RateLimit):
+        return rate_limit
+    return RateLimit(**rate_limit)
+
+
+@dataclasses.dataclass
+class DeleteSummary:
+    """The outcome of a bulk delete, like `genai.delete_files`.
+
+    Attributes:
+        deleted: The names of the resources that were deleted.
+        not_found: The names of the resources that were already gone.
+        errors: The exceptions raised for the other resources, keyed by name.
+        elapsed: Wall-clock seconds the whole call took.
+    """
+
+    deleted: list[str] = dataclasses.field(default_factory=list)
+    not_found: list[str] = dataclasses.field(default_factory=list)
+    errors: dict[str, Exception] = dataclasses.field(default_factory=dict)
+    elapsed: float = 0.0
@@ -23,7 +23,7 @@ import json
 import pathlib
 import re
 
-from typing import Any, Iterable, Union
+from typing import Any, AsyncIterable, Iterable, Union
 
 import urllib.request
 from typing_extensions import TypedDict
@@ -40,6 +40,7 @@ __all__ = [
     "BaseModelNameOptions",
     "TunedModelNameOptions",
     "ModelsIterable",
+    "AsyncModelsIterable",
     "TunedModel",
     "TunedModelState",
 ]
@@ -374,6 +375,8 @@ def make_model_name(name: AnyModelNameOptions):
 
 ModelsIterable = Iterable[Model]
 TunedModelsIterable = Iterable[TunedModel]
+AsyncModelsIterable = AsyncIterable[Model]
+AsyncTunedModelsIterable = AsyncIterable[TunedModel]
 
 
 @string_utils.prettyprint
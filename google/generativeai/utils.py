@@ -14,6 +14,34 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+import concurrent.futures
+import itertools
+import json
+import os
+import pathlib
+import queue
+import tempfile
+import threading
+import time
+from typing import TypeVar
+
+from google.api_core import exceptions
+
+from google.generativeai.types import helper_types
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def write_json_atomic(path: str | os.PathLike, data: dict):
+    path = pathlib.Path(path)
+    # Write to a temporary file and rename, so readers never see a partial file.
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+        json.dump(data, f)
+    os.replace(f.name, path)
+
 
 def flatten_update_paths(updates):
     """Flattens a nested dictionary into a single level dictionary, with keys representing the original path."""
@@ -27,3 +55,178 @@ def flatten_update_paths(updates):
             new_updates[key] = value
 
     return new_updates
+
+
+def iter_as_completed(
+    fn: Callable[[T], R], items: Iterable[T], *, max_concurrency: int
+) -> Iterator[tuple[int, R | Exception]]:
+    """Calls `fn` on each of `items` from a thread pool, yielding `(index, result)` pairs as they complete.
+
+    At most `max_concurrency` calls are in flight at once and `items` is consumed lazily. If a call
+    raises, the exception is yielded in place of its result.
+    """
+    if max_concurrency < 1:
+        raise ValueError(
+            f"Invalid input: `max_concurrency` must be at least 1, got {max_concurrency}."
+        )
+
+    items = enumerate(items)
+    pending: dict[concurrent.futures.Future, int] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+        def submit_more():
+            for index, item in itertools.islice(items, max_concurrency - len(pending)):
+                pending[executor.submit(fn, item)] = index
+
+        try:
+            submit_more()
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = e
+                    yield index, result
+                submit_more()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def aiter_as_completed(
+    fn: Callable[[T], Awaitable[R]], items: Iterable[T], *, max_concurrency: int
+) -> AsyncIterator[tuple[int, R | Exception]]:
+    """The asyncio version of `iter_as_completed`, running `fn` as tasks on the current event loop."""
+    if max_concurrency < 1:
+        raise ValueError(
+            f"Invalid input: `max_concurrency` must be at least 1, got {max_concurrency}."
+        )
+
+    items = enumerate(items)
+    pending: dict[asyncio.Future, int] = {}
+
+    def schedule_more():
+        for index, item in itertools.islice(items, max_concurrency - len(pending)):
+            pending[asyncio.ensure_future(fn(item))] = index
+
+    try:
+        schedule_more()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    result = e
+                yield index, result
+            schedule_more()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+DEFAULT_PREFETCH_SIZE = 100
+
+_DONE = object()
+
+
+def iter_prefetched(iterable: Iterable[T], *, buffer_size: int | None = None) -> Iterator[T]:
+    """Yields the items of `iterable`, consuming it from a background thread.
+
+    Up to `buffer_size` items (default `DEFAULT_PREFETCH_SIZE`) are read ahead. For a paginated
+    listing, pass the page size: the next page is then fetched while the caller is still
+    working through the current one. Errors raised by `iterable` are re-raised in the caller.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=buffer_size or DEFAULT_PREFETCH_SIZE)
+    stopped = threading.Event()
+
+    def put(entry) -> bool:
+        # Gives up once the caller stops iterating, so the thread never blocks forever.
+        while not stopped.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read_ahead():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((_DONE, e))
+        else:
+            put((_DONE, None))
+
+    threading.Thread(target=read_ahead, daemon=True).start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+async def aiter_prefetched(
+    aiterable: AsyncIterable[T], *, buffer_size: int | None = None
+) -> AsyncIterator[T]:
+    """The asyncio version of `iter_prefetched`, consuming `aiterable` from a task."""
+    buffer: asyncio.Queue = asyncio.Queue(maxsize=buffer_size or DEFAULT_PREFETCH_SIZE)
+
+    async def fill_buffer():
+        try:
+            async for item in aiterable:
+                await buffer.put((item, None))
+        except Exception as e:
+            await buffer.put((_DONE, e))
+        else:
+            await buffer.put((_DONE, None))
+
+    task = asyncio.ensure_future(fill_buffer())
+    try:
+        while True:
+            item, error = await buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        task.cancel()
+
+
+def delete_all(
+    delete: Callable[[str], object], names: Iterable[str], *, max_concurrency: int
+) -> helper_types.DeleteSummary:
+    """Calls `delete` on each of `names` concurrently, collecting the outcomes.
+
+    Resources that are already gone (`NotFound`) are recorded as such rather than as errors.
+    The lists in the summary keep the order of `names`.
+    """
+    start = time.monotonic()
+    names = list(names)
+    results = [None] * len(names)
+    for index, result in iter_as_completed(delete, names, max_concurrency=max_concurrency):
+        results[index] = result
+
+    summary = helper_types.DeleteSummary()
+    for name, result in zip(names, results):
+        if isinstance(result, exceptions.NotFound):
+            summary.not_found.append(name)
+        elif isinstance(result, Exception):
+            summary.errors[name] = result
+        else:
+            summary.deleted.append(name)
+    summary.elapsed = time.monotonic() - start
+    return summary
@@ -12,6 +12,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import datetime
 import textwrap
 import unittest
@@ -20,6 +21,7 @@ from google.generativeai import caching
 from google.generativeai import protos
 
 from google.generativeai import client
+from google.api_core import exceptions
 from absl.testing import absltest
 from absl.testing import parameterized
 
@@ -251,6 +253,25 @@ class UnitTests(parameterized.TestCase):
         cc.delete()
         self.assertIsInstance(self.observed_requests[-1], protos.DeleteCachedContentRequest)
 
+    def test_delete_cached_contents(self):
+        def delete_cached_content(request, **kwargs):
+            self.observed_requests.append(request)
+            if request.name == "cachedContents/gone":
+                raise exceptions.NotFound("gone")
+            if request.name == "cachedContents/broken":
+                raise exceptions.InternalServerError("broken")
+
+        self.client.delete_cached_content = delete_cached_content
+
+        summary = caching.delete_cached_contents(
+            ["a", "cachedContents/gone", "broken", "cachedContents/b"], max_concurrency=2
+        )
+
+        self.assertEqual(["cachedContents/a", "cachedContents/b"], summary.deleted)
+        self.assertEqual(["cachedContents/gone"], summary.not_found)
+        self.assertEqual(["cachedContents/broken"], list(summary.errors))
+        self.assertLen(self.observed_requests, 4)
+
     def test_repr_cached_content(self):
         expexted_repr = textwrap.dedent(
             """\
@@ -270,5 +291,192 @@ class UnitTests(parameterized.TestCase):
         self.assertEqual(repr(cc), expexted_repr)
 
 
+class CachedContentManagerTests(parameterized.TestCase):
+    def setUp(self):
+        self.client = unittest.mock.MagicMock()
+        client._client_manager.clients["cache"] = self.client
+
+        self.caches = {}
+        self.created = 0
+        self.observed_requests = []
+
+        def add_client_method(f):
+            setattr(self.client, f.__name__, f)
+            return f
+
+        @add_client_method
+        def create_cached_content(request, **kwargs):
+            self.observed_requests.append(request)
+            cc = protos.CachedContent(request.cached_content)
+            cc.name = f"cachedContents/{self.created}"
+            self.created += 1
+            cc.expire_time = self._now() + datetime.timedelta(seconds=cc.ttl.total_seconds())
+            cc.ttl = None
+            self.caches[cc.name] = cc
+            return cc
+
+        @add_client_method
+        def list_cached_contents(request, **kwargs):
+            self.observed_requests.append(request)
+            return list(self.caches.values())
+
+        @add_client_method
+        def update_cached_content(request, **kwargs):
+            self.observed_requests.append(request)
+            if request.cached_content.name not in self.caches:
+                raise exceptions.NotFound(request.cached_content.name)
+            cc = self.caches[request.cached_content.name]
+            ttl = request.cached_content.ttl.total_seconds()
+            cc.expire_time = self._now() + datetime.timedelta(seconds=ttl)
+            return cc
+
+    def _now(self):
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    def _manager(self, **kwargs):
+        manager = caching.CachedContentManager(**kwargs)
+        manager._start_refresher = lambda: None
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_get_or_create_reuses_cache(self):
+        manager = self._manager()
+        a = manager.get_or_create("gemini-1.5-pro", contents=["a long document"])
+        b = manager.get_or_create("gemini-1.5-pro", contents=["a long document"])
+        c = manager.get_or_create("gemini-1.5-pro", contents=["another document"])
+
+        self.assertIs(a, b)
+        self.assertNotEqual(a.name, c.name)
+        self.assertLen(self.caches, 2)
+        self.assertStartsWith(a.display_name, "genai-managed-")
+        self.assertEqual(a.model, "models/gemini-1.5-pro")
+
+    def test_get_or_create_finds_cache_from_other_manager(self):
+        first = self._manager().get_or_create("gemini-1.5-pro", contents=["document"])
+        second = self._manager().get_or_create("gemini-1.5-pro", contents=["document"])
+
+        self.assertEqual(first.name, second.name)
+        self.assertLen(self.caches, 1)
+        self.assertIsInstance(self.observed_requests[-1], protos.ListCachedContentsRequest)
+
+    def test_get_or_create_refreshes_expiring_cache(self):
+        manager = self._manager(ttl=datetime.timedelta(hours=1))
+        cc = manager.get_or_create("gemini-1.5-pro", contents=["document"])
+        self.caches[cc.name].expire_time = self._now() + datetime.timedelta(minutes=1)
+        cc._proto.expire_time = self.caches[cc.name].expire_time
+
+        self.assertIs(cc, manager.get_or_create("gemini-1.5-pro", contents=["document"]))
+        self.assertIsInstance(self.observed_requests[-1], protos.UpdateCachedContentRequest)
+        self.assertGreater(cc.expire_time, self._now() + datetime.timedelta(minutes=59))
+
+    def test_get_or_create_recreates_deleted_cache(self):
+        manager = self._manager()
+        cc = manager.get_or_create("gemini-1.5-pro", contents=["document"])
+        del self.caches[cc.name]
+        cc._proto.expire_time = self._now()
+
+        recreated = manager.get_or_create("gemini-1.5-pro", contents=["document"])
+        self.assertNotEqual(cc.name, recreated.name)
+        self.assertIsInstance(self.observed_requests[-1], protos.CreateCachedContentRequest)
+
+    def test_get_or_create_keeps_cache_when_refresh_fails(self):
+        manager = self._manager()
+        cc = manager.get_or_create("gemini-1.5-pro", contents=["document"])
+        cc._proto.expire_time = self._now() + datetime.timedelta(minutes=1)
+
+        def update_cached_content(request, **kwargs):
+            raise exceptions.ServiceUnavailable("try again")
+
+        self.client.update_cached_content = update_cached_content
+
+        # The cache is still alive, so it's used and refreshed later.
+        self.assertIs(cc, manager.get_or_create("gemini-1.5-pro", contents=["document"]))
+        self.assertLen(self.caches, 1)
+
+    def test_get_or_create_async_from_several_event_loops(self):
+        async_client = unittest.mock.MagicMock()
+        client._client_manager.clients["cache_async"] = async_client
+        self.addCleanup(client._client_manager.clients.pop, "cache_async")
+
+        async def list_cached_contents(request, **kwargs):
+            # Lets the other call wait on the key's lock.
+            await asyncio.sleep(0)
+
+            async def results():
+                for cc in self.client.list_cached_contents(request):
+                    yield cc
+
+            return results()
+
+        async def create_cached_content(request, **kwargs):
+            return self.client.create_cached_content(request)
+
+        async def update_cached_content(request, **kwargs):
+            return self.client.update_cached_content(request)
+
+        async_client.list_cached_contents = list_cached_contents
+        async_client.create_cached_content = create_cached_content
+        async_client.update_cached_content = update_cached_content
+
+        manager = self._manager()
+
+        async def get_or_create_twice():
+            return await asyncio.gather(
+                manager.get_or_create_async("gemini-1.5-pro", contents=["document"]),
+                manager.get_or_create_async("gemini-1.5-pro", contents=["document"]),
+            )
+
+        loop = asyncio.new_event_loop()
+        try:
+            first, _ = loop.run_until_complete(get_or_create_twice())
+        finally:
+            loop.close()
+        # The cache is deleted, so both calls look for it again on the next loop.
+        del self.caches[first.name]
+        first._proto.expire_time = self._now()
+
+        loop = asyncio.new_event_loop()
+        try:
+            a, b = loop.run_until_complete(get_or_create_twice())
+        finally:
+            loop.close()
+        self.assertIs(a, b)
+        self.assertNotEqual(first.name, a.name)
+        self.assertLen(self.caches, 1)
+
+    def test_refresh_expiring_only_refreshes_used_caches(self):
+        manager = self._manager()
+        used = manager.get_or_create("gemini-1.5-pro", contents=["used"])
+        idle = manager.get_or_create("gemini-1.5-pro", contents=["idle"])
+        for cc in (used, idle):
+            cc._proto.expire_time = self._now() + datetime.timedelta(minutes=1)
+
+        manager.refresh_expiring()
+        self.assertGreater(used.expire_time, self._now() + datetime.timedelta(minutes=59))
+        self.assertGreater(idle.expire_time, self._now() + datetime.timedelta(minutes=59))
+
+        # Only the caches used since their last refresh are kept alive.
+        manager.get_or_create("gemini-1.5-pro", contents=["used"])
+        for cc in (used, idle):
+            cc._proto.expire_time = self._now() + datetime.timedelta(minutes=1)
+        manager.refresh_expiring()
+        self.assertGreater(used.expire_time, self._now() + datetime.timedelta(minutes=59))
+        self.assertLess(idle.expire_time, self._now() + datetime.timedelta(minutes=2))
+
+    def test_max_entries_evicts_least_recently_used(self):
+        manager = self._manager(max_entries=2)
+        for document in ["a", "b", "a", "c"]:
+            manager.get_or_create("gemini-1.5-pro", contents=[document])
+
+        tracked = [entry.cached_content.name for entry in manager._entries.values()]
+        self.assertEqual(tracked, ["cachedContents/0", "cachedContents/2"])
+
+    def test_refresh_before_must_be_shorter_than_ttl(self):
+        with self.assertRaises(ValueError):
+            caching.CachedContentManager(
+                ttl=datetime.timedelta(minutes=5), refresh_before=datetime.timedelta(minutes=10)
+            )
+
+
 if __name__ == "__main__":
     absltest.main()
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import datetime
+import unittest
+
+from google.generativeai import caching
+from google.generativeai import protos
+
+from google.generativeai import client
+from absl.testing import absltest
+from absl.testing import parameterized
+
+
+class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = unittest.mock.AsyncMock()
+
+        client._client_manager.clients["cache_async"] = self.client
+        self.addCleanup(client._client_manager.clients.pop, "cache_async")
+
+        self.observed_requests = []
+
+        def add_client_method(f):
+            name = f.__name__
+            setattr(self.client, name, f)
+            return f
+
+        @add_client_method
+        async def create_cached_content(
+            request: protos.CreateCachedContentRequest,
+            **kwargs,
+        ) -> protos.CachedContent:
+            self.observed_requests.append(request)
+            return protos.CachedContent(
+                name="cachedContents/test-cached-content",
+                model="models/gemini-1.5-pro",
+                display_name="Cached content for test",
+                usage_metadata={"total_token_count": 1},
+                create_time="2000-01-01T01:01:01.123456Z",
+                update_time="2000-01-01T01:01:01.123456Z",
+                expire_time="2000-01-01T01:01:01.123456Z",
+            )
+
+        @add_client_method
+        async def get_cached_content(
+            request: protos.GetCachedContentRequest,
+            **kwargs,
+        ) -> protos.CachedContent:
+            self.observed_requests.append(request)
+            return protos.CachedContent(
+                name="cachedContents/test-cached-content",
+                model="models/gemini-1.5-pro",
+                display_name="Cached content for test",
+                usage_metadata={"total_token_count": 1},
+                create_time="2000-01-01T01:01:01.123456Z",
+                update_time="2000-01-01T01:01:01.123456Z",
+                expire_time="2000-01-01T01:01:01.123456Z",
+            )
+
+        @add_client_method
+        async def list_cached_contents(
+            request: protos.ListCachedContentsRequest,
+            **kwargs,
+        ):
+            self.observed_requests.append(request)
+
+            async def results():
+                for n in range(2):
+                    yield protos.CachedContent(
+                        name=f"cachedContents/test-cached-content-{n}",
+                        model="models/gemini-1.5-pro",
+                    )
+
+            return results()
+
+        @add_client_method
+        async def update_cached_content(
+            request: protos.UpdateCachedContentRequest,
+            **kwargs,
+        ) -> protos.CachedContent:
+            self.observed_requests.append(request)
+            return protos.CachedContent(
+                name="cachedContents/test-cached-content",
+                model="models/gemini-1.5-pro",
+                display_name="Cached content for test",
+                usage_metadata={"total_token_count": 1},
+                create_time="2000-01-01T01:01:01.123456Z",
+                update_time="2000-01-01T01:01:01.123456Z",
+                expire_time="2000-01-01T03:01:01.123456Z",
+            )
+
+        @add_client_method
+        async def delete_cached_content(
+            request: protos.DeleteCachedContentRequest,
+            **kwargs,
+        ) -> None:
+            self.observed_requests.append(request)
+
+    async def test_create_cached_content(self):
+        cc = await caching.CachedContent.create_async(
+            model="models/gemini-1.5-pro",
+            contents=["Add 5 and 6"],
+            system_instruction="Always add 10 to the result.",
+            ttl=datetime.timedelta(minutes=30),
+        )
+        self.assertIsInstance(self.observed_requests[-1], protos.CreateCachedContentRequest)
+        self.assertEqual(self.observed_requests[-1].cached_content.ttl.total_seconds(), 1800)
+        self.assertIsInstance(cc, caching.CachedContent)
+        self.assertEqual(cc.name, "cachedContents/test-cached-content")
+
+    async def test_get_cached_content(self):
+        cc = await caching.CachedContent.get_async(name="test-cached-content")
+        self.assertIsInstance(self.observed_requests[-1], protos.GetCachedContentRequest)
+        self.assertEqual(self.observed_requests[-1].name, "cachedContents/test-cached-content")
+        self.assertEqual(cc.model, "models/gemini-1.5-pro")
+
+    async def test_list_cached_contents(self):
+        ccs = [cc async for cc in caching.CachedContent.list_async(page_size=2)]
+        self.assertIsInstance(self.observed_requests[-1], protos.ListCachedContentsRequest)
+        self.assertEqual(
+            [cc.name for cc in ccs],
+            ["cachedContents/test-cached-content-0", "cachedContents/test-cached-content-1"],
+        )
+
+    @parameterized.named_parameters(
+        ["ttl", {"ttl": datetime.timedelta(hours=2)}, "ttl"],
+        [
+            "expire_time",
+            {"expire_time": datetime.datetime(2000, 1, 1, 3, 1, 1)},
+            "expire_time",
+        ],
+    )
+    async def test_update_cached_content(self, kwargs, path):
+        cc = await caching.CachedContent.get_async(name="test-cached-content")
+        await cc.update_async(**kwargs)
+        self.assertIsInstance(self.observed_requests[-1], protos.UpdateCachedContentRequest)
+        self.assertEqual(list(self.observed_requests[-1].update_mask.paths), [path])
+        self.assertEqual(
+            cc.expire_time,
+            datetime.datetime(2000, 1, 1, 3, 1, 1, 123456, tzinfo=datetime.timezone.utc),
+        )
+
+    async def test_update_cached_content_ttl_and_expire_time_are_mutually_exclusive(self):
+        cc = await caching.CachedContent.get_async(name="test-cached-content")
+        with self.assertRaises(ValueError):
+            await cc.update_async(
+                ttl=datetime.timedelta(hours=1), expire_time=datetime.datetime(2000, 1, 1)
+            )
+
+    async def test_delete_cached_content(self):
+        cc = await caching.CachedContent.get_async(name="test-cached-content")
+        await cc.delete_async()
+        self.assertIsInstance(self.observed_requests[-1], protos.DeleteCachedContentRequest)
+        self.assertEqual(self.observed_requests[-1].name, "cachedContents/test-cached-content")
+
+
+def tearDownModule():
+    # `IsolatedAsyncioTestCase` leaves no event loop behind, but the async clients created by
+    # later tests expect one.
+    asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+if __name__ == "__main__":
+    absltest.main()
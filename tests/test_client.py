@@ -1,4 +1,12 @@
+import asyncio
+import concurrent.futures
+import json
 import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
 from unittest import mock
 
 from absl.testing import absltest
@@ -7,8 +15,10 @@ from absl.testing import parameterized
 import google.ai.generativelanguage as glm
 
 from google.api_core import client_options
+from google.api_core import exceptions as api_exceptions
 from google.generativeai import protos
 from google.generativeai import client
+from google.generativeai.types import helper_types
 
 
 class ClientTests(parameterized.TestCase):
@@ -143,7 +153,7 @@ class ClientTests(parameterized.TestCase):
         generative_client = client.get_default_generative_client()
         generative_client.generate_content()
 
-        self.assertEqual(metadata, generative_client.metadata)
+        self.assertEqual(tuple(metadata), generative_client.metadata)
 
         self.assertEqual(generative_client.not_a_function, ClientTests.DummyClient.not_a_function)
 
@@ -156,6 +166,257 @@ class ClientTests(parameterized.TestCase):
         generative_client.classm()
         self.assertTrue(ClientTests.DummyClient.called_classm)
 
+    def test_rate_limiter_requests_per_minute(self):
+        now = [0.0]
+        limiter = client._RateLimiter(
+            helper_types.RateLimit(requests_per_minute=60), clock=lambda: now[0]
+        )
+
+        # The bucket starts full.
+        for _ in range(60):
+            self.assertEqual(0.0, limiter._try_acquire())
+            limiter.release()
+        self.assertAlmostEqual(1.0, limiter._try_acquire())
+
+        now[0] += 1.0
+        self.assertEqual(0.0, limiter._try_acquire())
+
+    def test_rate_limiter_tokens_per_minute(self):
+        now = [0.0]
+        limiter = client._RateLimiter(
+            helper_types.RateLimit(tokens_per_minute=600), clock=lambda: now[0]
+        )
+
+        self.assertEqual(0.0, limiter._try_acquire())
+        limiter.release()
+        limiter.record_tokens(700)
+
+        # 101 tokens short, refilled at 10 per second.
+        self.assertAlmostEqual(10.1, limiter._try_acquire())
+
+    def test_rate_limiter_adaptive_concurrency(self):
+        limiter = client._RateLimiter(helper_types.RateLimit(max_concurrency=4))
+
+        for _ in range(4):
+            self.assertEqual(0.0, limiter._try_acquire())
+        self.assertGreater(limiter._try_acquire(), 0)
+
+        limiter.release(exhausted=True)
+        self.assertEqual(2, limiter.concurrency)
+        limiter.release()
+        self.assertEqual(2.5, limiter.concurrency)
+        limiter.release()
+        limiter.release()
+
+        for _ in range(20):
+            limiter.release()
+            limiter._in_flight += 1
+        self.assertEqual(4, limiter.concurrency)
+
+    def test_rate_limits(self):
+        responses = []
+
+        class RateLimitedClient:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def generate_content(self, request=None):
+                response = responses.pop(0)
+                if isinstance(response, Exception):
+                    raise response
+                return response
+
+        client.configure(rate_limits={"generate_content": {"tokens_per_minute": 600}})
+        limiter = client._client_manager.rate_limiters["generate_content"]
+
+        with mock.patch.object(glm, "GenerativeServiceClient", RateLimitedClient):
+            generative_client = client.get_default_generative_client()
+
+        responses.append(protos.GenerateContentResponse(usage_metadata={"total_token_count": 10}))
+        generative_client.generate_content()
+
+        self.assertAlmostEqual(590, limiter._tokens.level, delta=1)
+        self.assertEqual(0, limiter._in_flight)
+
+        responses.append(api_exceptions.ResourceExhausted("quota"))
+        with self.assertRaises(api_exceptions.ResourceExhausted):
+            generative_client.generate_content()
+
+        self.assertEqual(1, limiter.concurrency)
+        self.assertEqual(0, limiter._in_flight)
+
+    def test_rate_limits_async_stream(self):
+        class RateLimitedAsyncClient:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            # Like the generated async client, this is not a coroutine function, it returns an
+            # awaitable.
+            def stream_generate_content(self, request=None):
+                async def chunks():
+                    for tokens in [5, 10]:
+                        yield protos.GenerateContentResponse(
+                            usage_metadata={"total_token_count": tokens}
+                        )
+
+                async def call():
+                    return chunks()
+
+                return call()
+
+        client.configure(rate_limits={"stream_generate_content": {"tokens_per_minute": 600}})
+        limiter = client._client_manager.rate_limiters["stream_generate_content"]
+
+        with mock.patch.object(glm, "GenerativeServiceAsyncClient", RateLimitedAsyncClient):
+            generative_client = client.get_default_generative_async_client()
+
+        async def consume():
+            stream = await generative_client.stream_generate_content()
+            return [chunk async for chunk in stream]
+
+        loop = asyncio.new_event_loop()
+        try:
+            chunks = loop.run_until_complete(consume())
+        finally:
+            loop.close()
+
+        self.assertLen(chunks, 2)
+        self.assertAlmostEqual(590, limiter._tokens.level, delta=1)
+        self.assertEqual(0, limiter._in_flight)
+
+    def test_default_client_is_created_once_across_threads(self):
+        created = []
+
+        class SlowClient:
+            def __init__(self, *args, **kwargs):
+                time.sleep(0.01)
+                created.append(self)
+
+        client.configure(api_key="AIzA_client")
+        with mock.patch.object(glm, "GenerativeServiceClient", SlowClient):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+                clients = list(
+                    executor.map(lambda _: client.get_default_generative_client(), range(16))
+                )
+
+        self.assertLen(created, 1)
+        self.assertTrue(all(c is created[0] for c in clients))
+
+    class PoolDummyClient:
+        def __init__(self, *args, **kwargs):
+            self.calls = 0
+            self.release = threading.Event()
+
+        def generate_content(self, request=None, wait=False):
+            self.calls += 1
+            if wait:
+                self.release.wait()
+            return self
+
+    @mock.patch.object(glm, "GenerativeServiceClient", PoolDummyClient)
+    def test_client_pool_round_robin(self):
+        client.configure(api_key="AIzA_client", client_pool_size=3)
+
+        pool = client.get_default_generative_client()
+        used = [pool.generate_content() for _ in range(6)]
+
+        self.assertLen(set(used), 3)
+        self.assertEqual([2, 2, 2], [c.calls for c in set(used)])
+
+    @mock.patch.object(glm, "GenerativeServiceClient", PoolDummyClient)
+    def test_client_pool_least_loaded(self):
+        client.configure(
+            api_key="AIzA_client", client_pool_size=2, client_pool_strategy="least_loaded"
+        )
+        pool = client.get_default_generative_client()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            busy = executor.submit(pool.generate_content, wait=True)
+            while not any(pool._in_flight):
+                time.sleep(0.001)
+
+            # While one client is busy, calls go to the other one.
+            idle = {pool.generate_content() for _ in range(3)}
+            self.assertLen(idle, 1)
+
+            for c in pool._clients:
+                c.release.set()
+            self.assertNotIn(busy.result(), idle)
+
+    def test_client_pool_strategy_is_validated(self):
+        with self.assertRaisesRegex(ValueError, "client_pool_strategy"):
+            client.configure(api_key="AIzA_client", client_pool_strategy="random")
+
+    @parameterized.parameters("generative", "generative_async", "file")
+    def test_default_metadata_is_added_to_the_transport(self, name):
+        metadata = [("hello", "world")]
+        client.configure(api_key="AIzA_client", default_metadata=metadata)
+
+        service_client = client._client_manager.make_client(name)
+
+        transport = getattr(service_client, "_client", service_client)._transport
+        for rpc in transport._wrapped_methods.values():
+            self.assertEqual(("hello", "world"), rpc._metadata[-1])
+
+        # The client methods themselves are not wrapped.
+        self.assertNotIn("list_operations", vars(service_client))
+
+    def test_discovery_doc_is_fetched_once_and_cached_on_disk(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        doc = {"name": "generativelanguage", "version": "v1beta"}
+
+        http_request = mock.MagicMock()
+        http_request.return_value.execute.return_value = (None, json.dumps(doc).encode("utf-8"))
+
+        with mock.patch.dict(os.environ, {"GENAI_DISCOVERY_CACHE_DIR": cache_dir}):
+            with mock.patch.dict(client._discovery_docs, clear=True):
+                with mock.patch.object(client.googleapiclient.http, "HttpRequest", http_request):
+                    self.assertEqual(doc, client._fetch_discovery_doc("AIzA_key", ()))
+                    self.assertEqual(doc, client._fetch_discovery_doc("AIzA_key", ()))
+                self.assertEqual(1, http_request.call_count)
+
+            # A new process reads it from disk.
+            with mock.patch.dict(client._discovery_docs, clear=True):
+                with mock.patch.object(client.googleapiclient.http, "HttpRequest", http_request):
+                    self.assertEqual(doc, client._fetch_discovery_doc("AIzA_key", ()))
+                self.assertEqual(1, http_request.call_count)
+
+            # Unless it has expired.
+            with mock.patch.dict(client._discovery_docs, clear=True):
+                with mock.patch.object(client, "DISCOVERY_CACHE_TTL_SECONDS", -1):
+                    with mock.patch.object(
+                        client.googleapiclient.http, "HttpRequest", http_request
+                    ):
+                        self.assertEqual(doc, client._fetch_discovery_doc("AIzA_key", ()))
+                self.assertEqual(2, http_request.call_count)
+
+    def test_file_cache_is_opt_in(self):
+        client.configure(api_key="AIzA_key")
+        self.assertIsNone(client.get_default_file_cache_path())
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        client.configure(api_key="AIzA_key", file_cache=os.path.join(cache_dir, "files.sqlite"))
+        self.addCleanup(setattr, client._client_manager, "file_cache_path", None)
+        self.assertEqual(
+            pathlib.Path(cache_dir, "files.sqlite"), client.get_default_file_cache_path()
+        )
+        # `configure` only records the path, the database is opened on first use.
+        self.assertFalse(os.path.exists(os.path.join(cache_dir, "files.sqlite")))
+
+    def test_embedding_cache_is_opt_in(self):
+        client.configure(api_key="AIzA_key")
+        self.assertIsNone(client.get_default_embedding_cache_path())
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        client.configure(api_key="AIzA_key", embedding_cache=os.path.join(cache_dir, "e.sqlite"))
+        self.assertEqual(
+            pathlib.Path(cache_dir, "e.sqlite"), client.get_default_embedding_cache_path()
+        )
+        client.configure(api_key="AIzA_key")
+
     def test_same_config(self):
         cm1 = client._ClientManager()
         cm1.configure(api_key="abc")
@@ -14,10 +14,16 @@
 # limitations under the License.
 import copy
 import math
+import os
+import shutil
+import tempfile
 from typing import Any
 import unittest
 import unittest.mock as mock
 
+import numpy as np
+
+from google.api_core import exceptions
 from google.generativeai import protos
 
 from google.generativeai import embedding
@@ -165,6 +171,285 @@ class UnitTests(parameterized.TestCase):
 
         self.client.batch_embed_contents.assert_called_once_with(request, **request_options)
 
+    def _use_indexed_embeddings(self, bad=()):
+        # Each text is a number, embedded as `[number]`. Batches containing one of `bad` fail.
+        def embed(content):
+            text = content.parts[0].text
+            if text in bad:
+                raise exceptions.InvalidArgument(text)
+            return protos.ContentEmbedding(values=[float(text)])
+
+        def embed_content(request, **kwargs):
+            self.observed_requests.append(request)
+            return protos.EmbedContentResponse(embedding=embed(request.content))
+
+        def batch_embed_contents(request, **kwargs):
+            self.observed_requests.append(request)
+            if any(r.content.parts[0].text in bad for r in request.requests):
+                raise exceptions.BadRequest("bad item")
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[embed(r.content) for r in request.requests]
+            )
+
+        self.client.embed_content = embed_content
+        self.client.batch_embed_contents = batch_embed_contents
+
+    def test_embed_content_stream(self):
+        self._use_indexed_embeddings()
+        texts = (str(n) for n in range(237))
+
+        results = list(embedding.embed_content_stream(DEFAULT_EMB_MODEL, texts, max_concurrency=2))
+
+        self.assertCountEqual(results, [(n, [float(n)]) for n in range(237)])
+        self.assertLen(self.observed_requests, 3)
+
+    def test_embed_content_stream_retries_failed_batch_one_by_one(self):
+        self._use_indexed_embeddings()
+        calls = []
+        batch_embed_contents = self.client.batch_embed_contents
+
+        def fail_once(request, **kwargs):
+            calls.append(request)
+            if len(calls) == 1:
+                raise exceptions.BadRequest("bad item")
+            return batch_embed_contents(request, **kwargs)
+
+        self.client.batch_embed_contents = fail_once
+
+        results = dict(embedding.embed_content_stream(DEFAULT_EMB_MODEL, map(str, range(150))))
+
+        self.assertEqual(results, {n: [float(n)] for n in range(150)})
+        single = [r for r in self.observed_requests if isinstance(r, protos.EmbedContentRequest)]
+        self.assertLen(single, 100)
+
+    def test_embed_content_stream_does_not_retry_quota_errors_one_by_one(self):
+        self._use_indexed_embeddings()
+
+        def exhausted(request, **kwargs):
+            raise exceptions.ResourceExhausted("quota")
+
+        self.client.batch_embed_contents = exhausted
+
+        with self.assertRaises(exceptions.ResourceExhausted):
+            list(embedding.embed_content_stream(DEFAULT_EMB_MODEL, map(str, range(150))))
+        single = [r for r in self.observed_requests if isinstance(r, protos.EmbedContentRequest)]
+        self.assertEmpty(single)
+
+    def test_embed_content_stream_yields_item_errors(self):
+        self._use_indexed_embeddings(bad={"42"})
+
+        results = dict(embedding.embed_content_stream(DEFAULT_EMB_MODEL, map(str, range(150))))
+
+        self.assertIsInstance(results.pop(42), exceptions.InvalidArgument)
+        self.assertEqual(results, {n: [float(n)] for n in range(150) if n != 42})
+
+    def test_embed_content_numpy(self):
+        self._use_indexed_embeddings()
+        emb = embedding.embed_content(
+            DEFAULT_EMB_MODEL, (str(n) for n in range(237)), output_format="numpy"
+        )
+
+        self.assertIsInstance(emb["embedding"], np.ndarray)
+        self.assertEqual(emb["embedding"].dtype, np.float32)
+        self.assertEqual(emb["embedding"].shape, (237, 1))
+        np.testing.assert_array_equal(emb["embedding"][:, 0], np.arange(237))
+
+        emb = embedding.embed_content(DEFAULT_EMB_MODEL, "7", output_format="numpy")
+        np.testing.assert_array_equal(emb["embedding"], np.array([7], dtype=np.float32))
+
+    def test_embed_content_invalid_output_format(self):
+        with self.assertRaises(ValueError):
+            embedding.embed_content(DEFAULT_EMB_MODEL, "text", output_format="pandas")
+
+    def test_embed_content_with_cache(self):
+        self._use_indexed_embeddings()
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        client._client_manager.embedding_cache_path = os.path.join(cache_dir, "embeddings.sqlite")
+        self.addCleanup(setattr, client._client_manager, "embedding_cache_path", None)
+
+        embedding.embed_content(DEFAULT_EMB_MODEL, ["1", "2"])
+        emb = embedding.embed_content(DEFAULT_EMB_MODEL, ["0", "1", "2", "3"])
+        self.assertEqual(emb["embedding"], [[0.0], [1.0], [2.0], [3.0]])
+
+        # Only the misses are sent.
+        self.assertEqual(
+            [r.content.parts[0].text for r in self.observed_requests[-1].requests], ["0", "3"]
+        )
+
+        # The task type is part of the key.
+        embedding.embed_content(DEFAULT_EMB_MODEL, "1", task_type="retrieval_query")
+        self.assertEqual(self.observed_requests[-1].task_type, protos.TaskType.RETRIEVAL_QUERY)
+        request_count = len(self.observed_requests)
+        self.assertEqual(embedding.embed_content(DEFAULT_EMB_MODEL, "1")["embedding"], [1.0])
+        self.assertEqual(
+            dict(embedding.embed_content_stream(DEFAULT_EMB_MODEL, ["3", "2"])),
+            {0: [3.0], 1: [2.0]},
+        )
+        self.assertLen(self.observed_requests, request_count)
+
+    def test_embedding_cache_evicts_least_recently_used(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = embedding._EmbeddingCache(os.path.join(cache_dir, "e.sqlite"), max_entries=10)
+
+        cache.put_many({str(n): [n, 0.5] for n in range(10)})
+        self.assertEqual(cache.get_many(["0", "3"]), {"0": [0.0, 0.5], "3": [3.0, 0.5]})
+        cache.put_many({"10": [10, 0.5]})
+
+        # Down to 9 entries, keeping the ones just used.
+        self.assertLen(cache.get_many([str(n) for n in range(11)]), 9)
+        self.assertEqual(cache.get_many(["0", "3", "10"]).keys(), {"0", "3", "10"})
+
+    def test_plan_batches_by_size(self):
+        def request(text):
+            return protos.EmbedContentRequest(
+                model=DEFAULT_EMB_MODEL, content={"parts": [{"text": text}]}
+            )
+
+        short = [request("x") for _ in range(250)]
+        self.assertEqual([len(b) for b in embedding._plan_batches(short)], [100, 100, 50])
+
+        # ~20k estimated tokens each, so only 4 fit under EMBEDDING_MAX_BATCH_TOKENS.
+        long = [request("word " * 12_000) for _ in range(12)]
+        self.assertEqual([len(b) for b in embedding._plan_batches(long)], [4, 4, 4])
+
+        huge = [request("x" * embedding.EMBEDDING_MAX_BATCH_BYTES), request("x")]
+        self.assertEqual([len(b) for b in embedding._plan_batches(huge)], [1, 1])
+
+    def test_embed_content_splits_rejected_batches(self):
+        self._use_indexed_embeddings()
+        batch_embed_contents = self.client.batch_embed_contents
+        batch_sizes = []
+
+        def reject_large_batches(request, **kwargs):
+            batch_sizes.append(len(request.requests))
+            if len(request.requests) > 30:
+                raise exceptions.InvalidArgument("Request payload size exceeds the limit")
+            return batch_embed_contents(request, **kwargs)
+
+        self.client.batch_embed_contents = reject_large_batches
+
+        emb = embedding.embed_content(DEFAULT_EMB_MODEL, [str(n) for n in range(100)])
+
+        self.assertEqual(emb["embedding"], [[float(n)] for n in range(100)])
+        self.assertEqual(batch_sizes, [100, 50, 25, 25, 50, 25, 25])
+
+    def test_embed_content_does_not_split_other_invalid_arguments(self):
+        def bad_model(request, **kwargs):
+            self.observed_requests.append(request)
+            raise exceptions.InvalidArgument("Model is not supported.")
+
+        self.client.batch_embed_contents = bad_model
+
+        with self.assertRaises(exceptions.InvalidArgument):
+            embedding.embed_content(DEFAULT_EMB_MODEL, [str(n) for n in range(100)])
+        self.assertLen(self.observed_requests, 1)
+
+    def _use_keyword_embeddings(self):
+        # Texts are embedded by counting the words "cat", "dog" and "fish".
+        def embed(content):
+            words = content.parts[0].text.split()
+            return protos.ContentEmbedding(values=[words.count(w) for w in ("cat", "dog", "fish")])
+
+        def embed_content(request, **kwargs):
+            self.observed_requests.append(request)
+            return protos.EmbedContentResponse(embedding=embed(request.content))
+
+        def batch_embed_contents(request, **kwargs):
+            self.observed_requests.append(request)
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[embed(r.content) for r in request.requests]
+            )
+
+        self.client.embed_content = embed_content
+        self.client.batch_embed_contents = batch_embed_contents
+
+    def test_vector_index(self):
+        self._use_keyword_embeddings()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+
+        with embedding.VectorIndex(path, model="text-embedding-004") as index:
+            index.add_documents(
+                ["cat cat", "dog", "fish dog"],
+                ids=["a", "b", "c"],
+                metadata=[{"n": 1}, None, {"n": 3}],
+            )
+            self.assertEqual(
+                self.observed_requests[-1].requests[0].task_type,
+                protos.TaskType.RETRIEVAL_DOCUMENT,
+            )
+
+            results = index.search("a dog", k=2)
+            self.assertEqual(self.observed_requests[-1].task_type, protos.TaskType.RETRIEVAL_QUERY)
+            self.assertEqual([r.id for r in results], ["b", "c"])
+            self.assertAlmostEqual(results[0].score, 1.0)
+            self.assertAlmostEqual(results[1].score, 0.5**0.5, places=6)
+
+        # Reopening reads the saved index.
+        with embedding.VectorIndex(path) as index:
+            self.assertLen(index, 3)
+            self.assertEqual(index.model, "models/text-embedding-004")
+            index.add_vectors([[0, 0, 2]], ids=["d"])
+            (result,) = index.search_by_vector([0, 0, 1], k=1)
+            self.assertEqual(result, embedding.SearchResult(id="d", score=1.0, metadata=None))
+            results = index.search_by_vector([1, 0, 0], k=10)
+            self.assertEqual([r.id for r in results][0], "a")
+            self.assertEqual(results[0].metadata, {"n": 1})
+            self.assertLen(results, 4)
+
+        with self.assertRaises(ValueError):
+            embedding.VectorIndex(path, model="embedding-001")
+
+    def test_vector_index_checks_ids_before_embedding(self):
+        self._use_keyword_embeddings()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+
+        with embedding.VectorIndex(path, model="text-embedding-004") as index:
+            with self.assertRaises(ValueError):
+                index.add_documents(["cat", "dog"], ids=["a"])
+            with self.assertRaises(ValueError):
+                index.add_documents(["cat", "dog"], metadata=[None] * 3)
+            self.assertEmpty(self.observed_requests)
+            self.assertLen(index, 0)
+
+    def test_vector_index_ivf(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(3000, 16)).astype(np.float32)
+
+        index = embedding.VectorIndex(path)
+        index.add_vectors(vectors[:2500])
+        index.build_ivf(n_lists=20)
+        index.add_vectors(vectors[2500:])
+        index.close()
+
+        index = embedding.VectorIndex(path)
+        self.addCleanup(index.close)
+        for row in [7, 1234, 2999]:
+            exact = index.search_by_vector(vectors[row], k=5, nprobe=0)
+            approximate = index.search_by_vector(vectors[row], k=5, nprobe=20)
+            self.assertEqual(exact, approximate)
+            self.assertEqual(exact[0].id, str(row))
+            # The closest cluster always holds the vector itself.
+            self.assertEqual(index.search_by_vector(vectors[row], k=1, nprobe=1)[0].id, str(row))
+
+    def test_vector_index_ivf_more_lists_than_samples(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        vectors = np.random.default_rng(0).normal(size=(50, 8)).astype(np.float32)
+
+        with embedding.VectorIndex(path) as index:
+            index.add_vectors(vectors)
+            index.build_ivf(n_lists=30, sample_size=20)
+
+            self.assertLen(index._ivf["centroids"], 20)
+            (result,) = index.search_by_vector(vectors[7], k=1, nprobe=20)
+            self.assertEqual("7", result.id)
+
     def test_embed_content_called_with_request_options(self):
         self.client.embed_content = mock.MagicMock()
         request = mock.ANY
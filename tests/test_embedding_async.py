@@ -14,10 +14,17 @@
 # limitations under the License.
 import copy
 import math
+import os
+import shutil
+import tempfile
+import threading
 from typing import Any
 import unittest
 import unittest.mock as mock
 
+import numpy as np
+
+from google.api_core import exceptions
 from google.generativeai import protos
 
 from google.generativeai import embedding
@@ -132,6 +139,70 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
                 model=DEFAULT_EMB_MODEL, content=text, output_dimensionality=-1
             )
 
+    async def test_embed_content_stream_async(self):
+        async def batch_embed_contents(request, **kwargs):
+            self.observed_requests.append(request)
+            if len(self.observed_requests) == 1:
+                raise exceptions.BadRequest("bad item")
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[
+                    protos.ContentEmbedding(values=[float(r.content.parts[0].text)])
+                    for r in request.requests
+                ]
+            )
+
+        async def embed_content(request, **kwargs):
+            self.observed_requests.append(request)
+            values = [float(request.content.parts[0].text)]
+            return protos.EmbedContentResponse(embedding=protos.ContentEmbedding(values=values))
+
+        self.client.batch_embed_contents = batch_embed_contents
+        self.client.embed_content = embed_content
+
+        results = [
+            item
+            async for item in embedding.embed_content_stream_async(
+                DEFAULT_EMB_MODEL, map(str, range(237)), max_concurrency=2
+            )
+        ]
+
+        # The first batch failed, and was retried item by item.
+        self.assertCountEqual(results, [(n, [float(n)]) for n in range(237)])
+        single = [r for r in self.observed_requests if isinstance(r, protos.EmbedContentRequest)]
+        self.assertLen(single, 100)
+
+    async def test_embed_content_async_with_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        client_lib._client_manager.embedding_cache_path = os.path.join(cache_dir, "e.sqlite")
+        self.addCleanup(setattr, client_lib._client_manager, "embedding_cache_path", None)
+
+        get_many = embedding._EmbeddingCache.get_many
+        threads = []
+
+        def recording_get_many(cache, keys):
+            threads.append(threading.current_thread())
+            return get_many(cache, keys)
+
+        with mock.patch.object(embedding._EmbeddingCache, "get_many", recording_get_many):
+            first = await embedding.embed_content_async(DEFAULT_EMB_MODEL, ["a", "b"])
+            second = await embedding.embed_content_async(DEFAULT_EMB_MODEL, ["a", "b"])
+
+        self.assertEqual(first, second)
+        self.assertLen(self.observed_requests, 1)
+        # The database is only used from worker threads, never on the event loop.
+        self.assertNotIn(threading.current_thread(), threads)
+
+    async def test_embed_content_numpy_async(self):
+        texts = ["What are you?"] * 101
+        emb = await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=texts, output_format="numpy"
+        )
+
+        self.assertIsInstance(emb["embedding"], np.ndarray)
+        self.assertEqual(emb["embedding"].dtype, np.float32)
+        np.testing.assert_array_equal(emb["embedding"], np.tile([1, 2, 3], (101, 1)))
+
     async def test_embed_content_called_with_request_options(self):
         self.client.embed_content = unittest.mock.AsyncMock()
         request = unittest.mock.ANY
@@ -16,14 +16,27 @@ from __future__ import annotations
 
 from google.generativeai.types import file_types
 
+import asyncio
 import collections
 import datetime
+import hashlib
 import io
+import json
 import os
 from typing import Iterable, Sequence
 import pathlib
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
 
 import google
+import google.api_core.exceptions
+import googleapiclient.errors
+import googleapiclient.http
+import googleapiclient.model
+import httplib2
 
 import google.generativeai as genai
 from google.generativeai import client as client_lib
@@ -45,6 +58,8 @@ class FileServiceClient(client_lib.FileServiceClient):
         name: str | None = None,
         display_name: str | None = None,
         resumable: bool = True,
+        chunk_size: int | None = None,
+        checkpoint: str | os.PathLike | None = None,
         metadata: Sequence[tuple[str, str]] = (),
     ) -> protos.File:
         self.observed_requests.append(
@@ -54,16 +69,18 @@ class FileServiceClient(client_lib.FileServiceClient):
                 name=name,
                 display_name=display_name,
                 resumable=resumable,
+                chunk_size=chunk_size,
+                checkpoint=checkpoint,
             )
         )
         return self.responses["create_file"].pop(0)
 
     def get_file(
         self,
-        request: protos.GetFileRequest,
+        request: protos.GetFileRequest | None = None,
         **kwargs,
     ) -> protos.File:
-        self.observed_requests.append(request)
+        self.observed_requests.append(request or protos.GetFileRequest(**kwargs))
         return self.responses["get_file"].pop(0)
 
     def list_files(
@@ -150,3 +167,492 @@ class UnitTests(parameterized.TestCase):
         response = genai.upload_file("test.webp")
 
         self.assertEqual("image/webp", self.observed_requests[0]["mime_type"])
+
+    def test_delete_files(self):
+        def delete_file(request, **kwargs):
+            self.observed_requests.append(request)
+            if request.name == "files/gone":
+                raise google.api_core.exceptions.NotFound("gone")
+
+        self.client.delete_file = delete_file
+
+        summary = genai.delete_files(["a", protos.File(name="files/gone"), "files/b"])
+
+        self.assertEqual(["files/a", "files/b"], summary.deleted)
+        self.assertEqual(["files/gone"], summary.not_found)
+        self.assertEmpty(summary.errors)
+
+    def test_list_files_reads_ahead(self):
+        read_ahead = threading.Event()
+
+        def list_files(request):
+            yield protos.File(name="files/a")
+            yield protos.File(name="files/b")
+            read_ahead.set()
+            raise ValueError("page failed")
+
+        self.client.list_files = list_files
+
+        it = genai.list_files(page_size=2)
+        self.assertEqual("files/a", next(it).name)
+        # The rest is fetched while the caller holds the first file.
+        self.assertTrue(read_ahead.wait(timeout=5))
+        self.assertEqual("files/b", next(it).name)
+        with self.assertRaisesRegex(ValueError, "page failed"):
+            next(it)
+
+    def test_wait_until_active(self):
+        sleeps = []
+        self.enter_context(mock.patch.object(file_types, "_sleep", sleeps.append))
+        self.responses["get_file"] = [
+            protos.File(name="files/abc", state="PROCESSING"),
+            protos.File(name="files/abc", state="ACTIVE"),
+        ]
+
+        f = file_types.File(protos.File(name="files/abc", state="PROCESSING"))
+        self.assertIs(f, f.wait_until_active(poll=[1, 2, 3]))
+
+        self.assertEqual(protos.File.State.ACTIVE, f.state)
+        self.assertEqual([1, 2], sleeps)
+
+    @parameterized.named_parameters(
+        ["failed", protos.File(name="files/abc", state="FAILED"), RuntimeError],
+        ["timeout", protos.File(name="files/abc", state="PROCESSING"), TimeoutError],
+    )
+    def test_wait_until_active_errors(self, response, error):
+        self.enter_context(mock.patch.object(file_types, "_sleep", lambda delay: None))
+        self.responses["get_file"] = [response]
+
+        f = file_types.File(protos.File(name="files/abc", state="PROCESSING"))
+        with self.assertRaises(error):
+            f.wait_until_active(poll=[1])
+
+    def test_wait_all(self):
+        self.enter_context(mock.patch.object(file_types, "_sleep", lambda delay: None))
+        files = [
+            protos.File(name="files/a", state="PROCESSING"),
+            protos.File(name="files/b", state="ACTIVE"),
+            protos.File(name="files/c", state="PROCESSING"),
+        ]
+        self.responses["list_files"] = [
+            [protos.File(name="files/a", state="ACTIVE"), files[2]],
+            [protos.File(name="files/a", state="ACTIVE")],
+        ]
+        self.responses["get_file"] = [protos.File(name="files/c", state="FAILED")]
+
+        result = genai.wait_all(files, poll=[0, 0])
+
+        self.assertEqual(
+            ["ACTIVE", "ACTIVE", "FAILED"], [protos.File.State(f.state).name for f in result]
+        )
+        # One sweep per round, `get_file` only for the file missing from the second sweep.
+        self.assertEqual(
+            [protos.ListFilesRequest, protos.ListFilesRequest, protos.GetFileRequest],
+            [type(r) for r in self.observed_requests],
+        )
+
+    def test_file_cache(self):
+        tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = tempdir / "image.png"
+        path.write_bytes(b"PNG!")
+
+        client_lib._client_manager.file_cache_path = tempdir / "files.sqlite"
+        self.addCleanup(setattr, client_lib._client_manager, "file_cache_path", None)
+
+        expiration = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=2)
+        self.responses["create_file"] = [
+            protos.File(name="files/image", uri="https://image", expiration_time=expiration),
+            protos.File(name="files/image2", uri="https://image2", expiration_time=expiration),
+        ]
+
+        first = genai.upload_file(path)
+        again = genai.upload_file(path)
+        self.assertLen(self.observed_requests, 1)
+        self.assertEqual("files/image", first.name)
+        self.assertEqual("files/image", again.name)
+
+        # Deleting the file drops it from the cache, so it's uploaded again.
+        genai.delete_file(first)
+        second = genai.upload_file(path)
+        self.assertEqual("files/image2", second.name)
+
+    def test_file_cache_expired(self):
+        tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tempdir)
+        cache = file_types._FileCache(tempdir / "files.sqlite", api_key="key", min_ttl=3600)
+
+        soon = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=30)
+        cache.put("abc", "image/png", protos.File(name="files/soon", expiration_time=soon))
+        cache.put("def", "image/png", protos.File(name="files/no-expiration"))
+
+        self.assertIsNone(cache.get("abc", "image/png"))
+        self.assertIsNone(cache.get("def", "image/png"))
+        # Entries are scoped to the API key that uploaded them.
+        later = soon + datetime.timedelta(days=1)
+        cache.put("abc", "image/png", protos.File(name="files/later", expiration_time=later))
+        self.assertEqual("files/later", cache.get("abc", "image/png").name)
+        other = file_types._FileCache(tempdir / "files.sqlite", api_key="other")
+        self.assertIsNone(other.get("abc", "image/png"))
+
+    def test_upload_files(self):
+        tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tempdir)
+        contents = {"a.txt": "one", "b.txt": "two", "c.txt": "one", "d.txt": "existing"}
+        for file_name, text in contents.items():
+            (tempdir / file_name).write_text(text)
+
+        existing = protos.File(
+            name="files/existing", sha256_hash=hashlib.sha256(b"existing").hexdigest().encode()
+        )
+        self.responses["list_files"] = [[existing]]
+        uploaded = []
+
+        def create_file(path, **kwargs):
+            uploaded.append(path.name)
+            if path.name == "b.txt":
+                raise ValueError("failed")
+            return protos.File(name=f"files/{path.stem}")
+
+        self.client.create_file = create_file
+
+        paths = [tempdir / name for name in contents] + [tempdir / "missing.txt"]
+        result = genai.upload_files(paths, max_workers=2)
+
+        self.assertEqual(["a.txt", "b.txt"], sorted(uploaded))
+        self.assertEqual(
+            ["files/a", None, "files/a", "files/existing", None],
+            [r.name if isinstance(r, file_types.File) else None for r in result],
+        )
+        self.assertIsInstance(result[1], ValueError)
+        self.assertIsInstance(result[4], FileNotFoundError)
+        self.assertEqual([1, 4], sorted(result.errors))
+        self.assertEqual(1, result.uploaded)
+        self.assertEqual(2, result.reused)
+        self.assertEqual(3, result.bytes_uploaded)
+
+    def test_upload_files_without_dedup(self):
+        tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tempdir)
+        paths = []
+        for file_name in ["a.txt", "b.txt"]:
+            (tempdir / file_name).write_text("same")
+            paths.append(tempdir / file_name)
+        self.responses["create_file"] = [protos.File(), protos.File()]
+
+        result = genai.upload_files(paths, dedup=False)
+
+        self.assertLen(self.observed_requests, 2)
+        self.assertEqual(2, result.uploaded)
+        self.assertEqual(0, result.reused)
+
+
+class FakeDiscoveryApi:
+    """Builds upload requests the way the discovery API does, sending them to a mock."""
+
+    def __init__(self, http):
+        self.http = http
+
+    def media(self):
+        return self
+
+    def upload(self, body, media_body):
+        return googleapiclient.http.HttpRequest(
+            http=self.http,
+            postproc=googleapiclient.model.JsonModel().response,
+            uri="https://upload/files",
+            method="POST",
+            body=json.dumps(body),
+            headers={},
+            resumable=media_body,
+        )
+
+
+class ResumableUploadTests(parameterized.TestCase):
+    def setUp(self):
+        self.tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.path = self.tempdir / "video.mp4"
+        self.path.write_bytes(b"x" * (2 * client_lib.UPLOAD_CHUNK_GRANULARITY + 10))
+        self.checkpoint = self.tempdir / "video.checkpoint"
+
+        self.client = client_lib.FileServiceClient(client_options={"api_key": "key"})
+        self.client.get_file = lambda request: protos.File(name=request["name"])
+        client_lib._client_manager.clients["file"] = self.client
+
+    def use_responses(self, responses):
+        http = googleapiclient.http.HttpMockSequence(responses)
+        self.client._get_discovery_api = lambda metadata: FakeDiscoveryApi(http)
+        return http
+
+    def test_resume_upload(self):
+        chunk_size = client_lib.UPLOAD_CHUNK_GRANULARITY
+        self.use_responses(
+            [
+                ({"status": "200", "location": "https://upload/session"}, ""),
+                ({"status": "308", "range": f"bytes=0-{chunk_size - 1}"}, ""),
+                ({"status": "503"}, "unavailable"),
+            ]
+        )
+        cwd = os.getcwd()
+        os.chdir(self.tempdir)
+        try:
+            with self.assertRaises(googleapiclient.errors.HttpError):
+                genai.upload_file("video.mp4", chunk_size=chunk_size, checkpoint=self.checkpoint)
+        finally:
+            os.chdir(cwd)
+
+        state = json.loads(self.checkpoint.read_text())
+        self.assertEqual("https://upload/session", state["upload_url"])
+        self.assertEqual(chunk_size, state["offset"])
+        # The file is found again from any working directory.
+        self.assertEqual(str(self.path.resolve()), state["path"])
+
+        # The server did receive the second chunk before the connection failed.
+        http = self.use_responses(
+            [
+                ({"status": "308", "range": f"bytes=0-{2 * chunk_size - 1}"}, ""),
+                ({"status": "200"}, json.dumps({"file": {"name": "files/video"}})),
+            ]
+        )
+        f = genai.resume_upload(self.checkpoint)
+
+        self.assertEqual("files/video", f.name)
+        (_, _, _, status_headers), (_, _, _, chunk_headers) = http.request_sequence
+        self.assertEqual(f"bytes */{self.path.stat().st_size}", status_headers["Content-Range"])
+        self.assertEqual(
+            f"bytes {2 * chunk_size}-{self.path.stat().st_size - 1}/{self.path.stat().st_size}",
+            chunk_headers["Content-Range"],
+        )
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_resume_completed_upload(self):
+        chunk_size = client_lib.UPLOAD_CHUNK_GRANULARITY
+        self.use_responses(
+            [
+                ({"status": "200", "location": "https://upload/session"}, ""),
+                ({"status": "308", "range": f"bytes=0-{chunk_size - 1}"}, ""),
+                ({"status": "503"}, "unavailable"),
+            ]
+        )
+        with self.assertRaises(googleapiclient.errors.HttpError):
+            genai.upload_file(self.path, chunk_size=chunk_size, checkpoint=self.checkpoint)
+
+        # The last chunk did arrive, and the server finished the upload.
+        http = self.use_responses(
+            [({"status": "200"}, json.dumps({"file": {"name": "files/video"}}))]
+        )
+        f = genai.resume_upload(self.checkpoint)
+
+        self.assertEqual("files/video", f.name)
+        self.assertLen(http.request_sequence, 1)
+        self.assertFalse(self.checkpoint.exists())
+
+    @parameterized.named_parameters(
+        ["not_a_multiple", dict(chunk_size=1000)],
+        ["not_resumable", dict(resumable=False, checkpoint="upload.checkpoint")],
+        ["file_like", dict(path=io.BytesIO(b"data"), checkpoint="upload.checkpoint")],
+    )
+    def test_invalid_arguments(self, kwargs):
+        kwargs = dict(dict(path=self.path, mime_type="video/mp4"), **kwargs)
+        with self.assertRaises(ValueError):
+            self.client.create_file(**kwargs)
+
+
+class FakeHttp:
+    """Records upload requests and answers them like the resumable upload endpoint."""
+
+    def __init__(self, requests):
+        self.requests = requests
+
+    def request(self, uri, method="GET", body=None, headers=None):
+        self.requests.append(dict(uri=uri, body=body, headers=headers))
+        command = headers["X-Goog-Upload-Command"]
+        response = httplib2.Response({"status": 200})
+        if command == "start":
+            response["x-goog-upload-url"] = "https://upload/session"
+        if "finalize" in command:
+            return response, json.dumps({"file": {"name": "files/uploaded"}}).encode()
+        return response, b""
+
+
+class AsyncUploadTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.requests = []
+        patcher = mock.patch.object(client_lib.httplib2, "Http", lambda: FakeHttp(self.requests))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = client_lib.FileServiceAsyncClient(client_options={"api_key": "key"})
+        self.client.get_file = mock.AsyncMock(return_value=protos.File(name="files/uploaded"))
+
+    async def test_create_file_in_chunks(self):
+        chunk_size = client_lib.UPLOAD_CHUNK_GRANULARITY
+        data = b"x" * (2 * chunk_size + 10)
+        progress = []
+
+        result = await self.client.create_file(
+            io.BytesIO(data),
+            mime_type="text/plain",
+            display_name="test",
+            chunk_size=chunk_size,
+            progress=lambda sent, total: progress.append((sent, total)),
+        )
+
+        self.assertEqual("files/uploaded", result.name)
+        start, *uploads = self.requests
+        self.assertEqual("start", start["headers"]["X-Goog-Upload-Command"])
+        self.assertEqual(str(len(data)), start["headers"]["X-Goog-Upload-Header-Content-Length"])
+        self.assertEqual({"file": {"displayName": "test"}}, json.loads(start["body"]))
+        self.assertEqual(
+            ["upload", "upload", "upload, finalize"],
+            [r["headers"]["X-Goog-Upload-Command"] for r in uploads],
+        )
+        self.assertEqual(
+            ["0", str(chunk_size), str(2 * chunk_size)],
+            [r["headers"]["X-Goog-Upload-Offset"] for r in uploads],
+        )
+        self.assertEqual(data, b"".join(r["body"] for r in uploads))
+        self.assertEqual(
+            [(chunk_size, len(data)), (2 * chunk_size, len(data)), (len(data), len(data))],
+            progress,
+        )
+
+    async def test_create_file_cancel(self):
+        chunk_size = client_lib.UPLOAD_CHUNK_GRANULARITY
+
+        def progress(sent, total):
+            task.cancel()
+
+        task = asyncio.create_task(
+            self.client.create_file(
+                io.BytesIO(b"x" * 3 * chunk_size),
+                mime_type="text/plain",
+                chunk_size=chunk_size,
+                progress=progress,
+            )
+        )
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(
+            ["start", "upload", "cancel"],
+            [r["headers"]["X-Goog-Upload-Command"] for r in self.requests],
+        )
+        self.client.get_file.assert_not_called()
+
+    async def test_create_file_not_resumable(self):
+        result = await self.client.create_file(
+            io.BytesIO(b"data"), mime_type="text/plain", resumable=False
+        )
+
+        self.assertEqual("files/uploaded", result.name)
+        start, upload = self.requests
+        self.assertEqual("4", start["headers"]["X-Goog-Upload-Header-Content-Length"])
+        self.assertEqual("upload, finalize", upload["headers"]["X-Goog-Upload-Command"])
+        self.assertEqual(b"data", upload["body"])
+
+    async def test_create_file_not_resumable_too_large(self):
+        with mock.patch.object(client_lib, "MAX_NON_RESUMABLE_UPLOAD_SIZE", 3):
+            with self.assertRaises(ValueError):
+                await self.client.create_file(
+                    io.BytesIO(b"data"), mime_type="text/plain", resumable=False
+                )
+
+        # The upload is rejected before a session is started.
+        self.assertEqual([], self.requests)
+
+    async def test_upload_file_async(self):
+        client_lib._client_manager.clients["file_async"] = self.client
+        self.addCleanup(client_lib._client_manager.clients.pop, "file_async")
+
+        f = await genai.upload_file_async(io.BytesIO(b"data"), mime_type="text/plain", name="abc")
+
+        self.assertIsInstance(f, file_types.File)
+        start, upload = self.requests
+        self.assertEqual({"file": {"name": "files/abc"}}, json.loads(start["body"]))
+        self.assertEqual(b"data", upload["body"])
+
+    async def test_upload_file_async_with_cache(self):
+        client_lib._client_manager.clients["file_async"] = self.client
+        self.addCleanup(client_lib._client_manager.clients.pop, "file_async")
+        tempdir = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tempdir)
+        path = tempdir / "notes.txt"
+        path.write_bytes(b"data")
+        client_lib._client_manager.file_cache_path = tempdir / "files.sqlite"
+        self.addCleanup(setattr, client_lib._client_manager, "file_cache_path", None)
+
+        expiration = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=2)
+        self.client.get_file.return_value = protos.File(
+            name="files/uploaded", expiration_time=expiration
+        )
+        threads = []
+
+        def recording(method):
+            def wrapper(cache, *args):
+                threads.append(threading.current_thread())
+                return method(cache, *args)
+
+            return wrapper
+
+        with mock.patch.multiple(
+            file_types._FileCache,
+            get=recording(file_types._FileCache.get),
+            put=recording(file_types._FileCache.put),
+        ):
+            first = await genai.upload_file_async(path)
+            again = await genai.upload_file_async(path)
+
+        self.assertEqual("files/uploaded", again.name)
+        self.assertEqual(first.name, again.name)
+        self.assertEqual(2, len(self.requests))
+        # The database is only used from worker threads, never on the event loop.
+        self.assertEqual(3, len(threads))
+        self.assertNotIn(threading.current_thread(), threads)
+
+
+class AsyncWaitTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = mock.AsyncMock()
+        client_lib._client_manager.clients["file_async"] = self.client
+        self.addCleanup(client_lib._client_manager.clients.pop, "file_async")
+
+        patcher = mock.patch.object(file_types, "_sleep_async", mock.AsyncMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_wait_until_active_async(self):
+        self.client.get_file.side_effect = [
+            protos.File(name="files/abc", state="PROCESSING"),
+            protos.File(name="files/abc", state="ACTIVE"),
+        ]
+
+        f = file_types.File(protos.File(name="files/abc", state="PROCESSING"))
+        await f.wait_until_active_async(poll=[1, 2, 3])
+
+        self.assertEqual(protos.File.State.ACTIVE, f.state)
+        self.client.get_file.assert_called_with(name="files/abc")
+
+    async def test_list_files_async(self):
+        async def pager():
+            for name in ["files/a", "files/b", "files/c"]:
+                yield protos.File(name=name)
+
+        self.client.list_files.return_value = pager()
+
+        names = [f.name async for f in genai.list_files_async(page_size=2)]
+        self.assertEqual(["files/a", "files/b", "files/c"], names)
+
+    async def test_wait_all_async(self):
+        async def pager():
+            yield protos.File(name="files/b", state="ACTIVE")
+            yield protos.File(name="files/a", state="ACTIVE")
+
+        self.client.list_files.return_value = pager()
+
+        files = [protos.File(name="files/a", state="PROCESSING")]
+        result = await genai.wait_all_async(files, poll=[0])
+
+        self.assertEqual(protos.File.State.ACTIVE, result[0].state)
+        self.client.get_file.assert_not_called()
@@ -196,6 +196,25 @@ class UnitTests(parameterized.TestCase):
             GH"""
         )
         self.assertEqual(expected, response.text)
+        self.assertEqual(expected, "\n".join(response.text_parts()))
+
+    def test_quick_accessors_are_cached_until_next_chunk(self):
+        chunks = [
+            protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
+            for a in "abc"
+        ]
+        response = generation_types.GenerateContentResponse.from_iterator(iter(chunks))
+        it = iter(response)
+        next(it)
+        first_result = response._result
+
+        response.resolve()
+
+        self.assertIsNot(first_result, response._result)
+        self.assertEqual("abc", response.text)
+        self.assertIs(response.text, response.text)
+        self.assertIs(response.parts, response.parts)
+        self.assertIs(response.candidates, response.candidates)
 
     def test_many_join_contents(self):
         import string
@@ -524,6 +543,53 @@ class UnitTests(parameterized.TestCase):
 
         self.assertEqual(expected, result)
 
+    def test_chunk_accumulator_matches_join_chunks(self):
+        chunks = [protos.GenerateContentResponse(candidates=cl) for cl in self.CANDIDATE_LISTS]
+        chunks.append(
+            protos.GenerateContentResponse(
+                {
+                    "candidates": [
+                        {
+                            "content": {"parts": [{"executable_code": {"code": "print("}}]},
+                            "safety_ratings": [
+                                {"category": "HARM_CATEGORY_DANGEROUS", "probability": "LOW"}
+                            ],
+                        }
+                    ]
+                }
+            )
+        )
+        chunks.append(
+            protos.GenerateContentResponse(
+                {
+                    "candidates": [
+                        {
+                            "content": {"parts": [{"executable_code": {"code": "'hi')"}}]},
+                            "safety_ratings": [
+                                {
+                                    "category": "HARM_CATEGORY_DANGEROUS",
+                                    "probability": "HIGH",
+                                    "blocked": True,
+                                }
+                            ],
+                            "finish_reason": "STOP",
+                        }
+                    ],
+                    "usage_metadata": {"prompt_token_count": 5},
+                }
+            )
+        )
+
+        accumulator = generation_types._ChunkAccumulator(chunks[0])
+        for chunk in chunks[1:]:
+            accumulator.add_chunk(chunk)
+
+        expected = generation_types._join_chunks(chunks)
+        result = accumulator.result
+        self.assertEqual(type(expected).to_dict(expected), type(result).to_dict(result))
+        # The merged result is cached until the next chunk arrives.
+        self.assertIs(result, accumulator.result)
+
     def test_generate_content_response_iterator_end_to_end(self):
         chunks = [protos.GenerateContentResponse(candidates=cl) for cl in self.CANDIDATE_LISTS]
         merged = generation_types._join_chunks(chunks)
@@ -575,6 +641,83 @@ class UnitTests(parameterized.TestCase):
         self.assertLen(parts, 1)
         self.assertEqual(parts[0].text, string.ascii_lowercase)
 
+    def test_generate_content_response_iter_text(self):
+        chunks = [
+            protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
+            for a in "abcd"
+        ]
+        chunks.append(
+            protos.GenerateContentResponse(
+                {"candidates": [{"content": {"parts": [{"function_call": {"name": "f"}}]}}]}
+            )
+        )
+        response = generation_types.GenerateContentResponse.from_iterator(iter(chunks))
+
+        self.assertEqual(["a", "b", "c", "d"], list(response.iter_text()))
+
+        # The stream was still accumulated.
+        parts = response.candidates[0].content.parts
+        self.assertEqual("abcd", parts[0].text)
+        self.assertEqual("f", parts[1].function_call.name)
+
+        # And it can be replayed.
+        self.assertEqual(["a", "b", "c", "d"], list(response.iter_text()))
+
+    def test_generate_content_response_without_retained_chunks(self):
+        chunks = [
+            protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
+            for a in "abcd"
+        ]
+        response = generation_types.GenerateContentResponse.from_iterator(
+            iter(chunks), retain_chunks=False
+        )
+
+        for chunk, a in zip(response, "abcd"):
+            self.assertEqual(a, chunk.text)
+            # Only the current chunk and the look-ahead chunk are held.
+            self.assertLessEqual(len(response._chunks), 2)
+
+        self.assertEmpty(response._chunks)
+        self.assertEqual("abcd", response.text)
+
+        with self.assertRaisesRegex(ValueError, "retain_chunks=False"):
+            list(response)
+
+    def test_generate_content_response_without_retained_chunks_second_iterator(self):
+        chunks = [
+            protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
+            for a in "abcd"
+        ]
+        response = generation_types.GenerateContentResponse.from_iterator(
+            iter(chunks), retain_chunks=False
+        )
+
+        it1 = iter(response)
+        next(it1)
+        next(it1)
+
+        with self.assertRaisesRegex(ValueError, "retain_chunks=False"):
+            next(iter(response))
+
+    def test_generate_content_response_without_retained_chunks_resolve(self):
+        chunks = [
+            protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
+            for a in "abcd"
+        ]
+        response = generation_types.GenerateContentResponse.from_iterator(
+            iter(chunks), retain_chunks=False
+        )
+
+        for chunk in response:
+            if chunk.text == "b":
+                break
+
+        with self.assertRaises(generation_types.IncompleteIterationError):
+            response.text
+
+        response.resolve()
+        self.assertEqual("abcd", response.text)
+
     def test_generate_content_response_resolve(self):
         chunks = [
             protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
@@ -4,6 +4,8 @@ import copy
 import datetime
 import pathlib
 import textwrap
+from unittest import mock
+import google.api_core.exceptions
 from absl.testing import absltest
 from absl.testing import parameterized
 from google.generativeai import protos
@@ -92,6 +94,28 @@ class MockGenerativeServiceClient:
             expire_time="2000-01-01T01:01:01.123456Z",
         )
 
+    def create_cached_content(
+        self,
+        request: protos.CreateCachedContentRequest,
+        **kwargs,
+    ) -> protos.CachedContent:
+        self.observed_requests.append(request)
+        cached_content = protos.CachedContent(request.cached_content)
+        cached_content.name = f"cachedContents/auto-{len(self.responses['cached_contents'])}"
+        cached_content.expire_time = datetime.datetime.now(
+            datetime.timezone.utc
+        ) + datetime.timedelta(hours=1)
+        self.responses["cached_contents"].append(cached_content)
+        return cached_content
+
+    def list_cached_contents(
+        self,
+        request: protos.ListCachedContentsRequest,
+        **kwargs,
+    ) -> Iterable[protos.CachedContent]:
+        self.observed_requests.append(request)
+        return list(self.responses["cached_contents"])
+
 
 class CUJTests(parameterized.TestCase):
     """Tests are in order with the design doc."""
@@ -185,6 +209,67 @@ class CUJTests(parameterized.TestCase):
         _ = model.generate_content("hello", generation_config=config2)
         self.assertEqual(self.observed_requests[-1].generation_config.temperature, 0.5)
 
+        # The override doesn't leak into the model's cached request template.
+        self.responses["generate_content"].append(simple_response(" world!"))
+        _ = model.generate_content("hello")
+        self.assertEqual(self.observed_requests[-1].generation_config.temperature, 0.0)
+
+    def test_generate_content_batch(self):
+        def generate_content(request, **kwargs):
+            text = request.contents[0].parts[0].text
+            if text == "fail":
+                raise ValueError("failed")
+            self.observed_requests.append(request)
+            return simple_response(text.upper())
+
+        self.client.generate_content = generate_content
+
+        model = generative_models.GenerativeModel(
+            "gemini-1.5-flash", generation_config={"temperature": 0.0}
+        )
+        prompts = ["a", "b", "fail", "c", "d"]
+        results = model.generate_content_batch(
+            prompts, generation_config={"temperature": 0.5}, max_concurrency=2
+        )
+
+        self.assertEqual(["A", "B"], [r.text for r in results[:2]])
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(["C", "D"], [r.text for r in results[3:]])
+        self.assertLen(self.observed_requests, 4)
+        for request in self.observed_requests:
+            self.assertEqual(0.5, request.generation_config.temperature)
+
+    def test_generate_content_as_completed(self):
+        self.client.generate_content = lambda request, **kwargs: simple_response(
+            request.contents[0].parts[0].text
+        )
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+        prompts = [str(n) for n in range(20)]
+        results = dict(model.generate_content_as_completed(prompts, max_concurrency=4))
+
+        self.assertEqual(prompts, [results[n].text for n in range(20)])
+
+    def test_generate_content_batch_converts_tools_once(self):
+        def generate_content(request, **kwargs):
+            self.observed_requests.append(request)
+            return simple_response(request.contents[0].parts[0].text)
+
+        self.client.generate_content = generate_content
+
+        tools = dict(function_declarations=[dict(name="datetime", description="The time.")])
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+        to_proto = content_types.FunctionLibrary.to_proto
+        with mock.patch.object(
+            content_types.FunctionLibrary, "to_proto", autospec=True, side_effect=to_proto
+        ) as mock_to_proto:
+            results = model.generate_content_batch(["a", "b", "c"], tools=tools)
+
+        self.assertEqual(["a", "b", "c"], [r.text for r in results])
+        mock_to_proto.assert_called_once()
+        for request in self.observed_requests:
+            self.assertEqual("datetime", request.tools[0].function_declarations[0].name)
+
     @parameterized.named_parameters(
         ["dict", {"danger": "low"}, {"danger": "high"}],
         ["quick", "low", "high"],
@@ -376,6 +461,110 @@ class CUJTests(parameterized.TestCase):
             "cachedContents/test-cached-content",
         )
 
+    def test_auto_cache_moves_stable_prefix_to_cached_content(self):
+        manager = caching.CachedContentManager()
+        self.addCleanup(manager.close)
+        model = generative_models.GenerativeModel(
+            "gemini-1.5-flash-002",
+            system_instruction="Answer from the documents.",
+            auto_cache=True,
+            cache_manager=manager,
+        )
+        documents = [
+            {"role": "user", "parts": ["document 1", "document 2"]},
+            {"role": "model", "parts": ["I read them."]},
+        ]
+        self.responses["count_tokens"] = [protos.CountTokensResponse(total_tokens=40000)]
+        self.responses["generate_content"] = [simple_response(str(n)) for n in range(3)]
+
+        for question in ["question 1", "question 2", "question 3"]:
+            model.generate_content(documents + [{"role": "user", "parts": [question]}])
+
+        first, second, third = [
+            r for r in self.observed_requests if isinstance(r, protos.GenerateContentRequest)
+        ]
+        self.assertLen(first.contents, 3)
+        self.assertEqual(first.system_instruction.parts[0].text, "Answer from the documents.")
+        self.assertFalse(first.cached_content)
+
+        for request in (second, third):
+            self.assertEqual(request.cached_content, "cachedContents/auto-0")
+            self.assertLen(request.contents, 1)
+            self.assertNotIn("system_instruction", request)
+
+        (cached_content,) = self.responses["cached_contents"]
+        self.assertLen(cached_content.contents, 2)
+        self.assertEqual(
+            cached_content.system_instruction.parts[0].text, "Answer from the documents."
+        )
+        self.assertEqual(cached_content.model, "models/gemini-1.5-flash-002")
+
+    def test_auto_cache_skips_small_prefixes(self):
+        model = generative_models.GenerativeModel(
+            "gemini-1.5-flash-002",
+            auto_cache=True,
+            min_cache_tokens=1000,
+            cache_manager=caching.CachedContentManager(),
+        )
+        documents = [
+            {"role": "user", "parts": ["a short document"]},
+            {"role": "model", "parts": ["I read it."]},
+        ]
+        self.responses["count_tokens"] = [protos.CountTokensResponse(total_tokens=10)]
+        self.responses["generate_content"] = [simple_response(str(n)) for n in range(3)]
+
+        for question in ["question 1", "question 2", "question 3"]:
+            model.generate_content(documents + [{"role": "user", "parts": [question]}])
+
+        # The prefix is only counted once.
+        counts = [r for r in self.observed_requests if isinstance(r, protos.CountTokensRequest)]
+        self.assertLen(counts, 1)
+        self.assertLen(counts[0].generate_content_request.contents, 2)
+        for request in self.observed_requests:
+            if isinstance(request, protos.GenerateContentRequest):
+                self.assertFalse(request.cached_content)
+                self.assertLen(request.contents, 3)
+
+    def test_auto_cache_sends_uncached_request_when_caching_fails(self):
+        manager = caching.CachedContentManager()
+        self.addCleanup(manager.close)
+        model = generative_models.GenerativeModel(
+            "gemini-1.5-flash", auto_cache=True, cache_manager=manager
+        )
+
+        def create_cached_content(request, **kwargs):
+            self.observed_requests.append(request)
+            raise google.api_core.exceptions.InvalidArgument("Model has no version suffix.")
+
+        self.client.create_cached_content = create_cached_content
+        documents = [
+            {"role": "user", "parts": ["a long document"]},
+            {"role": "model", "parts": ["I read it."]},
+        ]
+        self.responses["count_tokens"] = [protos.CountTokensResponse(total_tokens=40000)]
+        self.responses["generate_content"] = [simple_response(str(n)) for n in range(3)]
+
+        model.generate_content(documents + [{"role": "user", "parts": ["question 1"]}])
+        with self.assertWarnsRegex(UserWarning, "no version suffix"):
+            model.generate_content(documents + [{"role": "user", "parts": ["question 2"]}])
+        model.generate_content(documents + [{"role": "user", "parts": ["question 3"]}])
+
+        # Caching is only attempted once, every request is sent in full.
+        creates = [
+            r for r in self.observed_requests if isinstance(r, protos.CreateCachedContentRequest)
+        ]
+        self.assertLen(creates, 1)
+        for request in self.observed_requests:
+            if isinstance(request, protos.GenerateContentRequest):
+                self.assertFalse(request.cached_content)
+                self.assertLen(request.contents, 3)
+
+    def test_auto_cache_models_share_a_cache_manager(self):
+        first = generative_models.GenerativeModel("gemini-1.5-flash-002", auto_cache=True)
+        second = generative_models.GenerativeModel("gemini-1.5-pro-002", auto_cache=True)
+        self.assertIsInstance(first._cache_manager, caching.CachedContentManager)
+        self.assertIs(first._cache_manager, second._cache_manager)
+
     def test_fail_content_generation_with_model_having_context(self):
         model = generative_models.GenerativeModel.from_cached_content(
             cached_content="test-cached-content"
@@ -453,6 +642,26 @@ class CUJTests(parameterized.TestCase):
 
         self.assertEqual("".join(chunk.text for chunk in response), "xyz")
 
+    def test_chat_streaming_without_retained_chunks(self):
+        self.responses["stream_generate_content"] = [
+            iter([simple_response("a"), simple_response("b"), simple_response("c")]),
+            iter([simple_response("1"), simple_response("2"), simple_response("3")]),
+        ]
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+        chat = model.start_chat()
+
+        response = chat.send_message("letters?", stream=True, retain_chunks=False)
+        self.assertEqual("".join(chunk.text for chunk in response), "abc")
+        self.assertEmpty(response._chunks)
+
+        response = chat.send_message("numbers?", stream=True, retain_chunks=False)
+        self.assertEqual("".join(chunk.text for chunk in response), "123")
+
+        self.assertEqual(
+            ["letters?", "abc", "numbers?", "123"], [c.parts[0].text for c in chat.history]
+        )
+
     def test_chat_incomplete_streaming_errors(self):
         # Chat streaming
         self.responses["stream_generate_content"] = [
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import collections
+import datetime
 import sys
 from collections.abc import Iterable
 import os
@@ -21,6 +22,7 @@ from typing import Any
 import unittest
 
 
+from google.generativeai import caching
 from google.generativeai import client as client_lib
 from google.generativeai import generative_models
 from google.generativeai.types import content_types
@@ -110,6 +112,88 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(response.text, "world!")
 
+    async def test_streaming_text_deltas(self):
+        model = generative_models.GenerativeModel(model_name="gemini-1.5-flash")
+
+        async def responses():
+            for c in "world!":
+                yield simple_response(c)
+
+        self.responses["stream_generate_content"] = [responses()]
+
+        response = await model.generate_content_async("Hello", stream=True)
+
+        deltas = [text async for text in response.aiter_text()]
+        self.assertEqual(list("world!"), deltas)
+        self.assertEqual(response.text, "world!")
+
+    async def test_generate_content_batch(self):
+        async def generate_content(request, **kwargs):
+            text = request.contents[0].parts[0].text
+            if text == "fail":
+                raise ValueError("failed")
+            return simple_response(text.upper())
+
+        self.client.generate_content = generate_content
+
+        model = generative_models.GenerativeModel(model_name="gemini-1.5-flash")
+        results = await model.generate_content_batch_async(
+            ["a", "b", "fail", "c"], max_concurrency=2
+        )
+
+        self.assertEqual(["A", "B"], [r.text for r in results[:2]])
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual("C", results[3].text)
+
+    async def test_auto_cache(self):
+        cache_client = unittest.mock.MagicMock()
+        client_lib._client_manager.clients["cache_async"] = cache_client
+        self.addCleanup(client_lib._client_manager.clients.pop, "cache_async")
+        created = []
+
+        async def list_cached_contents(request, **kwargs):
+            async def results():
+                for cached_content in created:
+                    yield cached_content
+
+            return results()
+
+        async def create_cached_content(request, **kwargs):
+            cached_content = protos.CachedContent(request.cached_content)
+            cached_content.name = "cachedContents/auto"
+            cached_content.expire_time = datetime.datetime.now(
+                datetime.timezone.utc
+            ) + datetime.timedelta(hours=1)
+            created.append(cached_content)
+            return cached_content
+
+        cache_client.list_cached_contents = list_cached_contents
+        cache_client.create_cached_content = create_cached_content
+
+        manager = caching.CachedContentManager()
+        self.addCleanup(manager.close)
+        model = generative_models.GenerativeModel(
+            "gemini-1.5-flash-002", auto_cache=True, cache_manager=manager
+        )
+        documents = [
+            {"role": "user", "parts": ["a long document"]},
+            {"role": "model", "parts": ["I read it."]},
+        ]
+        self.responses["count_tokens"] = [protos.CountTokensResponse(total_tokens=40000)]
+        self.responses["generate_content"] = [simple_response(str(n)) for n in range(3)]
+
+        for question in ["question 1", "question 2", "question 3"]:
+            await model.generate_content_async(documents + [{"role": "user", "parts": [question]}])
+
+        self.assertLen(created, 1)
+        first, second, third = [
+            r for r in self.observed_requests if isinstance(r, protos.GenerateContentRequest)
+        ]
+        self.assertFalse(first.cached_content)
+        for request in (second, third):
+            self.assertEqual("cachedContents/auto", request.cached_content)
+            self.assertLen(request.contents, 1)
+
     @parameterized.named_parameters(
         dict(
             testcase_name="test_FunctionCallingMode_str",
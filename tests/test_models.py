@@ -26,6 +26,7 @@ from absl.testing import absltest
 from absl.testing import parameterized
 
 from google.generativeai import protos
+from google.api_core import exceptions
 from google.api_core import operation
 
 from google.generativeai import models
@@ -265,6 +266,20 @@ class UnitTests(parameterized.TestCase):
         models.delete_tuned_model(model)
         self.assertEqual(self.observed_requests[0].name, "tunedModels/bipedal-pangolin-223")
 
+    def test_delete_tuned_models(self):
+        def delete_tuned_model(name, **kwargs):
+            self.observed_requests.append(protos.DeleteTunedModelRequest(name=name))
+            if name == "tunedModels/gone":
+                raise exceptions.NotFound("gone")
+
+        self.client.delete_tuned_model = delete_tuned_model
+
+        summary = models.delete_tuned_models(["tunedModels/a", "tunedModels/gone"])
+
+        self.assertEqual(["tunedModels/a"], summary.deleted)
+        self.assertEqual(["tunedModels/gone"], summary.not_found)
+        self.assertEmpty(summary.errors)
+
     @parameterized.named_parameters(
         ["simple", "2000-01-01T01:01:01.123456Z", 123456],
         ["zeros-right", "2000-01-01T01:01:01.100000Z", 100000],